@@ -7,14 +7,17 @@ from datetime import datetime, timedelta
 from typing import List
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, distinct, and_
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
-from app.database import get_db, init_db
+from app.database import get_db, init_db, engine
 from app.models import Event
 from app.schemas import EventRequest, EventResponse, MetricsResponse, TimeSeriesPoint
+from app.serialization import FastJSONResponse
+from app.metrics import DB_POOL_CONNECTIONS, EVENTS_TOTAL, observe_request
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -39,6 +42,7 @@ app = FastAPI(
     description="Telemetry and metrics aggregation service",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # Configure CORS
@@ -50,6 +54,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.middleware("http")(observe_request)
+
 
 @app.get("/health")
 async def health_check():
@@ -57,6 +63,17 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics"""
+    pool = engine.pool
+    if hasattr(pool, "checkedout"):
+        DB_POOL_CONNECTIONS.labels(state="checked_out").set(pool.checkedout())
+        DB_POOL_CONNECTIONS.labels(state="idle").set(pool.checkedin())
+        DB_POOL_CONNECTIONS.labels(state="overflow").set(max(0, pool.overflow()))
+    return Response(generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
 @app.post("/api/analytics/events", response_model=EventResponse)
 async def post_event(
     event: EventRequest,
@@ -77,6 +94,7 @@ async def post_event(
         )
         db.add(db_event)
         await db.commit()
+        EVENTS_TOTAL.labels(event_type=event.event_type).inc()
         
         logger.info(f"Event recorded: {event.event_type} from {event.agent_id}")
         
@@ -172,6 +190,19 @@ async def get_metrics(
         
         avg_latency_ms = sum(latencies) / len(latencies) if latencies else 0
         
+        # Average edit latency on the accepting node (request received to commit)
+        result = await db.execute(
+            select(func.avg(Event.event_metadata["latency_ms"].as_float()))
+            .where(
+                and_(
+                    Event.event_type == "edit_applied",
+                    Event.timestamp >= since,
+                    Event.event_metadata.isnot(None)
+                )
+            )
+        )
+        avg_edit_latency_ms = result.scalar() or 0
+        
         # Token usage by time (time series)
         # Build time buckets
         time_series = []
@@ -208,6 +239,7 @@ async def get_metrics(
             total_tokens=int(total_tokens),
             active_agents=active_agents,
             avg_latency_ms=float(avg_latency_ms),
+            avg_edit_latency_ms=float(avg_edit_latency_ms),
             edits_per_minute=float(edits_per_minute),
             token_usage_by_time=time_series,
         )
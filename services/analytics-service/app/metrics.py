@@ -0,0 +1,38 @@
+"""
+Prometheus metrics for Analytics Service
+Request latency, recorded events by type and the database pool.
+"""
+import time
+
+from fastapi import Request
+from prometheus_client import Counter, Gauge, Histogram
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "analytics_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "analytics_db_pool_checkout_seconds",
+    "Time waiting for a database connection from the pool",
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CONNECTIONS = Gauge("analytics_db_pool_connections", "Database pool connections by state", ["state"])
+EVENTS_TOTAL = Counter("analytics_events_total", "Recorded events by type", ["event_type"])
+
+
+async def observe_request(request: Request, call_next):
+    """HTTP middleware: request latency by route template, except /metrics scrapes"""
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    if route != "/metrics":
+        HTTP_REQUEST_SECONDS.labels(request.method, route, str(response.status_code)).observe(
+            time.perf_counter() - start
+        )
+    return response
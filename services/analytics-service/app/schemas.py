@@ -33,5 +33,6 @@ class MetricsResponse(BaseModel):
     total_tokens: int
     active_agents: int
     avg_latency_ms: float
+    avg_edit_latency_ms: float = 0.0
     edits_per_minute: float
     token_usage_by_time: List[TimeSeriesPoint]
@@ -0,0 +1,25 @@
+"""
+Default response class of the analytics endpoints
+Renders with orjson when FAST_JSON=true and it is installed, with pydantic-core otherwise.
+"""
+import os
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+FAST_JSON = orjson is not None and os.getenv("FAST_JSON", "false").lower() in ("1", "true", "yes")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response for content already encoded by FastAPI (plain dicts, lists, strings)"""
+
+    def render(self, content: Any) -> bytes:
+        if FAST_JSON:
+            return orjson.dumps(content)
+        return to_json(content)
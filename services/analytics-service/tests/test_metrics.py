@@ -0,0 +1,29 @@
+"""
+Tests for request latency metrics
+"""
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from app.main import app
+
+
+def request_count(method, route, status):
+    labels = {"method": method, "route": route, "status": status}
+    return REGISTRY.get_sample_value("analytics_http_request_duration_seconds_count", labels) or 0
+
+
+@pytest.mark.asyncio
+async def test_requests_are_labelled_by_route_template():
+    before_health = request_count("GET", "/health", "200")
+    before_unmatched = request_count("GET", "unmatched", "404")
+    before_scrape = request_count("GET", "/metrics", "200")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        await client.get("/health")
+        await client.get("/no/such/path/123")
+        await client.get("/metrics")
+
+    assert request_count("GET", "/health", "200") == before_health + 1
+    assert request_count("GET", "unmatched", "404") == before_unmatched + 1
+    assert request_count("GET", "/metrics", "200") == before_scrape
@@ -0,0 +1,229 @@
+"""
+Tiered retention for chat history
+The Redis stream keeps the most recent MAX_MESSAGES entries; older ones are
+moved in batches to gzip-compressed JSON lines segment files in
+CHAT_ARCHIVE_DIR (immutable, named by the first and last message ID) and
+read back transparently when a page starts before the oldest stream entry.
+"""
+import os
+import gzip
+import json
+import asyncio
+import logging
+import secrets
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.metrics import ARCHIVED_MESSAGES_TOTAL, REDIS_COMMAND_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Empty disables archival: the stream is simply capped at MAX_MESSAGES
+CHAT_ARCHIVE_DIR = os.getenv("CHAT_ARCHIVE_DIR", "")
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "10"))
+# Hard cap on the stream while archival is on, in case the archiver falls behind
+ARCHIVE_MAX_BACKLOG = int(os.getenv("ARCHIVE_MAX_BACKLOG", "10000"))
+ARCHIVE_LOCK_KEY = "chat:archive:lock"
+ARCHIVE_LOCK_SECONDS = 60
+# Deletes the lock only while it still holds the caller's token
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+SEGMENT_SUFFIX = ".jsonl.gz"
+
+StreamEntry = Tuple[str, Dict[str, str]]
+
+
+def parse_id(message_id: str) -> Tuple[int, int]:
+    milliseconds, _, sequence = message_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+def format_id(key: Tuple[int, int]) -> str:
+    return f"{key[0]}-{key[1]}"
+
+
+def parse_start(start_id: str) -> Tuple[Tuple[int, int], bool]:
+    """XRANGE min argument ("-", "<id>" or "(<id>") as (id key, exclusive)"""
+    if start_id == "-":
+        return (0, 0), False
+    if start_id.startswith("("):
+        return parse_id(start_id[1:]), True
+    return parse_id(start_id), False
+
+
+@dataclass(frozen=True)
+class Segment:
+    first: Tuple[int, int]
+    last: Tuple[int, int]
+    path: str
+
+
+@lru_cache(maxsize=8)
+def _load_segment(path: str) -> Tuple[List[Tuple[int, int]], List[StreamEntry]]:
+    """Entries of a segment and their sorted ID keys; segments never change once written"""
+    with gzip.open(path, "rt", encoding="utf-8") as segment_file:
+        entries = [tuple(json.loads(line)) for line in segment_file if line.strip()]
+    return [parse_id(message_id) for message_id, _ in entries], entries
+
+
+class SegmentArchive:
+    """Append-only archive of stream entries in compressed segment files"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        # (directory mtime, segments listed at it)
+        self._index: Tuple[Optional[int], List[Segment]] = (None, [])
+
+    def segments(self) -> List[Segment]:
+        """Segments ordered by first ID; the directory is re-listed only after it changes"""
+        mtime = os.stat(self.directory).st_mtime_ns
+        if self._index[0] != mtime:
+            self._index = (mtime, self._list_segments())
+        return self._index[1]
+
+    def _list_segments(self) -> List[Segment]:
+        segments = []
+        for name in os.listdir(self.directory):
+            if not name.startswith("segment-") or not name.endswith(SEGMENT_SUFFIX):
+                continue
+            first, last = name[len("segment-"):-len(SEGMENT_SUFFIX)].split("_")
+            segments.append(Segment(parse_id(first), parse_id(last), os.path.join(self.directory, name)))
+        return sorted(segments, key=lambda segment: segment.first)
+
+    def last_archived_id(self) -> Optional[str]:
+        segments = self.segments()
+        return format_id(max(segment.last for segment in segments)) if segments else None
+
+    def write(self, entries: List[StreamEntry]) -> Segment:
+        """Store a batch of consecutive entries as a new segment"""
+        first, last = parse_id(entries[0][0]), parse_id(entries[-1][0])
+        path = os.path.join(self.directory, f"segment-{format_id(first)}_{format_id(last)}{SEGMENT_SUFFIX}")
+        temporary = path + ".tmp"
+        with gzip.open(temporary, "wt", encoding="utf-8") as segment_file:
+            for message_id, fields in entries:
+                segment_file.write(json.dumps([message_id, fields], ensure_ascii=False) + "\n")
+        # Readers only ever see complete segments
+        os.replace(temporary, path)
+        self._index = (None, [])
+        return Segment(first, last, path)
+
+    def read(self, start_id: str, limit: int) -> List[StreamEntry]:
+        """Archived entries from an XRANGE-style start, oldest first"""
+        start, exclusive = parse_start(start_id)
+        result: List[StreamEntry] = []
+        for segment in self.segments():
+            if segment.last < start or (exclusive and segment.last == start):
+                continue
+            keys, entries = _load_segment(segment.path)
+            position = (bisect_right if exclusive else bisect_left)(keys, start)
+            result.extend(entries[position:position + limit - len(result)])
+            if len(result) >= limit:
+                break
+            # Later segments continue after this one
+            start, exclusive = segment.last, True
+        return result
+
+    def find(self, message_ids: List[str]) -> Dict[str, StreamEntry]:
+        """Archived entries by exact ID; IDs not in the archive are left out"""
+        segments = self.segments()
+        firsts = [segment.first for segment in segments]
+        found: Dict[str, StreamEntry] = {}
+        for message_id in message_ids:
+            key = parse_id(message_id)
+            position = bisect_right(firsts, key) - 1
+            if position < 0 or segments[position].last < key:
+                continue
+            keys, entries = _load_segment(segments[position].path)
+            index = bisect_left(keys, key)
+            if index < len(keys) and keys[index] == key:
+                found[message_id] = entries[index]
+        return found
+
+
+archive: Optional[SegmentArchive] = SegmentArchive(CHAT_ARCHIVE_DIR) if CHAT_ARCHIVE_DIR else None
+
+
+def stream_maxlen(max_messages: int) -> int:
+    """XADD cap: the retention size, or the archiver backlog limit when archiving"""
+    return max(max_messages, ARCHIVE_MAX_BACKLOG) if archive is not None else max_messages
+
+
+async def read_range(redis_client: redis.Redis, stream: str, start_id: str, limit: int) -> List[StreamEntry]:
+    """
+    XRANGE that continues into the archive: entries before the oldest stream entry
+    are read from segments, the rest of the page from the stream
+    """
+    entries: List[StreamEntry] = []
+    if archive is not None:
+        with REDIS_COMMAND_SECONDS.labels(command="xrange").time():
+            oldest = await redis_client.xrange(stream, min="-", max="+", count=1)
+        start, exclusive = parse_start(start_id)
+        if not oldest or start < parse_id(oldest[0][0]):
+            entries = await asyncio.to_thread(archive.read, start_id, limit)
+            if entries:
+                start_id = f"({entries[-1][0]}"
+    if len(entries) < limit:
+        with REDIS_COMMAND_SECONDS.labels(command="xrange").time():
+            entries += await redis_client.xrange(stream, min=start_id, max="+", count=limit - len(entries))
+    return entries
+
+
+async def archive_once(redis_client: redis.Redis, stream: str, keep: int) -> int:
+    """
+    Move up to ARCHIVE_BATCH_SIZE entries beyond the newest `keep` into a segment
+    and trim them from the stream. Returns the number of archived entries.
+    """
+    # One archiver across all replicas
+    token = secrets.token_hex(16)
+    if not await redis_client.set(ARCHIVE_LOCK_KEY, token, nx=True, ex=ARCHIVE_LOCK_SECONDS):
+        return 0
+    try:
+        # Newest entry beyond the retained ones: everything up to it is archived
+        newest = await redis_client.xrevrange(stream, max="+", min="-", count=keep + 1)
+        if len(newest) <= keep:
+            return 0
+        boundary = newest[-1][0]
+        # Entries archived before a crash but not yet trimmed are skipped
+        last_archived = await asyncio.to_thread(archive.last_archived_id)
+        entries = await redis_client.xrange(
+            stream,
+            min=f"({last_archived}" if last_archived else "-",
+            max=boundary,
+            count=ARCHIVE_BATCH_SIZE,
+        )
+        if entries:
+            await asyncio.to_thread(archive.write, entries)
+            last_archived = entries[-1][0]
+            ARCHIVED_MESSAGES_TOTAL.inc(len(entries))
+        if last_archived:
+            milliseconds, sequence = parse_id(last_archived)
+            await redis_client.xtrim(stream, minid=f"{milliseconds}-{sequence + 1}", approximate=False)
+        return len(entries)
+    finally:
+        # A lock that expired mid-run may already belong to another replica
+        await redis_client.eval(RELEASE_LOCK_SCRIPT, 1, ARCHIVE_LOCK_KEY, token)
+
+
+async def run_archiver(get_client, stream: str, keep: int):
+    """Background task archiving the stream overflow every ARCHIVE_INTERVAL_SECONDS"""
+    logger.info(f"Archiving chat history beyond {keep} messages to {CHAT_ARCHIVE_DIR}")
+    while True:
+        try:
+            redis_client = await get_client()
+            while await archive_once(redis_client, stream, keep) >= ARCHIVE_BATCH_SIZE:
+                pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Chat archival failed: {e}")
+        await asyncio.sleep(ARCHIVE_INTERVAL_SECONDS)
@@ -0,0 +1,80 @@
+"""
+Storage format of structured chat entities
+Intents and comments are stored either as one JSON field per entity or as
+flattened stream fields ("intent.summary", "comment.kind", ...) that reads
+rebuild without JSON parsing. Both formats are always readable.
+With FAST_JSON stored JSON is embedded into responses as is, which is cheaper
+than rebuilding flat fields, so "auto" picks json then and flat otherwise.
+"""
+import os
+import json
+from typing import Any, Dict, Optional, Type
+
+from pydantic import BaseModel
+
+from app.schemas import EditComment, EditIntent
+from app import serialization
+
+# auto, flat or json
+CHAT_ENTITY_FORMAT = os.getenv("CHAT_ENTITY_FORMAT", "auto").lower()
+
+ENTITY_MODELS: Dict[str, Type[BaseModel]] = {"intent": EditIntent, "comment": EditComment}
+# Stream field of the entity ID, whose presence marks the flat format
+_ID_KEYS = {"intent": "intent.intent_id", "comment": "comment.comment_id"}
+# (entity field, stream field) pairs, precomputed for the read path
+_FIELD_KEYS = {
+    name: [(field, f"{name}.{field}") for field in model.model_fields]
+    for name, model in ENTITY_MODELS.items()
+}
+
+
+def encode_entity(name: str, entity: BaseModel) -> Dict[str, str]:
+    """Stream fields for an entity in CHAT_ENTITY_FORMAT; None values are omitted"""
+    entity_format = CHAT_ENTITY_FORMAT
+    if entity_format == "auto":
+        entity_format = "json" if serialization.FAST_JSON else "flat"
+    if entity_format == "json":
+        return {name: entity.model_dump_json()}
+    return {
+        f"{name}.{field}": str(value)
+        for field, value in entity.model_dump(mode="json").items()
+        if value is not None
+    }
+
+
+def decode_entity(name: str, data: Dict[str, str]) -> Optional[Any]:
+    """Entity as a response value from stream fields in either format (None if absent or broken)"""
+    if _ID_KEYS[name] in data:
+        entity = {field: data.get(key) for field, key in _FIELD_KEYS[name]}
+        # created_at is the only numeric field of intents and comments
+        try:
+            entity["created_at"] = float(entity["created_at"])
+        except (TypeError, ValueError):
+            return None
+        return entity
+    if name in data:
+        return parse_entity(data[name])
+    return None
+
+
+def entity_field(name: str, data: Dict[str, str], field: str) -> Optional[Any]:
+    """One field of a stored entity in either format, without building the whole entity"""
+    value = data.get(f"{name}.{field}")
+    if value is not None or name not in data:
+        return value
+    try:
+        entity = json.loads(data[name])
+    except json.JSONDecodeError:
+        return None
+    return entity.get(field) if isinstance(entity, dict) else None
+
+
+def parse_entity(value: str) -> Optional[Any]:
+    """Entity stored as JSON as a response value (None if it cannot be decoded)"""
+    # With FAST_JSON it is embedded into the response without parsing
+    if serialization.FAST_JSON:
+        return serialization.raw_json(value)
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return None
@@ -0,0 +1,107 @@
+"""
+Fan-out of new chat messages to long-lived clients
+Each process runs at most one XREAD BLOCK loop on the stream and hands new
+entries to in-memory subscriber queues, so SSE and long-poll clients do not
+hold a Redis connection each. The loop starts with the first subscriber and
+stops after the last one leaves.
+"""
+import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Set, Tuple
+
+from app.metrics import STREAM_SUBSCRIBERS
+
+logger = logging.getLogger(__name__)
+
+# Must stay below REDIS_SOCKET_TIMEOUT, the read blocks on a pooled connection
+FANOUT_BLOCK_MS = int(os.getenv("FANOUT_BLOCK_MS", "2000"))
+FANOUT_BATCH_SIZE = 100
+# Entries buffered per subscriber; a subscriber falling further behind is dropped
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("SUBSCRIBER_QUEUE_SIZE", "1000"))
+
+
+class Subscription:
+    """New stream entries for one client, optionally limited to a document"""
+
+    def __init__(self, document_id: Optional[str]):
+        self.document_id = document_id
+        self.queue: "asyncio.Queue[Tuple[str, Dict[str, str]]]" = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        # Set when the queue overflowed; the client has to catch up from storage
+        self.overflowed = False
+
+    def deliver(self, message_id: str, data: Dict[str, str]) -> bool:
+        if self.document_id and data.get("document_id") != self.document_id:
+            return True
+        try:
+            self.queue.put_nowait((message_id, data))
+            return True
+        except asyncio.QueueFull:
+            # The consumer drains the full queue before noticing, so it is never left waiting
+            self.overflowed = True
+            return False
+
+
+class MessageFanout:
+    """Shared stream reader delivering new entries to local subscriptions"""
+
+    def __init__(self, get_client, stream: str):
+        self.get_client = get_client
+        self.stream = stream
+        self.subscriptions: Set[Subscription] = set()
+        self.task: Optional[asyncio.Task] = None
+
+    @asynccontextmanager
+    async def subscribe(self, document_id: Optional[str] = None):
+        subscription = Subscription(document_id)
+        self.subscriptions.add(subscription)
+        STREAM_SUBSCRIBERS.inc()
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+        try:
+            yield subscription
+        finally:
+            self.subscriptions.discard(subscription)
+            STREAM_SUBSCRIBERS.dec()
+
+    async def close(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def publish(self, message_id: str, data: Dict[str, str]):
+        for subscription in list(self.subscriptions):
+            if not subscription.deliver(message_id, data):
+                self.subscriptions.discard(subscription)
+
+    async def _run(self):
+        last_id = None
+        while True:
+            try:
+                redis_client = await self.get_client()
+                if last_id is None:
+                    # Start after the current last entry, so nothing posted from now on is missed
+                    newest = await redis_client.xrevrange(self.stream, max="+", min="-", count=1)
+                    last_id = newest[0][0] if newest else "0-0"
+                response = await redis_client.xread(
+                    {self.stream: last_id}, count=FANOUT_BATCH_SIZE, block=FANOUT_BLOCK_MS
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Chat fan-out read failed: {e}")
+                await asyncio.sleep(1)
+                response = []
+            for _, entries in response or []:
+                for message_id, data in entries:
+                    last_id = message_id
+                    self.publish(message_id, data)
+            # Checked without awaiting after it, so a new subscriber either sees the task or starts one
+            if not self.subscriptions:
+                self.task = None
+                return
@@ -0,0 +1,84 @@
+"""
+Registry of live edit intents per document
+Intents posted in chat are mirrored into a Redis hash (intent_id -> intent JSON)
+with a sorted set of expiry times, so active intents and anchor conflicts can be
+looked up without scanning the message stream.
+"""
+import os
+import re
+import time
+from typing import List, Optional
+
+import redis.asyncio as redis
+
+from app.schemas import EditIntent, IntentStatus
+
+# Matches the window agents use for "recent" intents
+INTENT_TTL_SECONDS = float(os.getenv("INTENT_TTL_SECONDS", "60"))
+ACTIVE_STATUSES = {IntentStatus.PROPOSED, IntentStatus.CONFIRMED}
+# Anchors sharing this many consecutive words are considered overlapping
+OVERLAP_MIN_WORDS = 3
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def intent_keys(document_id: Optional[str]) -> tuple:
+    """(hash, expiry zset) keys of a document's registry"""
+    base = f"chat:intents:{document_id or '*'}"
+    return base, f"{base}:expiry"
+
+
+def register_intent(pipe: redis.client.Pipeline, document_id: Optional[str], intent: EditIntent):
+    """Queue registry updates for an intent posted with a message"""
+    intents_key, expiry_key = intent_keys(document_id)
+    if intent.status in ACTIVE_STATUSES:
+        pipe.hset(intents_key, intent.intent_id, intent.model_dump_json())
+        pipe.zadd(expiry_key, {intent.intent_id: time.time() + INTENT_TTL_SECONDS})
+        # Registries of idle documents disappear on their own
+        pipe.expire(intents_key, int(INTENT_TTL_SECONDS * 2))
+        pipe.expire(expiry_key, int(INTENT_TTL_SECONDS * 2))
+    else:
+        pipe.hdel(intents_key, intent.intent_id)
+        pipe.zrem(expiry_key, intent.intent_id)
+
+
+async def active_intents(redis_client: redis.Redis, document_id: Optional[str]) -> List[EditIntent]:
+    """Non-expired proposed/confirmed intents of a document, oldest registration first"""
+    intents_key, expiry_key = intent_keys(document_id)
+    now = time.time()
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.zrangebyscore(expiry_key, "-inf", now)
+        pipe.zrangebyscore(expiry_key, f"({now}", "+inf")
+        expired, live = await pipe.execute()
+    if expired:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(expiry_key, "-inf", now)
+            pipe.hdel(intents_key, *expired)
+            await pipe.execute()
+    if not live:
+        return []
+    values = await redis_client.hmget(intents_key, live)
+    # An intent re-registered while being pruned may lack its hash entry; it is skipped
+    return [EditIntent.model_validate_json(value) for value in values if value]
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.casefold())
+
+
+def anchors_overlap(first: Optional[str], second: Optional[str]) -> bool:
+    """
+    Whether two anchors likely target the same text: one contains the other
+    (ignoring case and whitespace) or they share OVERLAP_MIN_WORDS consecutive words
+    """
+    if not first or not second:
+        return False
+    first_words, second_words = _words(first), _words(second)
+    if not first_words or not second_words:
+        return False
+    first_joined, second_joined = f" {' '.join(first_words)} ", f" {' '.join(second_words)} "
+    if first_joined in second_joined or second_joined in first_joined:
+        return True
+    size = OVERLAP_MIN_WORDS
+    shingles = {tuple(first_words[i:i + size]) for i in range(len(first_words) - size + 1)}
+    return any(tuple(second_words[i:i + size]) in shingles for i in range(len(second_words) - size + 1))
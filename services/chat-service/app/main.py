@@ -3,28 +3,59 @@ Chat Service - Agent coordination service
 FastAPI application with Redis Streams
 """
 import os
-import json
+import re
+import asyncio
+import contextlib
 import logging
-from typing import List, Optional
-from datetime import datetime
+from typing import List, Literal, Optional
+from datetime import datetime, timezone
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import redis.asyncio as redis
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest, multiprocess
 
-from app.redis_client import get_redis, close_redis
+from app.redis_client import get_redis, close_redis, observe_pool, redis_healthy, refresh_health, run_health_checker
+from app.serialization import FastJSONResponse, dumps
+from app.encoding import decode_entity, encode_entity
+from app.metrics import MESSAGES_TOTAL, REDIS_COMMAND_SECONDS, STREAM_LENGTH, MetricsMiddleware
 from app.schemas import (
     ChatMessageRequest,
     ChatMessageResponse,
     ChatMessage,
+    ChatCursor,
+    ChatSummary,
+    ChatMessageBatchRequest,
+    ChatMessageBatchResponse,
+    EditIntent,
+    IntentCheckRequest,
+    IntentCheckResponse,
 )
+from app import archive as chat_archive
+from app.archive import parse_id, parse_start, read_range, run_archiver, stream_maxlen
+from app.fanout import MessageFanout
+from app.summary import SUMMARY_LINES, get_summary, summary_response
+from app.intents import active_intents, anchors_overlap, register_intent
+from app.views import index_messages, matches, read_view, select_view, view_start
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 STREAM_NAME = "chat:messages"
-MAX_MESSAGES = 1000
+MAX_MESSAGES = int(os.getenv("MAX_MESSAGES", "1000"))
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "100"))
+# Hash of last-seen stream IDs, field "<agent_id>:<document_id or *>"
+CURSORS_KEY = "chat:cursors"
+STREAM_ID_RE = re.compile(r"^\d+-\d+$")
+# Longest wait=<seconds> accepted by long polling reads
+MAX_WAIT_SECONDS = float(os.getenv("MAX_WAIT_SECONDS", "30"))
+# SSE comment sent when no message arrived for this long, keeps proxies from closing the stream
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+message_fanout = MessageFanout(get_redis, STREAM_NAME)
 
 
 @asynccontextmanager
@@ -34,11 +65,22 @@ async def lifespan(app: FastAPI):
     logger.info("Chat Service starting")
     redis_client = await get_redis()
     logger.info(f"Connected to Redis: {os.getenv('REDIS_URL', 'redis://localhost:6379')}")
+    await refresh_health()
+    health_checker = asyncio.create_task(run_health_checker())
+    archiver = None
+    if chat_archive.archive is not None:
+        archiver = asyncio.create_task(run_archiver(get_redis, STREAM_NAME, MAX_MESSAGES))
     
     yield
     
     # Shutdown
     logger.info("Chat Service shutting down")
+    await message_fanout.close()
+    for task in (archiver, health_checker):
+        if task:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
     await close_redis()
 
 
@@ -47,6 +89,7 @@ app = FastAPI(
     description="Agent coordination service",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # Configure CORS
@@ -56,19 +99,127 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Chat-Cursor"],
 )
 
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024")))
+app.add_middleware(MetricsMiddleware)
+
+
+def decode_message(raw_msg_id, msg_data) -> dict:
+    """Stream entry as a response dict; the shape matches ChatMessage"""
+    if isinstance(raw_msg_id, bytes):
+        raw_msg_id = raw_msg_id.decode()
+        msg_data = {key.decode(): value.decode() for key, value in msg_data.items()}
+    return {
+        "document_id": msg_data.get("document_id"),
+        "message_id": raw_msg_id,
+        "agent_id": msg_data.get("agent_id", "unknown"),
+        "agent_role": msg_data.get("agent_role"),
+        "message": msg_data.get("message", ""),
+        "timestamp": msg_data.get("timestamp", ""),
+        "intent": decode_entity("intent", msg_data),
+        "comment": decode_entity("comment", msg_data),
+    }
+
+
+def stored_message(raw_msg_id, msg_data) -> dict:
+    """Stream entry with its fields as stored, for raw=true reads"""
+    if isinstance(raw_msg_id, bytes):
+        raw_msg_id = raw_msg_id.decode()
+        msg_data = {key.decode(): value.decode() for key, value in msg_data.items()}
+    return {"message_id": raw_msg_id, **msg_data}
+
+
+def build_message_data(request: ChatMessageRequest) -> dict:
+    """Stream entry fields for a posted message"""
+    message_data = {
+        "agent_id": request.agent_id,
+        "message": request.message,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+    if request.document_id:
+        message_data["document_id"] = request.document_id
+    if request.agent_role:
+        message_data["agent_role"] = request.agent_role
+    
+    # Add structured entities if present
+    if request.intent:
+        message_data.update(encode_entity("intent", request.intent))
+    
+    if request.comment:
+        message_data.update(encode_entity("comment", request.comment))
+    return message_data
+
+
+def queue_message(pipe: redis.client.Pipeline, request: ChatMessageRequest, message_data: dict):
+    """Queue XADD (and intent registry updates) on a pipeline; the XADD result comes first"""
+    # Add message to Redis Stream with MAXLEN limit
+    # The ~ makes MAXLEN approximate for better performance
+    pipe.xadd(
+        STREAM_NAME,
+        message_data,
+        maxlen=stream_maxlen(MAX_MESSAGES),
+        approximate=True,
+    )
+    if request.intent:
+        register_intent(pipe, request.document_id, request.intent)
+
+
+def since_to_stream_id(since: str) -> str:
+    """
+    First stream ID at or after an ISO timestamp (or a message ID as is)
+    Naive timestamps are UTC, as written by post_message; raises ValueError
+    """
+    if STREAM_ID_RE.match(since):
+        return since
+    dt = datetime.fromisoformat(since.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    # Redis Stream IDs are in format: <milliseconds>-<sequence>
+    return f"{int(dt.timestamp() * 1000)}-0"
+
+
+def cursor_field(agent_id: str, document_id: Optional[str]) -> str:
+    return f"{agent_id}:{document_id or '*'}"
+
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint; reports the Redis state refreshed in the background"""
+    if not await redis_healthy():
+        raise HTTPException(status_code=503, detail="Redis connection failed")
+    return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(redis_client: redis.Redis = Depends(get_redis)):
+    """Prometheus metrics"""
+    observe_pool(redis_client)
     try:
-        redis_client = await get_redis()
-        await redis_client.ping()
-        return {"status": "healthy"}
+        with REDIS_COMMAND_SECONDS.labels(command="xlen").time():
+            STREAM_LENGTH.labels(stream=STREAM_NAME).set(await redis_client.xlen(STREAM_NAME))
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
-        raise HTTPException(status_code=503, detail="Redis connection failed")
+        logger.warning(f"Failed to read stream length: {e}")
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # Several uvicorn workers: aggregate the metrics files of all of them
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), headers={"Content-Type": CONTENT_TYPE_LATEST})
+    return Response(generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
+async def index_posted(redis_client: redis.Redis, entries: list):
+    """
+    Add posted messages to the secondary views
+    XADD returns the IDs the views store, so this is a second round trip; a failure
+    leaves the message posted and only missing from filtered reads
+    """
+    try:
+        with REDIS_COMMAND_SECONDS.labels(command="index").time():
+            await index_messages(redis_client, entries)
+    except Exception as e:
+        logger.error(f"Failed to index messages {[message_id for message_id, _ in entries]}: {e}")
 
 
 @app.post("/api/chat/messages", response_model=ChatMessageResponse)
@@ -81,32 +232,15 @@ async def post_message(
     Automatically limits to 1000 most recent messages
     """
     try:
-        # Prepare message data
-        message_data = {
-            "agent_id": request.agent_id,
-            "message": request.message,
-            "timestamp": datetime.utcnow().isoformat(),
-        }
-        if request.document_id:
-            message_data["document_id"] = request.document_id
-        if request.agent_role:
-            message_data["agent_role"] = request.agent_role
-        
-        # Add structured entities if present
-        if request.intent:
-            message_data["intent"] = request.intent.model_dump_json()
+        message_data = build_message_data(request)
         
-        if request.comment:
-            message_data["comment"] = request.comment.model_dump_json()
-        
-        # Add message to Redis Stream with MAXLEN limit
-        # The ~ makes MAXLEN approximate for better performance
-        message_id = await redis_client.xadd(
-            STREAM_NAME,
-            message_data,
-            maxlen=MAX_MESSAGES,
-            approximate=True,
-        )
+        # Intents are mirrored into the per-document registry in the same round trip
+        with REDIS_COMMAND_SECONDS.labels(command="xadd").time():
+            async with redis_client.pipeline(transaction=False) as pipe:
+                queue_message(pipe, request, message_data)
+                message_id = (await pipe.execute())[0]
+        MESSAGES_TOTAL.inc()
+        await index_posted(redis_client, [(message_id, message_data)])
         
         logger.info(f"Message posted by {request.agent_id}: {message_id}")
         
@@ -120,84 +254,341 @@ async def post_message(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/chat/messages/batch", response_model=ChatMessageBatchResponse)
+async def post_messages_batch(
+    request: ChatMessageBatchRequest,
+    redis_client: redis.Redis = Depends(get_redis)
+):
+    """
+    Post several messages in one Redis pipeline (MULTI/EXEC with atomic=true)
+    Returns message IDs in request order
+    """
+    if not request.messages:
+        raise HTTPException(status_code=400, detail="messages must not be empty")
+    if len(request.messages) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} messages per batch")
+    try:
+        entries = [build_message_data(message) for message in request.messages]
+        with REDIS_COMMAND_SECONDS.labels(command="xadd_batch").time():
+            async with redis_client.pipeline(transaction=request.atomic) as pipe:
+                # Position of each message's XADD among the pipeline results
+                offsets = []
+                for message, message_data in zip(request.messages, entries):
+                    offsets.append(len(pipe.command_stack))
+                    queue_message(pipe, message, message_data)
+                results = await pipe.execute()
+        MESSAGES_TOTAL.inc(len(entries))
+        await index_posted(redis_client, [(results[offset], data) for offset, data in zip(offsets, entries)])
+
+        logger.info(f"Batch of {len(entries)} messages posted (atomic={request.atomic})")
+
+        return ChatMessageBatchResponse(
+            messages=[
+                ChatMessageResponse(message_id=results[offset], timestamp=message_data["timestamp"])
+                for offset, message_data in zip(offsets, entries)
+            ]
+        )
+
+    except Exception as e:
+        logger.error(f"Error posting message batch: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def read_page(redis_client: redis.Redis, start_id: str, filters: dict, limit: int, raw: bool) -> tuple:
+    """
+    (messages passing the filters, ID of the last scanned entry or None) for one page from start_id
+    Filters with a secondary view read only the view's entries instead of the stream,
+    once the page starts at or after the oldest entry the view still holds
+    """
+    view = select_view(**filters)
+    oldest = await view_start(redis_client, view) if view else None
+    if oldest and parse_start(start_id)[0] >= parse_id(oldest):
+        entries, last_id = await read_view(redis_client, STREAM_NAME, view, start_id, limit)
+    else:
+        # History before the view's oldest member (trimmed, expired or never indexed) is scanned
+        entries = await read_range(redis_client, STREAM_NAME, start_id, limit)
+        if oldest:
+            entries = [entry for entry in entries if parse_id(entry[0]) < parse_id(oldest)]
+        last_id = entries[-1][0] if entries else None
+        if oldest and len(entries) < limit:
+            # The scan reached the view: the rest of the page comes from it
+            rest, rest_last_id = await read_view(redis_client, STREAM_NAME, view, oldest, limit - len(entries))
+            entries += rest
+            last_id = rest_last_id or last_id
+    shape = stored_message if raw else decode_message
+    result = [shape(message_id, data) for message_id, data in entries if matches(data, **filters)]
+    return result, last_id
+
+
 @app.get("/api/chat/messages", response_model=List[ChatMessage])
 async def get_messages(
     since: Optional[str] = None,
+    cursor: Optional[str] = None,
     document_id: Optional[str] = None,
+    agent_id: Optional[str] = None,
+    message_type: Optional[Literal["intent", "comment"]] = Query(None, alias="type"),
+    intent_id: Optional[str] = None,
     limit: int = 100,
+    raw: bool = False,
+    wait: float = 0,
     redis_client: redis.Redis = Depends(get_redis)
 ):
     """
-    Get chat messages since timestamp
+    Get chat messages after a cursor or since a timestamp
     Uses Redis XRANGE to retrieve messages
+    The X-Next-Cursor header holds the cursor for the following page; it also
+    advances past messages filtered out by document_id, so pages never overlap.
+    With raw=true entries are returned with their stored fields, without reshaping
+    With wait=<seconds> an empty page is held until a matching message is posted (long polling)
+    agent_id, type=intent|comment and intent_id (comments targeting it) are served
+    from secondary views, so the page costs O(result) rather than O(history)
     """
+    filters = {"document_id": document_id, "agent_id": agent_id, "message_type": message_type, "intent_id": intent_id}
+    if cursor:
+        if not STREAM_ID_RE.match(cursor):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # Exclusive: the cursor message was returned on the previous page
+        start_id = f"({cursor}"
+    elif since:
+        try:
+            start_id = since_to_stream_id(since)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="since must be an ISO timestamp or a message ID")
+    else:
+        # Get all messages
+        start_id = "-"
+
     try:
-        # Determine start ID
-        if since:
-            # Convert ISO timestamp to message ID
-            # Redis Stream IDs are in format: timestamp-sequence
-            # We convert ISO timestamp to milliseconds
-            try:
-                dt = datetime.fromisoformat(since.replace('Z', '+00:00'))
-                timestamp_ms = int(dt.timestamp() * 1000)
-                start_id = f"{timestamp_ms}-0"
-            except (ValueError, AttributeError):
-                # If can't parse, treat as message ID
-                start_id = since
-        else:
-            # Get all messages
-            start_id = "-"
-        
-        # Get messages from Redis Stream
-        messages = await redis_client.xrange(
-            STREAM_NAME,
-            min=start_id,
-            max="+",
-            count=limit,
-        )
-        
-        # Parse messages
-        result = []
-        for raw_msg_id, msg_data in messages:
-            decoded_data = {}
-            for key, value in msg_data.items():
-                clean_key = key.decode() if isinstance(key, bytes) else key
-                decoded_value = value.decode() if isinstance(value, bytes) else value
-                decoded_data[clean_key] = decoded_value
-
-            if document_id and decoded_data.get("document_id") != document_id:
-                continue
-            # Parse structured entities
-            intent = None
-            comment = None
-            
-            if "intent" in decoded_data:
-                try:
-                    intent = json.loads(decoded_data["intent"])
-                except (json.JSONDecodeError, KeyError):
-                    pass
-            
-            if "comment" in decoded_data:
-                try:
-                    comment = json.loads(decoded_data["comment"])
-                except (json.JSONDecodeError, KeyError):
-                    pass
-            
-            result.append(ChatMessage(
-                document_id=decoded_data.get("document_id"),
-                message_id=raw_msg_id.decode() if isinstance(raw_msg_id, bytes) else raw_msg_id,
-                agent_id=decoded_data.get("agent_id", "unknown"),
-                agent_role=decoded_data.get("agent_role"),
-                message=decoded_data.get("message", ""),
-                timestamp=decoded_data.get("timestamp", ""),
-                intent=intent,
-                comment=comment,
-            ))
-        
-        logger.info(f"Retrieved {len(result)} messages (since={since}, limit={limit})")
+        # Get messages from Redis Stream, continuing into archived history
+        result, last_id = await read_page(redis_client, start_id, filters, limit, raw)
+        next_cursor = last_id or cursor or ""
+
+        if wait > 0 and not result:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + min(wait, MAX_WAIT_SECONDS)
+            # New messages come from the shared stream reader, not a blocking read per request
+            async with message_fanout.subscribe(document_id) as subscription:
+                while not result:
+                    # Re-read after subscribing, so a message posted in between is not missed
+                    result, last_id = await read_page(
+                        redis_client, f"({next_cursor}" if next_cursor else start_id, filters, limit, raw
+                    )
+                    next_cursor = last_id or next_cursor
+                    remaining = deadline - loop.time()
+                    if result or remaining <= 0:
+                        break
+                    try:
+                        await asyncio.wait_for(subscription.queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+
+        logger.info(f"Retrieved {len(result)} messages (start={start_id}, limit={limit})")
         
-        return result
+        # Without scanned messages or a cursor the client keeps its since/start position
+        return FastJSONResponse(result, headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
     
     except Exception as e:
         logger.error(f"Error retrieving messages: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def sse_event(message: dict) -> bytes:
+    return b"id: " + message["message_id"].encode() + b"\ndata: " + dumps(message) + b"\n\n"
+
+
+@app.get("/api/chat/messages/stream")
+async def stream_messages(
+    document_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    raw: bool = False,
+    last_event_id: Optional[str] = Header(None),
+    redis_client: redis.Redis = Depends(get_redis)
+):
+    """
+    Server-sent events with new chat messages
+    Starts after cursor (or the Last-Event-ID of a reconnecting EventSource), otherwise
+    with messages posted from now on. Each event id is the message ID.
+    """
+    cursor = cursor or last_event_id
+    if cursor and not STREAM_ID_RE.match(cursor):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    shape = stored_message if raw else decode_message
+
+    async def events():
+        last_id = cursor
+        if last_id is None:
+            newest = await redis_client.xrevrange(STREAM_NAME, max="+", min="-", count=1)
+            last_id = newest[0][0] if newest else "0-0"
+        while True:
+            async with message_fanout.subscribe(document_id) as subscription:
+                # Catch up from storage; entries also queued meanwhile are skipped by ID
+                while True:
+                    entries = await read_range(redis_client, STREAM_NAME, f"({last_id}", 100)
+                    for message_id, data in entries:
+                        last_id = message_id
+                        if not document_id or data.get("document_id") == document_id:
+                            yield sse_event(shape(message_id, data))
+                    if len(entries) < 100:
+                        break
+                while not subscription.overflowed or not subscription.queue.empty():
+                    try:
+                        message_id, data = await asyncio.wait_for(subscription.queue.get(), SSE_HEARTBEAT_SECONDS)
+                    except asyncio.TimeoutError:
+                        yield b": keepalive\n\n"
+                        continue
+                    if parse_id(message_id) <= parse_id(last_id):
+                        continue
+                    last_id = message_id
+                    yield sse_event(shape(message_id, data))
+            # Fell too far behind the live stream: resubscribe and catch up from storage
+            logger.warning(f"SSE client behind the stream, catching up from {last_id}")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # identity keeps GZipMiddleware from buffering events
+        headers={"Cache-Control": "no-cache", "Content-Encoding": "identity", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/chat/messages/unread", response_model=List[ChatMessage])
+async def get_unread_messages(
+    agent_id: str,
+    document_id: Optional[str] = None,
+    limit: int = 100,
+    include_own: bool = True,
+    ack: bool = True,
+    raw: bool = False,
+    redis_client: redis.Redis = Depends(get_redis)
+):
+    """
+    Messages the agent has not read yet, oldest first
+    The agent's last-seen stream ID is kept in Redis and reads start right after it
+    (exclusive XRANGE), so a polling cycle costs O(new messages) instead of O(history).
+    With ack=false the cursor is not advanced; commit it later via PUT /api/chat/cursors.
+    The cursor after this read is returned in the X-Chat-Cursor header.
+    raw=true returns stored fields as in GET /api/chat/messages.
+    """
+    field = cursor_field(agent_id, document_id)
+    try:
+        with REDIS_COMMAND_SECONDS.labels(command="hget").time():
+            last_seen = await redis_client.hget(CURSORS_KEY, field)
+        cursor = last_seen
+
+        shape = stored_message if raw else decode_message
+        result = []
+        exhausted = False
+        while len(result) < limit and not exhausted:
+            entries = await read_range(redis_client, STREAM_NAME, f"({cursor}" if cursor else "-", limit)
+            exhausted = len(entries) < limit
+            for raw_msg_id, msg_data in entries:
+                message = shape(raw_msg_id, msg_data)
+                # Skipped messages (other documents, own) count as read too
+                cursor = message["message_id"]
+                if document_id and message.get("document_id") != document_id:
+                    continue
+                if not include_own and message.get("agent_id") == agent_id:
+                    continue
+                result.append(message)
+                if len(result) >= limit:
+                    break
+
+        if ack and cursor and cursor != last_seen:
+            with REDIS_COMMAND_SECONDS.labels(command="hset").time():
+                await redis_client.hset(CURSORS_KEY, field, cursor)
+
+        logger.info(f"Retrieved {len(result)} unread messages for {field} (cursor={cursor})")
+
+        return FastJSONResponse(result, headers={"X-Chat-Cursor": cursor or ""})
+
+    except Exception as e:
+        logger.error(f"Error retrieving unread messages: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/chat/cursors/{agent_id}", response_model=ChatCursor)
+async def get_cursor(
+    agent_id: str,
+    document_id: Optional[str] = None,
+    redis_client: redis.Redis = Depends(get_redis)
+):
+    """Last message ID read by the agent (null if it has not read yet)"""
+    with REDIS_COMMAND_SECONDS.labels(command="hget").time():
+        message_id = await redis_client.hget(CURSORS_KEY, cursor_field(agent_id, document_id))
+    return ChatCursor(agent_id=agent_id, document_id=document_id, message_id=message_id)
+
+
+@app.put("/api/chat/cursors/{agent_id}", response_model=ChatCursor)
+async def set_cursor(
+    agent_id: str,
+    cursor: ChatCursor,
+    redis_client: redis.Redis = Depends(get_redis)
+):
+    """
+    Commit a cursor after processing messages read with ack=false, or move it back
+    (message_id "0-0" re-reads the whole stream; null removes the cursor)
+    """
+    field = cursor_field(agent_id, cursor.document_id)
+    if cursor.message_id is None:
+        with REDIS_COMMAND_SECONDS.labels(command="hdel").time():
+            await redis_client.hdel(CURSORS_KEY, field)
+    else:
+        if not STREAM_ID_RE.match(cursor.message_id):
+            raise HTTPException(status_code=400, detail="message_id must be a stream ID like 1700000000000-0")
+        with REDIS_COMMAND_SECONDS.labels(command="hset").time():
+            await redis_client.hset(CURSORS_KEY, field, cursor.message_id)
+    return ChatCursor(agent_id=agent_id, document_id=cursor.document_id, message_id=cursor.message_id)
+
+
+@app.get("/api/chat/intents", response_model=List[EditIntent])
+async def get_active_intents(
+    document_id: Optional[str] = None,
+    redis_client: redis.Redis = Depends(get_redis)
+):
+    """Proposed and confirmed intents of a document that have not expired"""
+    with REDIS_COMMAND_SECONDS.labels(command="intents").time():
+        intents = await active_intents(redis_client, document_id)
+    return intents
+
+
+@app.post("/api/chat/intents/check", response_model=IntentCheckResponse)
+async def check_intent(
+    request: IntentCheckRequest,
+    redis_client: redis.Redis = Depends(get_redis)
+):
+    """
+    Check a proposed anchor against active intents of other agents
+    before spending tokens on an edit that would collide
+    """
+    with REDIS_COMMAND_SECONDS.labels(command="intents").time():
+        intents = await active_intents(redis_client, request.document_id)
+    conflicts = [
+        intent
+        for intent in intents
+        if intent.intent_id != request.intent_id
+        and (request.agent_id is None or intent.agent_id != request.agent_id)
+        and anchors_overlap(intent.anchor, request.anchor)
+    ]
+    return IntentCheckResponse(conflict=bool(conflicts), conflicts=conflicts, active_count=len(intents))
+
+
+@app.get("/api/chat/summary", response_model=ChatSummary)
+async def get_chat_summary(
+    document_id: Optional[str] = None,
+    lines: int = SUMMARY_LINES,
+    redis_client: redis.Redis = Depends(get_redis)
+):
+    """
+    Last formatted chat lines and intent/comment counts for agent prompts
+    Stored in Redis and only extended with new messages, so all agents and
+    replicas share one computation per document
+    """
+    if lines > SUMMARY_LINES:
+        raise HTTPException(status_code=400, detail=f"At most {SUMMARY_LINES} lines are kept")
+    try:
+        with REDIS_COMMAND_SECONDS.labels(command="summary").time():
+            summary = await get_summary(redis_client, STREAM_NAME, document_id)
+        return FastJSONResponse(summary_response(summary, lines))
+    except Exception as e:
+        logger.error(f"Error building chat summary: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
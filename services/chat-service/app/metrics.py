@@ -0,0 +1,70 @@
+"""
+Prometheus metrics for Chat Service
+Request latency, Redis commands and pool, stream length and subscribers.
+"""
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "chat_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REDIS_COMMAND_SECONDS = Histogram(
+    "chat_redis_command_seconds",
+    "Redis command latency",
+    ["command"],
+    buckets=LATENCY_BUCKETS,
+)
+MESSAGES_TOTAL = Counter("chat_messages_posted_total", "Messages posted to the stream")
+ARCHIVED_MESSAGES_TOTAL = Counter("chat_messages_archived_total", "Messages moved from the stream to archive segments")
+STREAM_LENGTH = Gauge("chat_stream_length", "Entries in the chat stream", ["stream"])
+REDIS_POOL_CONNECTIONS = Gauge("chat_redis_pool_connections", "Redis pool connections by state", ["state"])
+REDIS_POOL_MAX_CONNECTIONS = Gauge("chat_redis_pool_max_connections", "Redis pool size limit")
+STREAM_SUBSCRIBERS = Gauge(
+    "chat_stream_subscribers", "Clients waiting for new messages (SSE and long poll)", multiprocess_mode="livesum"
+)
+REDIS_HEALTHY = Gauge("chat_redis_healthy", "Result of the last background Redis ping (1 healthy)")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware observing time to the response start, labelled by route template.
+    SSE streams and long polls stay open after that; their lifetime is not latency.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        observed = False
+
+        def observe(status_code: int):
+            nonlocal observed
+            observed = True
+            route = getattr(scope.get("route"), "path", "unmatched")
+            if route != "/metrics":
+                HTTP_REQUEST_SECONDS.labels(scope["method"], route, str(status_code)).observe(
+                    time.perf_counter() - start
+                )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                observe(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not observed:
+                observe(500)
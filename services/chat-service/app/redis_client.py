@@ -1,34 +1,111 @@
 """
 Redis client and connection management
+One bounded, blocking connection pool per process with keepalive and retries
+with exponential backoff, plus a Redis health state refreshed in the background
+so load-balancer probes do not hit Redis.
 """
 import os
+import time
+import asyncio
+import logging
 import redis.asyncio as redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, TimeoutError
 from typing import Optional
 
+from app.metrics import REDIS_HEALTHY, REDIS_POOL_CONNECTIONS, REDIS_POOL_MAX_CONNECTIONS
+
+logger = logging.getLogger(__name__)
+
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+# Seconds a request waits for a free pooled connection before failing
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "5"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "2"))
+REDIS_RETRIES = int(os.getenv("REDIS_RETRIES", "3"))
+REDIS_HEALTH_INTERVAL = float(os.getenv("REDIS_HEALTH_INTERVAL", "5"))
 
 # Global Redis client
 _redis_client: Optional[redis.Redis] = None
+# Result of the last background ping: (healthy, monotonic time of the check)
+_health: Optional[tuple] = None
+
+
+def create_pool() -> redis.BlockingConnectionPool:
+    """Connection pool that waits for a free connection instead of opening more than the limit"""
+    return redis.BlockingConnectionPool.from_url(
+        REDIS_URL,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+        socket_keepalive=True,
+        # Idle connections are pinged before reuse after this many seconds
+        health_check_interval=30,
+        retry=Retry(ExponentialBackoff(cap=1.0, base=0.05), REDIS_RETRIES),
+        retry_on_error=[ConnectionError, TimeoutError],
+        retry_on_timeout=True,
+        encoding="utf-8",
+        decode_responses=True,
+    )
 
 
 async def get_redis() -> redis.Redis:
     """Get Redis client instance"""
     global _redis_client
-    
+
     if _redis_client is None:
-        _redis_client = redis.from_url(
-            REDIS_URL,
-            encoding="utf-8",
-            decode_responses=True,
-        )
-    
+        _redis_client = redis.Redis(connection_pool=create_pool())
+
     return _redis_client
 
 
 async def close_redis():
     """Close Redis connection"""
     global _redis_client
-    
+
     if _redis_client:
         await _redis_client.close()
+        await _redis_client.connection_pool.disconnect()
         _redis_client = None
+
+
+def observe_pool(redis_client: redis.Redis):
+    """Export pool usage to the pool gauges"""
+    pool = redis_client.connection_pool
+    # Pools of test doubles may not track connections
+    in_use = len(getattr(pool, "_in_use_connections", ()))
+    idle = len(getattr(pool, "_available_connections", ()))
+    REDIS_POOL_CONNECTIONS.labels(state="in_use").set(in_use)
+    REDIS_POOL_CONNECTIONS.labels(state="idle").set(idle)
+    REDIS_POOL_MAX_CONNECTIONS.set(getattr(pool, "max_connections", 0) or 0)
+
+
+async def refresh_health() -> bool:
+    """Ping Redis and store the result as the current health state"""
+    global _health
+    try:
+        redis_client = await get_redis()
+        healthy = bool(await asyncio.wait_for(redis_client.ping(), REDIS_CONNECT_TIMEOUT + REDIS_SOCKET_TIMEOUT))
+    except Exception as e:
+        logger.error(f"Redis health check failed: {e}")
+        healthy = False
+    _health = (healthy, time.monotonic())
+    REDIS_HEALTHY.set(1 if healthy else 0)
+    return healthy
+
+
+async def redis_healthy() -> bool:
+    """Cached health state; checked inline if the background refresh is not running or stalled"""
+    if _health is None or time.monotonic() - _health[1] > REDIS_HEALTH_INTERVAL * 3:
+        return await refresh_health()
+    return _health[0]
+
+
+async def run_health_checker():
+    """Background task refreshing the health state every REDIS_HEALTH_INTERVAL seconds"""
+    while True:
+        await refresh_health()
+        await asyncio.sleep(REDIS_HEALTH_INTERVAL)
@@ -2,7 +2,7 @@
 Pydantic schemas for Chat Service
 """
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic import BaseModel
 from enum import Enum
 
@@ -77,6 +77,17 @@ class ChatMessageResponse(BaseModel):
     timestamp: str
 
 
+class ChatMessageBatchRequest(BaseModel):
+    """Several messages posted in one request"""
+    messages: List[ChatMessageRequest]
+    atomic: bool = False
+
+
+class ChatMessageBatchResponse(BaseModel):
+    """IDs of posted messages, in request order"""
+    messages: List[ChatMessageResponse]
+
+
 class ChatMessage(BaseModel):
     """Chat message structure"""
     document_id: Optional[str] = None
@@ -87,3 +98,36 @@ class ChatMessage(BaseModel):
     timestamp: str
     intent: Optional[EditIntent] = None
     comment: Optional[EditComment] = None
+
+
+class ChatCursor(BaseModel):
+    """Last-seen message ID of an agent (per document, if given)"""
+    agent_id: Optional[str] = None
+    document_id: Optional[str] = None
+    message_id: Optional[str] = None
+
+
+class IntentCheckRequest(BaseModel):
+    """Proposed edit to check against active intents"""
+    document_id: Optional[str] = None
+    agent_id: Optional[str] = None
+    intent_id: Optional[str] = None
+    anchor: str
+
+
+class IntentCheckResponse(BaseModel):
+    """Active intents whose anchors overlap the proposed one"""
+    conflict: bool
+    conflicts: List[EditIntent]
+    active_count: int
+
+
+class ChatSummary(BaseModel):
+    """Shared prompt summary of a document's chat"""
+    document_id: Optional[str] = None
+    last_message_id: Optional[str] = None
+    message_count: int
+    lines: List[str]
+    text: str
+    intents: Dict[str, int]
+    comments: Dict[str, int]
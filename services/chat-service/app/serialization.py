@@ -0,0 +1,36 @@
+"""
+JSON for message listings and SSE events
+With FAST_JSON=true and orjson installed, stored message payloads are embedded
+as raw fragments instead of being decoded and encoded again (see app.encoding).
+"""
+import os
+from typing import Any, Union
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+FAST_JSON = orjson is not None and os.getenv("FAST_JSON", "false").lower() in ("1", "true", "yes")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize plain data (dicts, lists, strings, numbers) to JSON bytes"""
+    if FAST_JSON:
+        return orjson.dumps(content)
+    return to_json(content)
+
+
+def raw_json(data: Union[bytes, str]) -> Any:
+    """Embed an already serialized JSON value into content passed to dumps (FAST_JSON only)"""
+    return orjson.Fragment(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with dumps; return it directly to skip response_model validation"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,112 @@
+"""
+Per-document chat summaries shared by all agents
+The summary (last formatted lines, intent and comment counts) is kept in Redis
+with the ID of the last message it covers and extended with newer messages
+only, so agents polling the same document share one computation.
+"""
+import os
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.encoding import entity_field
+
+SUMMARY_LINES = int(os.getenv("SUMMARY_LINES", "30"))
+# Intent statuses remembered for counting; older intents are dropped
+SUMMARY_MAX_INTENTS = 500
+SUMMARY_TTL_SECONDS = 24 * 3600
+# Stream entries read per XRANGE when catching a summary up
+SUMMARY_PAGE_SIZE = 1000
+
+
+def summary_key(document_id: Optional[str]) -> str:
+    return f"chat:summary:{document_id or '*'}"
+
+
+def empty_summary(document_id: Optional[str]) -> Dict[str, Any]:
+    return {
+        "document_id": document_id,
+        "last_message_id": None,
+        "message_count": 0,
+        "lines": [],
+        "intent_statuses": {},
+        "comments": {},
+    }
+
+
+def format_line(data: Dict[str, str]) -> str:
+    """Message as a prompt line: "agent: [INTENT:status] text" """
+    tag = ""
+    status = entity_field("intent", data, "status")
+    if status:
+        tag = f"[INTENT:{status}] "
+    else:
+        kind = entity_field("comment", data, "kind")
+        if kind:
+            tag = f"[COMMENT:{kind}] "
+    return f"{data.get('agent_id', 'unknown')}: {tag}{data.get('message', '')}"
+
+
+def apply_entries(summary: Dict[str, Any], entries: List[Tuple[str, Dict[str, str]]]):
+    """Extend a summary with stream entries newer than it covers"""
+    document_id = summary["document_id"]
+    lines = summary["lines"]
+    statuses = summary["intent_statuses"]
+    for message_id, data in entries:
+        summary["last_message_id"] = message_id
+        if document_id and data.get("document_id") != document_id:
+            continue
+        summary["message_count"] += 1
+        lines.append(format_line(data))
+        intent_id = entity_field("intent", data, "intent_id")
+        if intent_id:
+            # Latest status wins; re-inserting keeps the dict ordered by last update
+            statuses.pop(intent_id, None)
+            statuses[intent_id] = entity_field("intent", data, "status")
+        kind = entity_field("comment", data, "kind")
+        if kind:
+            summary["comments"][kind] = summary["comments"].get(kind, 0) + 1
+    del lines[:-SUMMARY_LINES]
+    for intent_id in list(statuses)[:-SUMMARY_MAX_INTENTS]:
+        del statuses[intent_id]
+
+
+def summary_response(summary: Dict[str, Any], lines: int) -> Dict[str, Any]:
+    selected = summary["lines"][-lines:] if lines > 0 else []
+    intents: Dict[str, int] = {}
+    for status in summary["intent_statuses"].values():
+        intents[status] = intents.get(status, 0) + 1
+    return {
+        "document_id": summary["document_id"],
+        "last_message_id": summary["last_message_id"],
+        "message_count": summary["message_count"],
+        "lines": selected,
+        "text": "\n".join(selected) if selected else "(чат пуст)",
+        "intents": intents,
+        "comments": summary["comments"],
+    }
+
+
+async def get_summary(redis_client: redis.Redis, stream: str, document_id: Optional[str]) -> Dict[str, Any]:
+    """Cached summary of a document's chat, extended with messages posted since it was stored"""
+    key = summary_key(document_id)
+    cached = await redis_client.get(key)
+    summary = json.loads(cached) if cached else empty_summary(document_id)
+
+    # A cold cache walks the whole stream, so read it in bounded pages
+    changed = False
+    while True:
+        last_id = summary["last_message_id"]
+        entries = await redis_client.xrange(
+            stream, min=f"({last_id}" if last_id else "-", max="+", count=SUMMARY_PAGE_SIZE
+        )
+        if not entries:
+            break
+        apply_entries(summary, entries)
+        changed = True
+        if len(entries) < SUMMARY_PAGE_SIZE:
+            break
+    if changed:
+        await redis_client.set(key, json.dumps(summary, ensure_ascii=False), ex=SUMMARY_TTL_SECONDS)
+    return summary
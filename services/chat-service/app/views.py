@@ -0,0 +1,138 @@
+"""
+Secondary views of the chat stream
+Sorted sets of message IDs of all intents and all comments (also per
+document), comments per target intent and messages per agent, so filtered
+reads cost O(result) instead of scanning the whole history. Scores encode
+the stream ID (milliseconds * 1000 + sequence), which keeps members in
+stream order. A view only covers history from its oldest member on.
+"""
+import os
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app import archive as chat_archive
+from app.archive import StreamEntry, parse_id, parse_start
+from app.encoding import entity_field
+
+VIEW_PREFIX = "chat:view"
+# Newest entries kept per view; older ones are still in the stream or archive
+VIEW_MAX_ENTRIES = int(os.getenv("VIEW_MAX_ENTRIES", "10000"))
+VIEW_TTL_SECONDS = 7 * 24 * 3600
+
+
+def view_key(kind: str, value: Optional[str] = None) -> str:
+    """Key of a view; without a value, the view of all documents"""
+    return f"{VIEW_PREFIX}:{kind}:{value}" if value else f"{VIEW_PREFIX}:{kind}"
+
+
+def view_score(message_id: str) -> int:
+    milliseconds, sequence = parse_id(message_id)
+    # Sequences above 999 within one millisecond do not occur in practice
+    return milliseconds * 1000 + min(sequence, 999)
+
+
+def message_views(data: Dict[str, str]) -> List[str]:
+    """Keys of the views a stored message belongs to"""
+    document_id = data.get("document_id")
+    keys = [view_key("agent", data.get("agent_id", "unknown"))]
+    if entity_field("intent", data, "intent_id"):
+        keys.append(view_key("intents"))
+        if document_id:
+            keys.append(view_key("intents", document_id))
+    target_intent_id = entity_field("comment", data, "target_intent_id")
+    if target_intent_id:
+        keys.append(view_key("comments"))
+        if document_id:
+            keys.append(view_key("comments", document_id))
+        keys.append(view_key("intent-comments", target_intent_id))
+    return keys
+
+
+async def index_messages(redis_client: redis.Redis, entries: List[StreamEntry]):
+    """Add posted messages to their views in one round trip"""
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for message_id, data in entries:
+            for key in message_views(data):
+                pipe.zadd(key, {message_id: view_score(message_id)})
+                pipe.zremrangebyrank(key, 0, -VIEW_MAX_ENTRIES - 1)
+                pipe.expire(key, VIEW_TTL_SECONDS)
+        await pipe.execute()
+
+
+def select_view(
+    document_id: Optional[str],
+    agent_id: Optional[str],
+    message_type: Optional[str],
+    intent_id: Optional[str],
+) -> Optional[str]:
+    """Most selective view for a filter combination (None: scan the stream)"""
+    if intent_id:
+        return view_key("intent-comments", intent_id)
+    if message_type == "intent":
+        return view_key("intents", document_id)
+    if message_type == "comment":
+        return view_key("comments", document_id)
+    if agent_id:
+        return view_key("agent", agent_id)
+    return None
+
+
+def matches(
+    data: Dict[str, str],
+    document_id: Optional[str],
+    agent_id: Optional[str],
+    message_type: Optional[str],
+    intent_id: Optional[str],
+) -> bool:
+    """Whether a stored message passes all filters, for those the view does not cover"""
+    if document_id and data.get("document_id") != document_id:
+        return False
+    if agent_id and data.get("agent_id") != agent_id:
+        return False
+    if message_type == "intent" and not entity_field("intent", data, "intent_id"):
+        return False
+    if (message_type == "comment" or intent_id) and not entity_field("comment", data, "target_intent_id"):
+        return False
+    if intent_id and entity_field("comment", data, "target_intent_id") != intent_id:
+        return False
+    return True
+
+
+async def view_start(redis_client: redis.Redis, key: str) -> Optional[str]:
+    """ID of the oldest message in a view (None if the view is empty or expired)"""
+    oldest = await redis_client.zrange(key, 0, 0)
+    return oldest[0] if oldest else None
+
+
+async def read_view(
+    redis_client: redis.Redis, stream: str, key: str, start_id: str, limit: int
+) -> Tuple[List[StreamEntry], Optional[str]]:
+    """(entries of a view from an XRANGE-style start, oldest first; ID of the last indexed one)"""
+    start, exclusive = parse_start(start_id)
+    score = start[0] * 1000 + min(start[1], 999)
+    message_ids = await redis_client.zrangebyscore(
+        key, f"({score}" if exclusive else score, "+inf", start=0, num=limit
+    )
+    if not message_ids:
+        return [], None
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for message_id in message_ids:
+            pipe.xrange(stream, min=message_id, max=message_id, count=1)
+        found = await pipe.execute()
+
+    archived: Dict[str, StreamEntry] = {}
+    missing = [message_id for message_id, result in zip(message_ids, found) if not result]
+    if missing and chat_archive.archive is not None:
+        # Moved to the archive since they were indexed
+        archived = await asyncio.to_thread(chat_archive.archive.find, missing)
+
+    entries: List[StreamEntry] = []
+    for message_id, result in zip(message_ids, found):
+        if result:
+            entries.append(result[0])
+        elif message_id in archived:
+            entries.append(archived[message_id])
+        # Otherwise trimmed from the stream without an archive: skipped
+    return entries, message_ids[-1]
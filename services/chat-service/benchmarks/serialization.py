@@ -0,0 +1,101 @@
+"""
+Serialization benchmark for GET /api/chat/messages: json.loads + ChatMessage
+models (previous path) vs the FAST_JSON path embedding stored entities as is,
+and decoding of entities stored as JSON fields vs flattened fields
+
+    python -m benchmarks.serialization [--messages 1000]
+"""
+import argparse
+import json
+import timeit
+import uuid
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app import encoding, serialization
+from app.encoding import encode_entity, parse_entity
+from app.main import decode_message, stored_message
+from app.schemas import ChatMessage, EditIntent, EditComment
+
+
+def make_stream(count: int, entity_format: str = "json") -> List[dict]:
+    """Decoded stream entries as read by XRANGE"""
+    encoding.CHAT_ENTITY_FORMAT = entity_format
+    entries = []
+    for i in range(count):
+        intent_id = str(uuid.uuid4())
+        entries.append({
+            "message_id": f"{1700000000000 + i}-0",
+            "agent_id": f"agent-{i % 10}",
+            "agent_role": "editor",
+            "document_id": "doc-1",
+            "message": "Предлагаю переписать вступление, чтобы оно было короче",
+            "timestamp": "2024-01-01T12:00:00.000000",
+            **encode_entity("intent", EditIntent(
+                intent_id=intent_id, agent_id=f"agent-{i % 10}", operation="replace",
+                anchor="Вступление", summary="Сократить вступление", status="proposed", created_at=1700000000.0 + i,
+            )),
+            **encode_entity("comment", EditComment(
+                comment_id=str(uuid.uuid4()), target_intent_id=intent_id, agent_id="agent-0",
+                kind="support", content="Согласен", created_at=1700000000.5 + i,
+            )),
+        })
+    return entries
+
+
+def read_path(entries: List[dict], shape=decode_message) -> bytes:
+    """What GET /api/chat/messages does per XRANGE page"""
+    return serialization.dumps([shape(entry["message_id"], entry) for entry in entries])
+
+
+def previous_path(adapter: TypeAdapter, entries: List[dict]) -> bytes:
+    result = [
+        ChatMessage(**{**entry, "intent": json.loads(entry["intent"]), "comment": json.loads(entry["comment"])})
+        for entry in entries
+    ]
+    value = adapter.validate_python(result)
+    content = adapter.dump_python(value, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(entries: List[dict]) -> bytes:
+    return serialization.dumps([
+        {**entry, "intent": parse_entity(entry["intent"]), "comment": parse_entity(entry["comment"])}
+        for entry in entries
+    ])
+
+
+def bench(label: str, func, number: int):
+    seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"{label:<48} {seconds * 1000:9.3f} ms")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat message serialization benchmark")
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+    if serialization.orjson is None:
+        raise SystemExit("orjson is not installed")
+
+    entries = make_stream(args.messages)
+    adapter = TypeAdapter(List[ChatMessage])
+
+    flat_entries = make_stream(args.messages, "flat")
+
+    print(f"GET /api/chat/messages, {args.messages} messages with intent and comment")
+    base = bench("  json.loads + models + json.dumps", lambda: previous_path(adapter, entries), args.number)
+    json_fields = bench("  JSON fields, dicts", lambda: read_path(entries), args.number)
+    flat = bench("  flat fields, dicts", lambda: read_path(flat_entries), args.number)
+    print(f"  speedup x{base / flat:.1f} (flat vs JSON fields x{json_fields / flat:.1f})")
+    serialization.FAST_JSON = True
+    fast = bench("  FAST_JSON: JSON fields, orjson fragments", lambda: fast_path(entries), args.number)
+    flat = bench("  FAST_JSON: flat fields, dicts", lambda: read_path(flat_entries), args.number)
+    raw = bench("  FAST_JSON: flat fields, raw=true", lambda: read_path(flat_entries, stored_message), args.number)
+    print(f"  speedup x{base / fast:.1f} / x{base / flat:.1f} / x{base / raw:.1f}")
+
+
+if __name__ == "__main__":
+    main()
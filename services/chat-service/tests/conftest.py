@@ -5,7 +5,36 @@ import pytest
 import sys
 from pathlib import Path
 
+import fakeredis
+import fakeredis.aioredis
+import httpx
+import pytest_asyncio
+
 # Add app directory to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from app import redis_client as redis_module  # noqa: E402
+from app.main import app  # noqa: E402
+
 pytest_plugins = ['pytest_asyncio']
+
+
+@pytest_asyncio.fixture
+async def redis_client(monkeypatch):
+    """Empty fake Redis behind both the get_redis dependency and get_redis itself"""
+    redis_client = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+
+    async def override():
+        return redis_client
+
+    # Background readers and health checks call get_redis directly
+    monkeypatch.setattr(redis_module, "_redis_client", redis_client)
+    app.dependency_overrides[redis_module.get_redis] = override
+    yield redis_client
+    app.dependency_overrides.clear()
+
+
+@pytest_asyncio.fixture
+async def client(redis_client):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as test_client:
+        yield test_client
@@ -0,0 +1,113 @@
+"""
+Tests for chat history archival
+"""
+import pytest
+
+from app import archive as chat_archive
+from app.archive import SegmentArchive, archive_once
+from app.main import STREAM_NAME
+
+
+@pytest.fixture(autouse=True)
+def segment_archive(tmp_path, monkeypatch):
+    monkeypatch.setattr(chat_archive, "archive", SegmentArchive(str(tmp_path)))
+    monkeypatch.setattr(chat_archive, "ARCHIVE_BATCH_SIZE", 4)
+
+
+async def post_messages(client, count):
+    for i in range(count):
+        await client.post("/api/chat/messages", json={"agent_id": "a", "message": f"m{i}", "document_id": "doc-1"})
+
+
+@pytest.mark.asyncio
+async def test_overflow_is_archived_and_trimmed(client, redis_client):
+    await post_messages(client, 10)
+
+    assert await archive_once(redis_client, STREAM_NAME, keep=3) == 4
+    assert await archive_once(redis_client, STREAM_NAME, keep=3) == 3
+    assert await archive_once(redis_client, STREAM_NAME, keep=3) == 0
+    assert await redis_client.xlen(STREAM_NAME) == 3
+    assert len(chat_archive.archive.segments()) == 2
+
+
+@pytest.mark.asyncio
+async def test_reads_page_through_archive_and_stream(client, redis_client):
+    await post_messages(client, 10)
+    while await archive_once(redis_client, STREAM_NAME, keep=3):
+        pass
+
+    everything = (await client.get("/api/chat/messages", params={"limit": 100})).json()
+    assert [m["message"] for m in everything] == [f"m{i}" for i in range(10)]
+
+    seen = []
+    params = {"limit": 3, "document_id": "doc-1"}
+    for _ in range(5):
+        response = await client.get("/api/chat/messages", params=params)
+        seen += [m["message"] for m in response.json()]
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    assert seen == [f"m{i}" for i in range(10)]
+
+    since = everything[5]["message_id"]
+    page = (await client.get("/api/chat/messages", params={"since": since, "limit": 2})).json()
+    assert [m["message"] for m in page] == ["m5", "m6"]
+
+    unread = (await client.get("/api/chat/messages/unread", params={"agent_id": "b", "limit": 100})).json()
+    assert len(unread) == 10
+
+
+@pytest.mark.asyncio
+async def test_entries_archived_before_a_crash_are_not_duplicated(client, redis_client):
+    await post_messages(client, 6)
+    # Segment written but the stream never trimmed
+    chat_archive.archive.write(await redis_client.xrange(STREAM_NAME, count=2))
+
+    assert await archive_once(redis_client, STREAM_NAME, keep=2) == 2
+    messages = (await client.get("/api/chat/messages", params={"limit": 100})).json()
+    assert [m["message"] for m in messages] == [f"m{i}" for i in range(6)]
+
+
+@pytest.mark.asyncio
+async def test_lock_held_by_another_archiver_is_kept(client, redis_client, monkeypatch):
+    await post_messages(client, 6)
+    await redis_client.set(chat_archive.ARCHIVE_LOCK_KEY, "other")
+    assert await archive_once(redis_client, STREAM_NAME, keep=2) == 0
+    assert await redis_client.get(chat_archive.ARCHIVE_LOCK_KEY) == "other"
+
+    # The lock expires mid-run and another replica takes it: finishing must not release it
+    await redis_client.delete(chat_archive.ARCHIVE_LOCK_KEY)
+    xtrim = redis_client.xtrim
+
+    async def xtrim_after_expiry(*args, **kwargs):
+        await redis_client.set(chat_archive.ARCHIVE_LOCK_KEY, "other")
+        return await xtrim(*args, **kwargs)
+
+    monkeypatch.setattr(redis_client, "xtrim", xtrim_after_expiry)
+    assert await archive_once(redis_client, STREAM_NAME, keep=2) == 4
+    assert await redis_client.get(chat_archive.ARCHIVE_LOCK_KEY) == "other"
+
+    # Its own lock is released
+    monkeypatch.setattr(redis_client, "xtrim", xtrim)
+    await redis_client.delete(chat_archive.ARCHIVE_LOCK_KEY)
+    await post_messages(client, 1)
+    assert await archive_once(redis_client, STREAM_NAME, keep=2) == 1
+    assert await redis_client.get(chat_archive.ARCHIVE_LOCK_KEY) is None
+
+
+@pytest.mark.asyncio
+async def test_segment_index_is_cached_until_a_write(client, redis_client, monkeypatch):
+    await post_messages(client, 8)
+    assert await archive_once(redis_client, STREAM_NAME, keep=2) == 4
+    segment_archive = chat_archive.archive
+    message_ids = [entry[0] for entry in segment_archive.read("-", 100)]
+
+    listings = []
+    listdir = chat_archive.os.listdir
+    monkeypatch.setattr(chat_archive.os, "listdir", lambda path: listings.append(path) or listdir(path))
+    found = segment_archive.find(message_ids + ["1-0"])
+    segment_archive.read("-", 100)
+    assert list(found) == message_ids
+    assert listings == []
+
+    assert await archive_once(redis_client, STREAM_NAME, keep=2) == 2
+    assert len(segment_archive.read("-", 100)) == 6
+    assert len(listings) == 1
@@ -0,0 +1,38 @@
+"""
+Tests for batch message posting
+"""
+import time
+
+import pytest
+
+from app.main import MAX_BATCH_SIZE
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("atomic", [False, True])
+async def test_batch_returns_ids_in_order(client, atomic):
+    intent = {
+        "intent_id": "i1", "agent_id": "agent-1", "operation": "insert", "anchor": "intro",
+        "summary": "add", "status": "proposed", "created_at": time.time(),
+    }
+    messages = [
+        {"agent_id": "agent-1", "message": "with intent", "document_id": "doc-1", "intent": intent},
+        {"agent_id": "agent-1", "message": "second"},
+        {"agent_id": "agent-1", "message": "third"},
+    ]
+    response = await client.post("/api/chat/messages/batch", json={"messages": messages, "atomic": atomic})
+    assert response.status_code == 200
+    ids = [item["message_id"] for item in response.json()["messages"]]
+    assert len(ids) == 3 and ids == sorted(ids)
+
+    stored = (await client.get("/api/chat/messages")).json()
+    assert [m["message_id"] for m in stored] == ids
+    assert [m["message"] for m in stored] == ["with intent", "second", "third"]
+    assert (await client.get("/api/chat/intents", params={"document_id": "doc-1"})).json()[0]["intent_id"] == "i1"
+
+
+@pytest.mark.asyncio
+async def test_batch_size_limits(client):
+    assert (await client.post("/api/chat/messages/batch", json={"messages": []})).status_code == 400
+    too_many = [{"agent_id": "a", "message": "m"}] * (MAX_BATCH_SIZE + 1)
+    assert (await client.post("/api/chat/messages/batch", json={"messages": too_many})).status_code == 400
@@ -0,0 +1,64 @@
+"""
+Tests for per-agent chat cursors
+"""
+import pytest
+
+
+async def post(client, agent_id, message, document_id=None):
+    response = await client.post(
+        "/api/chat/messages", json={"agent_id": agent_id, "message": message, "document_id": document_id}
+    )
+    return response.json()["message_id"]
+
+
+@pytest.mark.asyncio
+async def test_unread_returns_only_new_messages(client):
+    await post(client, "agent-1", "first")
+    await post(client, "agent-2", "second")
+
+    response = await client.get("/api/chat/messages/unread", params={"agent_id": "agent-3"})
+    assert [m["message"] for m in response.json()] == ["first", "second"]
+
+    assert (await client.get("/api/chat/messages/unread", params={"agent_id": "agent-3"})).json() == []
+
+    last_id = await post(client, "agent-1", "third")
+    response = await client.get("/api/chat/messages/unread", params={"agent_id": "agent-3"})
+    assert [m["message"] for m in response.json()] == ["third"]
+    assert response.headers["X-Chat-Cursor"] == last_id
+
+
+@pytest.mark.asyncio
+async def test_unread_pages_by_limit_and_filters(client):
+    for i in range(5):
+        await post(client, "agent-1", f"doc {i}", document_id="doc-a")
+        await post(client, "agent-2", f"other {i}", document_id="doc-b")
+
+    params = {"agent_id": "agent-2", "document_id": "doc-a", "limit": 3}
+    first = (await client.get("/api/chat/messages/unread", params=params)).json()
+    second = (await client.get("/api/chat/messages/unread", params=params)).json()
+    assert [m["message"] for m in first + second] == [f"doc {i}" for i in range(5)]
+
+    own = await client.get(
+        "/api/chat/messages/unread", params={"agent_id": "agent-2", "include_own": False}
+    )
+    assert {m["agent_id"] for m in own.json()} == {"agent-1"}
+
+
+@pytest.mark.asyncio
+async def test_cursor_without_ack_and_rewind(client):
+    await post(client, "agent-1", "hello")
+    params = {"agent_id": "agent-2", "ack": False}
+    peek = await client.get("/api/chat/messages/unread", params=params)
+    assert len(peek.json()) == 1
+    assert (await client.get("/api/chat/cursors/agent-2")).json()["message_id"] is None
+
+    cursor = peek.headers["X-Chat-Cursor"]
+    response = await client.put("/api/chat/cursors/agent-2", json={"message_id": cursor})
+    assert response.json()["message_id"] == cursor
+    assert (await client.get("/api/chat/messages/unread", params={"agent_id": "agent-2"})).json() == []
+
+    await client.put("/api/chat/cursors/agent-2", json={"message_id": "0-0"})
+    assert len((await client.get("/api/chat/messages/unread", params={"agent_id": "agent-2"})).json()) == 1
+
+    invalid = await client.put("/api/chat/cursors/agent-2", json={"message_id": "latest"})
+    assert invalid.status_code == 400
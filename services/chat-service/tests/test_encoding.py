@@ -0,0 +1,60 @@
+"""
+Tests for the stored format of chat entities
+"""
+import pytest
+
+from app import encoding, serialization
+from app.encoding import decode_entity, encode_entity
+from app.schemas import ChatMessage, EditComment, EditIntent
+
+INTENT = EditIntent(
+    intent_id="i1", agent_id="agent-1", operation="replace", anchor="Вступление",
+    summary="Сократить", status="proposed", created_at=1700000000.125,
+)
+COMMENT = EditComment(
+    comment_id="c1", target_intent_id="i1", agent_id="agent-2", kind="support",
+    content="Согласен", created_at=1700000001.5,
+)
+
+
+def test_flat_round_trip(monkeypatch):
+    monkeypatch.setattr(encoding, "CHAT_ENTITY_FORMAT", "flat")
+    fields = encode_entity("intent", INTENT)
+    assert fields["intent.summary"] == "Сократить"
+    assert EditIntent(**decode_entity("intent", fields)) == INTENT
+
+    no_anchor = INTENT.model_copy(update={"anchor": None})
+    fields = encode_entity("intent", no_anchor)
+    assert "intent.anchor" not in fields
+    assert EditIntent(**decode_entity("intent", fields)) == no_anchor
+    assert decode_entity("comment", fields) is None
+
+
+def test_legacy_json_is_read(monkeypatch):
+    monkeypatch.setattr(encoding, "CHAT_ENTITY_FORMAT", "json")
+    monkeypatch.setattr(serialization, "FAST_JSON", False)
+    fields = encode_entity("comment", COMMENT)
+    assert fields == {"comment": COMMENT.model_dump_json()}
+    assert EditComment(**decode_entity("comment", fields)) == COMMENT
+    assert decode_entity("comment", {"comment": "{broken"}) is None
+
+
+@pytest.mark.asyncio
+async def test_mixed_formats_and_raw_reads(client, redis_client, monkeypatch):
+    monkeypatch.setattr(encoding, "CHAT_ENTITY_FORMAT", "flat")
+    await redis_client.xadd("chat:messages", {
+        "agent_id": "agent-1", "message": "old", "timestamp": "t",
+        "intent": INTENT.model_dump_json(),
+    })
+    await client.post("/api/chat/messages", json={
+        "agent_id": "agent-2", "message": "new",
+        "intent": INTENT.model_dump(mode="json"), "comment": COMMENT.model_dump(mode="json"),
+    })
+
+    messages = [ChatMessage(**m) for m in (await client.get("/api/chat/messages")).json()]
+    assert [m.intent for m in messages] == [INTENT, INTENT]
+    assert messages[1].comment == COMMENT
+
+    raw = (await client.get("/api/chat/messages", params={"raw": True})).json()
+    assert raw[0]["intent"] == INTENT.model_dump_json()
+    assert raw[1]["comment.kind"] == "support"
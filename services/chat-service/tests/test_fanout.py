@@ -0,0 +1,78 @@
+"""
+Tests for long polling and SSE through the shared stream reader
+"""
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+
+from app import fanout as fanout_module
+from app.main import message_fanout, stream_messages
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def short_reads(monkeypatch):
+    monkeypatch.setattr(fanout_module, "FANOUT_BLOCK_MS", 50)
+    yield
+    # The reader stops by itself once the last subscriber is gone
+    if message_fanout.task:
+        await asyncio.wait_for(message_fanout.task, 2)
+
+
+@pytest.mark.asyncio
+async def test_long_poll_returns_when_a_message_is_posted(client):
+    first = (await client.post("/api/chat/messages", json={"agent_id": "a", "message": "m0"})).json()
+
+    async def post_later():
+        await asyncio.sleep(0.2)
+        await client.post("/api/chat/messages", json={"agent_id": "a", "message": "other", "document_id": "doc-2"})
+        await client.post("/api/chat/messages", json={"agent_id": "a", "message": "m1", "document_id": "doc-1"})
+
+    poster = asyncio.create_task(post_later())
+    response = await client.get("/api/chat/messages", params={
+        "cursor": first["message_id"], "document_id": "doc-1", "wait": 5,
+    })
+    await poster
+    assert [message["message"] for message in response.json()] == ["m1"]
+    assert response.headers["X-Next-Cursor"] == response.json()[0]["message_id"]
+
+
+@pytest.mark.asyncio
+async def test_long_poll_times_out_with_empty_page(client):
+    first = (await client.post("/api/chat/messages", json={"agent_id": "a", "message": "m0"})).json()
+    response = await client.get("/api/chat/messages", params={"cursor": first["message_id"], "wait": 0.1})
+    assert response.json() == []
+    assert response.headers["X-Next-Cursor"] == first["message_id"]
+
+
+@pytest.mark.asyncio
+async def test_stream_catches_up_and_follows_live_messages(client, redis_client):
+    first = (await client.post("/api/chat/messages", json={"agent_id": "a", "message": "m0"})).json()
+    await client.post("/api/chat/messages", json={"agent_id": "a", "message": "m1"})
+
+    response = await stream_messages(
+        document_id=None, cursor=first["message_id"], raw=False, last_event_id=None, redis_client=redis_client
+    )
+    events = response.body_iterator
+    caught_up = await asyncio.wait_for(events.__anext__(), 2)
+    assert json.loads(caught_up.split(b"data: ")[1])["message"] == "m1"
+
+    await client.post("/api/chat/messages", json={"agent_id": "a", "message": "m2"})
+    live = await asyncio.wait_for(events.__anext__(), 5)
+    message = json.loads(live.split(b"data: ")[1])
+    assert message["message"] == "m2"
+    assert live.startswith(f"id: {message['message_id']}\n".encode())
+    await events.aclose()
+    assert not message_fanout.subscriptions
+
+
+@pytest.mark.asyncio
+async def test_subscribers_share_one_reader(redis_client):
+    async with message_fanout.subscribe() as first, message_fanout.subscribe("doc-1") as second:
+        reader = message_fanout.task
+        await asyncio.sleep(0.05)
+        await redis_client.xadd("chat:messages", {"agent_id": "a", "message": "hi", "document_id": "doc-2"})
+        message_id, _ = await asyncio.wait_for(first.queue.get(), 5)
+        assert message_fanout.task is reader
+        assert second.queue.empty()
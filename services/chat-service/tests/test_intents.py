@@ -0,0 +1,72 @@
+"""
+Tests for the active intent registry
+"""
+import time
+
+import pytest
+
+from app import intents
+from app.intents import anchors_overlap
+
+
+def intent_message(intent_id, agent_id, anchor, status="proposed", document_id="doc-1"):
+    return {
+        "agent_id": agent_id,
+        "document_id": document_id,
+        "message": f"intent {intent_id}",
+        "intent": {
+            "intent_id": intent_id,
+            "agent_id": agent_id,
+            "operation": "replace",
+            "anchor": anchor,
+            "summary": "rewrite",
+            "status": status,
+            "created_at": time.time(),
+        },
+    }
+
+
+def test_anchors_overlap():
+    assert anchors_overlap("quantum mechanics section", "The Quantum  mechanics section is long")
+    assert anchors_overlap("first second third fourth", "zero second third fourth fifth")
+    assert not anchors_overlap("first second", "second third")
+    assert not anchors_overlap("ana", "banana split")
+    assert not anchors_overlap(None, "anything")
+
+
+@pytest.mark.asyncio
+async def test_registry_tracks_status(client):
+    await client.post("/api/chat/messages", json=intent_message("i1", "agent-1", "intro paragraph text"))
+    await client.post("/api/chat/messages", json=intent_message("i2", "agent-2", "conclusion text"))
+    await client.post("/api/chat/messages", json=intent_message("i3", "agent-3", "other", document_id="doc-2"))
+
+    active = (await client.get("/api/chat/intents", params={"document_id": "doc-1"})).json()
+    assert sorted(intent["intent_id"] for intent in active) == ["i1", "i2"]
+
+    await client.post("/api/chat/messages", json=intent_message("i2", "agent-2", "conclusion text", "executed"))
+    active = (await client.get("/api/chat/intents", params={"document_id": "doc-1"})).json()
+    assert [intent["intent_id"] for intent in active] == ["i1"]
+
+
+@pytest.mark.asyncio
+async def test_check_flags_overlaps_of_other_agents(client):
+    await client.post("/api/chat/messages", json=intent_message("i1", "agent-1", "the intro paragraph text here"))
+
+    check = {"document_id": "doc-1", "agent_id": "agent-2", "anchor": "intro paragraph text"}
+    result = (await client.post("/api/chat/intents/check", json=check)).json()
+    assert result["conflict"] is True
+    assert [intent["intent_id"] for intent in result["conflicts"]] == ["i1"]
+    assert result["active_count"] == 1
+
+    own = (await client.post("/api/chat/intents/check", json={**check, "agent_id": "agent-1"})).json()
+    assert own["conflict"] is False
+
+    elsewhere = (await client.post("/api/chat/intents/check", json={**check, "anchor": "final words"})).json()
+    assert elsewhere["conflict"] is False
+
+
+@pytest.mark.asyncio
+async def test_expired_intents_are_pruned(client, monkeypatch):
+    monkeypatch.setattr(intents, "INTENT_TTL_SECONDS", -1)
+    await client.post("/api/chat/messages", json=intent_message("i1", "agent-1", "intro"))
+    assert (await client.get("/api/chat/intents", params={"document_id": "doc-1"})).json() == []
@@ -0,0 +1,48 @@
+"""
+Tests for request latency metrics
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.metrics import MetricsMiddleware
+
+
+def sample(suffix, route, status):
+    labels = {"method": "GET", "route": route, "status": status}
+    return REGISTRY.get_sample_value(f"chat_http_request_duration_seconds_{suffix}", labels) or 0
+
+
+async def noop_send(message):
+    pass
+
+
+@pytest.mark.asyncio
+async def test_open_stream_is_observed_at_response_start():
+    route = "/api/chat/messages/stream"
+
+    async def stream(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await asyncio.sleep(0.2)
+        await send({"type": "http.response.body", "body": b""})
+
+    count, total = sample("count", route, "200"), sample("sum", route, "200")
+    scope = {"type": "http", "method": "GET", "route": SimpleNamespace(path=route)}
+    await MetricsMiddleware(stream)(scope, None, noop_send)
+
+    assert sample("count", route, "200") == count + 1
+    assert sample("sum", route, "200") - total < 0.1
+
+
+@pytest.mark.asyncio
+async def test_failed_unmatched_request_is_grouped():
+    async def failing(scope, receive, send):
+        raise RuntimeError("boom")
+
+    count = sample("count", "unmatched", "500")
+    with pytest.raises(RuntimeError):
+        await MetricsMiddleware(failing)({"type": "http", "method": "GET"}, None, noop_send)
+
+    assert sample("count", "unmatched", "500") == count + 1
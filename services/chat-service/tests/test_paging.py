@@ -0,0 +1,52 @@
+"""
+Tests for cursor paging and since resolution
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.main import since_to_stream_id
+
+
+def test_since_naive_timestamps_are_utc():
+    moment = datetime(2024, 5, 1, 12, 0, 0, tzinfo=timezone.utc)
+    expected = f"{int(moment.timestamp() * 1000)}-0"
+    assert since_to_stream_id("2024-05-01T12:00:00") == expected
+    assert since_to_stream_id("2024-05-01T12:00:00Z") == expected
+    assert since_to_stream_id("2024-05-01T14:00:00+02:00") == expected
+    assert since_to_stream_id("1714564800000-3") == "1714564800000-3"
+    with pytest.raises(ValueError):
+        since_to_stream_id("yesterday")
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_do_not_overlap(client):
+    for i in range(5):
+        await client.post("/api/chat/messages", json={"agent_id": "a", "message": f"m{i}", "document_id": "doc-1"})
+        await client.post("/api/chat/messages", json={"agent_id": "b", "message": f"x{i}", "document_id": "doc-2"})
+
+    seen = []
+    params = {"document_id": "doc-1", "limit": 3}
+    for _ in range(6):
+        response = await client.get("/api/chat/messages", params=params)
+        seen += [m["message"] for m in response.json()]
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    assert seen == [f"m{i}" for i in range(5)]
+
+    # Nothing new: the cursor stays where it was
+    response = await client.get("/api/chat/messages", params=params)
+    assert response.json() == []
+    assert response.headers["X-Next-Cursor"] == params["cursor"]
+
+
+@pytest.mark.asyncio
+async def test_since_uses_service_timestamps(client):
+    await client.post("/api/chat/messages", json={"agent_id": "a", "message": "old"})
+    posted = (await client.get("/api/chat/messages")).json()[0]["timestamp"]
+    since = (datetime.fromisoformat(posted) + timedelta(hours=1)).isoformat()
+    assert (await client.get("/api/chat/messages", params={"since": since})).json() == []
+    since = (datetime.fromisoformat(posted) - timedelta(seconds=1)).isoformat()
+    assert len((await client.get("/api/chat/messages", params={"since": since})).json()) == 1
+
+    assert (await client.get("/api/chat/messages", params={"since": "soon"})).status_code == 400
+    assert (await client.get("/api/chat/messages", params={"cursor": "latest"})).status_code == 400
@@ -0,0 +1,47 @@
+"""
+Tests for Redis pool settings and cached health state
+"""
+import pytest
+
+from app import redis_client as redis_module
+from app.metrics import REDIS_POOL_MAX_CONNECTIONS
+
+
+@pytest.fixture(autouse=True)
+def fresh_health(monkeypatch):
+    monkeypatch.setattr(redis_module, "_health", None)
+
+
+def test_pool_settings():
+    pool = redis_module.create_pool()
+    assert pool.max_connections == redis_module.REDIS_MAX_CONNECTIONS
+    assert pool.connection_kwargs["socket_keepalive"] is True
+    assert pool.connection_kwargs["retry"]._retries == redis_module.REDIS_RETRIES
+
+    redis_module.observe_pool(redis_module.redis.Redis(connection_pool=pool))
+    assert REDIS_POOL_MAX_CONNECTIONS._value.get() == redis_module.REDIS_MAX_CONNECTIONS
+
+
+@pytest.mark.asyncio
+async def test_health_uses_cached_state(client, redis_client, monkeypatch):
+    assert (await client.get("/health")).status_code == 200
+
+    pings = []
+
+    async def failing_ping():
+        pings.append(1)
+        raise redis_module.ConnectionError("down")
+
+    monkeypatch.setattr(redis_client, "ping", failing_ping)
+    # The fresh cached state is served without pinging
+    assert (await client.get("/health")).status_code == 200
+    assert pings == []
+
+    await redis_module.refresh_health()
+    assert (await client.get("/health")).status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_stale_health_state_is_rechecked(redis_client, monkeypatch):
+    monkeypatch.setattr(redis_module, "_health", (False, 0.0))
+    assert await redis_module.redis_healthy() is True
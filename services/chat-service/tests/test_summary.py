@@ -0,0 +1,90 @@
+"""
+Tests for cached chat summaries
+"""
+import time
+
+import pytest
+
+from app import summary as summary_module
+
+
+def intent(intent_id, status):
+    return {
+        "intent_id": intent_id, "agent_id": "agent-1", "operation": "replace", "anchor": "intro",
+        "summary": "shorten", "status": status, "created_at": time.time(),
+    }
+
+
+@pytest.mark.asyncio
+async def test_summary_formats_and_counts(client):
+    messages = [
+        {"agent_id": "agent-1", "message": "plan", "document_id": "doc-1", "intent": intent("i1", "proposed")},
+        {"agent_id": "agent-2", "message": "other doc", "document_id": "doc-2"},
+        {
+            "agent_id": "agent-2", "message": "agree", "document_id": "doc-1",
+            "comment": {
+                "comment_id": "c1", "target_intent_id": "i1", "agent_id": "agent-2",
+                "kind": "support", "content": "ok", "created_at": time.time(),
+            },
+        },
+    ]
+    await client.post("/api/chat/messages/batch", json={"messages": messages})
+
+    result = (await client.get("/api/chat/summary", params={"document_id": "doc-1"})).json()
+    assert result["lines"] == ["agent-1: [INTENT:proposed] plan", "agent-2: [COMMENT:support] agree"]
+    assert result["intents"] == {"proposed": 1}
+    assert result["comments"] == {"support": 1}
+    assert result["message_count"] == 2
+
+    await client.post("/api/chat/messages", json={
+        "agent_id": "agent-1", "message": "done", "document_id": "doc-1", "intent": intent("i1", "executed"),
+    })
+    result = (await client.get("/api/chat/summary", params={"document_id": "doc-1", "lines": 1})).json()
+    assert result["lines"] == ["agent-1: [INTENT:executed] done"]
+    assert result["intents"] == {"executed": 1}
+    assert result["message_count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_summary_is_extended_incrementally(client, monkeypatch):
+    monkeypatch.setattr(summary_module, "SUMMARY_LINES", 2)
+    for i in range(3):
+        await client.post("/api/chat/messages", json={"agent_id": "a", "message": f"m{i}"})
+    first = (await client.get("/api/chat/summary")).json()
+    assert first["text"] == "a: m1\na: m2"
+
+    scanned = []
+    original = summary_module.apply_entries
+
+    def spy(summary, entries):
+        scanned.extend(entries)
+        original(summary, entries)
+
+    monkeypatch.setattr(summary_module, "apply_entries", spy)
+    assert (await client.get("/api/chat/summary")).json() == first
+    assert scanned == []
+
+    await client.post("/api/chat/messages", json={"agent_id": "a", "message": "m3"})
+    assert (await client.get("/api/chat/summary")).json()["lines"] == ["a: m2", "a: m3"]
+    assert len(scanned) == 1
+
+
+@pytest.mark.asyncio
+async def test_cold_summary_reads_stream_in_pages(client, monkeypatch):
+    monkeypatch.setattr(summary_module, "SUMMARY_PAGE_SIZE", 2)
+    messages = [{"agent_id": "a", "message": f"m{i}", "document_id": "doc-1"} for i in range(5)]
+    await client.post("/api/chat/messages/batch", json={"messages": messages})
+
+    pages = []
+    original = summary_module.apply_entries
+
+    def spy(summary, entries):
+        pages.append(len(entries))
+        original(summary, entries)
+
+    monkeypatch.setattr(summary_module, "apply_entries", spy)
+    result = (await client.get("/api/chat/summary", params={"document_id": "doc-1"})).json()
+
+    assert pages == [2, 2, 1]
+    assert result["message_count"] == 5
+    assert result["lines"][-1] == "a: m4"
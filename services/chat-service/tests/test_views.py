@@ -0,0 +1,143 @@
+"""
+Tests for agent- and type-scoped reads through secondary views
+"""
+import time
+
+import pytest
+import pytest_asyncio
+
+from app import archive as chat_archive
+from app import main as main_module
+from app import views
+from app.archive import SegmentArchive, archive_once
+from app.views import view_key
+
+
+def intent(intent_id, agent_id="agent-1"):
+    return {
+        "intent_id": intent_id, "agent_id": agent_id, "operation": "replace", "anchor": "intro",
+        "summary": "shorten", "status": "proposed", "created_at": time.time(),
+    }
+
+
+def comment(comment_id, target_intent_id, agent_id="agent-2"):
+    return {
+        "comment_id": comment_id, "target_intent_id": target_intent_id, "agent_id": agent_id,
+        "kind": "support", "content": "ok", "created_at": time.time(),
+    }
+
+
+@pytest_asyncio.fixture
+async def posted(client):
+    messages = [
+        {"agent_id": "agent-1", "message": "plan a", "document_id": "doc-1", "intent": intent("i1")},
+        {"agent_id": "agent-2", "message": "chatter", "document_id": "doc-1"},
+        {"agent_id": "agent-2", "message": "agree", "document_id": "doc-1", "comment": comment("c1", "i1")},
+        {"agent_id": "agent-3", "message": "plan b", "document_id": "doc-2", "intent": intent("i2", "agent-3")},
+        {"agent_id": "agent-3", "message": "object", "document_id": "doc-1", "comment": comment("c2", "i1", "agent-3")},
+        {"agent_id": "agent-1", "message": "other doc", "document_id": "doc-2"},
+        {"agent_id": "agent-1", "message": "plan c", "intent": intent("i3")},
+    ]
+    await client.post("/api/chat/messages/batch", json={"messages": messages[:3]})
+    for message in messages[3:]:
+        await client.post("/api/chat/messages", json=message)
+
+
+async def texts(client, **params):
+    return [message["message"] for message in (await client.get("/api/chat/messages", params=params)).json()]
+
+
+async def paged_texts(client, **params):
+    """Texts of all pages, following X-Next-Cursor until it stops moving"""
+    result = []
+    while True:
+        response = await client.get("/api/chat/messages", params=params)
+        result += [message["message"] for message in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor or cursor == params.get("cursor"):
+            return result
+        params = {**params, "cursor": cursor}
+
+
+@pytest.mark.asyncio
+async def test_scoped_queries(client, posted):
+    assert await texts(client, type="intent", document_id="doc-1") == ["plan a"]
+    assert await texts(client, type="comment", document_id="doc-1") == ["agree", "object"]
+    assert await texts(client, intent_id="i1") == ["agree", "object"]
+    assert await texts(client, intent_id="i1", agent_id="agent-3") == ["object"]
+    assert await texts(client, agent_id="agent-1") == ["plan a", "other doc", "plan c"]
+    assert await texts(client, agent_id="agent-1", document_id="doc-2") == ["other doc"]
+
+
+@pytest.mark.asyncio
+async def test_unscoped_type_filters(client, posted):
+    assert await texts(client, type="intent") == ["plan a", "plan b", "plan c"]
+    assert await texts(client, type="comment") == ["agree", "object"]
+    assert await texts(client, type="intent", agent_id="agent-3") == ["plan b"]
+
+
+@pytest.mark.asyncio
+async def test_reads_within_the_view_do_not_scan(client, posted, monkeypatch):
+    first = (await client.get("/api/chat/messages", params={"type": "comment"})).json()[0]
+
+    async def no_scan(*args, **kwargs):
+        raise AssertionError("reads covered by the view must not scan the stream")
+
+    monkeypatch.setattr(main_module, "read_range", no_scan)
+    assert await texts(client, type="comment", since=first["message_id"]) == ["agree", "object"]
+    assert await texts(client, type="comment", document_id="doc-1", cursor=first["message_id"]) == ["object"]
+
+
+@pytest.mark.asyncio
+async def test_history_before_the_view_is_scanned(client, redis_client, monkeypatch):
+    # Views keep only the newest entry; older ones come from the stream
+    monkeypatch.setattr(views, "VIEW_MAX_ENTRIES", 1)
+    for i in range(3):
+        await client.post("/api/chat/messages", json={"agent_id": "agent-1", "message": f"m{i}"})
+        await client.post("/api/chat/messages", json={"agent_id": "agent-2", "message": f"other {i}"})
+    assert await redis_client.zcard(view_key("agent", "agent-1")) == 1
+    assert await texts(client, agent_id="agent-1") == ["m0", "m1", "m2"]
+
+    # Pages scanned before the view continue into it without gaps or repeats
+    assert await paged_texts(client, agent_id="agent-1", limit=2) == ["m0", "m1", "m2"]
+
+    # An expired view falls back to the stream entirely
+    await redis_client.delete(view_key("agent", "agent-2"))
+    assert await texts(client, agent_id="agent-2") == ["other 0", "other 1", "other 2"]
+
+
+@pytest.mark.asyncio
+async def test_scoped_paging_follows_the_view(client, posted):
+    start = (await client.get("/api/chat/messages", params={"agent_id": "agent-3"})).json()[0]["message_id"]
+    first = await client.get("/api/chat/messages", params={"agent_id": "agent-3", "limit": 1, "since": start})
+    assert [message["message"] for message in first.json()] == ["plan b"]
+    second = await client.get("/api/chat/messages", params={
+        "agent_id": "agent-3", "limit": 1, "cursor": first.headers["X-Next-Cursor"],
+    })
+    assert [message["message"] for message in second.json()] == ["object"]
+    last = await client.get("/api/chat/messages", params={
+        "agent_id": "agent-3", "cursor": second.headers["X-Next-Cursor"],
+    })
+    assert last.json() == []
+    assert last.headers["X-Next-Cursor"] == second.headers["X-Next-Cursor"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_type_is_rejected(client):
+    assert (await client.get("/api/chat/messages", params={"type": "vote"})).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_archived_view_entries_are_read_in_one_batch(client, redis_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(chat_archive, "archive", SegmentArchive(str(tmp_path)))
+    for i in range(6):
+        await client.post("/api/chat/messages", json={"agent_id": "agent-1", "message": f"m{i}"})
+    while await archive_once(redis_client, main_module.STREAM_NAME, keep=2):
+        pass
+
+    lookups = []
+    find = chat_archive.archive.find
+    monkeypatch.setattr(chat_archive.archive, "find", lambda message_ids: lookups.append(message_ids) or find(message_ids))
+
+    assert await texts(client, agent_id="agent-1") == [f"m{i}" for i in range(6)]
+    assert [len(message_ids) for message_ids in lookups] == [4]
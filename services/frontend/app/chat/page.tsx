@@ -53,11 +53,23 @@ export default function ChatPage() {
 
   const fetchDocuments = useCallback(async () => {
     try {
-      const response = await fetch(`${API_URL}/api/documents`)
-      if (!response.ok) {
-        throw new Error('Failed to fetch documents')
+      // The list is paged; follow the next-page cursor headers to the end
+      const data: DocumentSummary[] = []
+      const params = new URLSearchParams({ limit: '100' })
+      for (;;) {
+        const response = await fetch(`${API_URL}/api/documents?${params.toString()}`)
+        if (!response.ok) {
+          throw new Error('Failed to fetch documents')
+        }
+        data.push(...(await response.json()))
+        const nextUpdatedAt = response.headers.get('X-Next-Before-Updated-At')
+        const nextDocumentId = response.headers.get('X-Next-Before-Document-Id')
+        if (!nextUpdatedAt || !nextDocumentId) {
+          break
+        }
+        params.set('before_updated_at', nextUpdatedAt)
+        params.set('before_document_id', nextDocumentId)
       }
-      const data = await response.json()
       setDocuments(data)
     } catch (err) {
       console.error('Error fetching documents', err)
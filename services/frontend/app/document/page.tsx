@@ -153,11 +153,23 @@ function DocumentPageContent() {
 
   const fetchDocuments = useCallback(async () => {
     try {
-      const response = await fetch(`${API_URL}/api/documents`)
-      if (!response.ok) {
-        throw new Error('Не удалось получить список документов')
+      // The list is paged; follow the next-page cursor headers to the end
+      const data: DocumentSummary[] = []
+      const params = new URLSearchParams({ limit: '100' })
+      for (;;) {
+        const response = await fetch(`${API_URL}/api/documents?${params.toString()}`)
+        if (!response.ok) {
+          throw new Error('Не удалось получить список документов')
+        }
+        data.push(...(await response.json()))
+        const nextUpdatedAt = response.headers.get('X-Next-Before-Updated-At')
+        const nextDocumentId = response.headers.get('X-Next-Before-Document-Id')
+        if (!nextUpdatedAt || !nextDocumentId) {
+          break
+        }
+        params.set('before_updated_at', nextUpdatedAt)
+        params.set('before_document_id', nextDocumentId)
       }
-      const data = await response.json()
       setDocuments(data)
       if (!selectedDocumentId && data.length > 0) {
         const targetId = queryDocumentId || data[0].document_id
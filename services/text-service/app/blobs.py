@@ -0,0 +1,78 @@
+"""
+Content-addressed storage of document version texts
+Identical texts share one text_blobs row; versions hold a reference and the
+blob is deleted once the last referencing version goes away.
+"""
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.compression import compress_text
+from app.models import Document, TextBlob
+from app.operations import text_digest
+
+
+def _insert(db: AsyncSession):
+    dialect = sqlite if db.bind.dialect.name == "sqlite" else postgresql
+    return dialect.insert(TextBlob)
+
+
+async def retain_blob(db: AsyncSession, text: str) -> str:
+    """Store text if it is new, otherwise take another reference to it; returns the hash"""
+    digest = text_digest(text)
+    body, codec = compress_text(text)
+    stmt = _insert(db).values(
+        hash=digest,
+        stored_text=None if codec else text,
+        body=body,
+        codec=codec,
+        size=len(text),
+        refcount=1,
+        created_at=datetime.utcnow(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TextBlob.hash],
+        set_={"refcount": TextBlob.refcount + 1},
+    )
+    await db.execute(stmt)
+    return digest
+
+
+async def add_version(db: AsyncSession, text: str, **fields: Any) -> Document:
+    """Add a document version whose text is stored as a shared blob"""
+    doc = Document(blob_hash=await retain_blob(db, text), **fields)
+    # Known already, so the blob relationship is never loaded for it
+    doc.text = text
+    db.add(doc)
+    return doc
+
+
+async def release_versions(db: AsyncSession, document_id: Any) -> int:
+    """
+    Delete all versions of a document, dropping their blob references.
+    Blobs left without references are removed. Returns the number of versions deleted.
+    """
+    result = await db.execute(
+        select(Document.blob_hash, func.count())
+        .where(Document.document_id == document_id)
+        .group_by(Document.blob_hash)
+    )
+    references = result.all()
+    await db.execute(delete(Document).where(Document.document_id == document_id))
+    for blob_hash, count in references:
+        await db.execute(
+            update(TextBlob)
+            .where(TextBlob.hash == blob_hash)
+            .values(refcount=TextBlob.refcount - count)
+        )
+    if references:
+        await db.execute(
+            delete(TextBlob).where(
+                TextBlob.hash.in_([blob_hash for blob_hash, _ in references]),
+                TextBlob.refcount <= 0,
+            )
+        )
+    return sum(count for _, count in references)
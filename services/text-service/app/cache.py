@@ -0,0 +1,189 @@
+"""
+In-process caches for hot document state
+"""
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Hashable, Optional, Tuple
+
+from app.operations import AnchorIndex
+from app.serialization import FAST_JSON, dumps, raw_json
+
+DOCUMENT_CACHE_SIZE = int(os.getenv("DOCUMENT_CACHE_SIZE", "64"))
+DIFF_CACHE_SIZE = int(os.getenv("DIFF_CACHE_SIZE", "512"))
+ACTIVE_DOCUMENT_TTL = float(os.getenv("ACTIVE_DOCUMENT_TTL", "5"))
+
+
+class LRUCache:
+    """Small least-recently-used mapping with a fixed capacity"""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = max(1, maxsize)
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if key not in self._data:
+            return None
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, key: Hashable, value: Any) -> Any:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return value
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        return self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timezone-aware UTC timestamp, as loaded from the database; naive values are UTC"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+@dataclass
+class CachedDocument:
+    """Latest known version of a document held in memory"""
+    document_id: str
+    version: int
+    text: str
+    timestamp: Optional[datetime] = None
+    _index: Optional[AnchorIndex] = field(default=None, repr=False)
+    _text_json: Any = field(default=None, repr=False)
+
+    @property
+    def text_json(self) -> Any:
+        """Text for response payloads; with FAST_JSON it is encoded once per version"""
+        if self._text_json is None:
+            self._text_json = raw_json(dumps(self.text)) if FAST_JSON else self.text
+        return self._text_json
+
+    @property
+    def index(self) -> AnchorIndex:
+        """Anchor index over text, built on first use"""
+        if self._index is None:
+            self._index = AnchorIndex(self.text)
+        return self._index
+
+
+class DocumentCache:
+    """
+    Latest text per document, keyed by document id.
+    Older versions never overwrite newer ones, so replication and
+    local edits can both feed the cache in any order.
+    """
+
+    def __init__(self, maxsize: int = DOCUMENT_CACHE_SIZE):
+        self._entries = LRUCache(maxsize)
+
+    def get(self, document_id: Any) -> Optional[CachedDocument]:
+        return self._entries.get(str(document_id))
+
+    def put(
+        self,
+        document_id: Any,
+        version: int,
+        text: str,
+        timestamp: Optional[datetime] = None,
+    ) -> CachedDocument:
+        key = str(document_id)
+        current = self._entries.get(key)
+        if current and current.version > version:
+            return current
+        return self._entries.put(key, CachedDocument(key, version, text, as_utc(timestamp)))
+
+    def advance(
+        self,
+        document_id: Any,
+        base_version: int,
+        version: int,
+        text: str,
+        timestamp: Optional[datetime],
+        span: Tuple[int, int, int],
+    ) -> CachedDocument:
+        """
+        Store a version produced by a single edit on base_version.
+        span is (start, old_end, new_end) of the edited region; when the cached
+        base version has an anchor index it is updated incrementally and moved over.
+        """
+        key = str(document_id)
+        current = self._entries.get(key)
+        if current and current.version > version:
+            return current
+        entry = CachedDocument(key, version, text, as_utc(timestamp))
+        if current and current.version == base_version and current._index is not None:
+            start, old_end, new_end = span
+            current._index.apply_edit(text, start, old_end, new_end)
+            entry._index, current._index = current._index, None
+        return self._entries.put(key, entry)
+
+    def invalidate(self, document_id: Any):
+        self._entries.pop(str(document_id))
+
+    def clear(self):
+        self._entries.clear()
+
+
+class ActiveDocumentPointer:
+    """
+    Latest active document as seen by this process.
+    Entries expire after ttl seconds so sessions created through another
+    worker are picked up by the next database lookup.
+    """
+
+    def __init__(self, ttl: float = ACTIVE_DOCUMENT_TTL):
+        self.ttl = ttl
+        self.document_id: Optional[Any] = None
+        self._created_at: float = 0.0
+        self._checked_at: float = 0.0
+
+    @staticmethod
+    def _epoch(value: Optional[datetime]) -> float:
+        if value is None:
+            return time.time()
+        return as_utc(value).timestamp()
+
+    def get(self) -> Optional[Any]:
+        if self.document_id is None or time.monotonic() - self._checked_at > self.ttl:
+            return None
+        return self.document_id
+
+    def set(self, document_id: Any, created_at: Optional[datetime] = None):
+        """Point at a session known to be the latest active one"""
+        self.document_id = document_id
+        self._created_at = self._epoch(created_at)
+        self._checked_at = time.monotonic()
+
+    def offer(self, document_id: Any, created_at: Optional[datetime], active: bool):
+        """Update pointer from a session seen elsewhere (e.g. replication)"""
+        if not active:
+            self.clear(document_id)
+        elif self.document_id is not None and self._epoch(created_at) >= self._created_at:
+            # Without a pointer the next lookup queries the database instead
+            self.set(document_id, created_at)
+
+    def clear(self, document_id: Optional[Any] = None):
+        if document_id is None or str(document_id) == str(self.document_id):
+            self.document_id = None
+
+
+document_cache = DocumentCache()
+active_document = ActiveDocumentPointer()
+
+# Diff segments keyed by (document_id, base_version, target_version); versions are immutable
+diff_cache = LRUCache(DIFF_CACHE_SIZE)
@@ -0,0 +1,193 @@
+"""
+Compression of stored document text and HTTP responses
+zstd (with an optional per-deployment dictionary) is used when the
+zstandard package is installed; zlib/gzip from the standard library otherwise.
+"""
+import os
+import gzip
+import zlib
+import logging
+from typing import List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# none, zlib or zstd
+TEXT_COMPRESSION = os.getenv("TEXT_COMPRESSION", "none").lower()
+COMPRESSION_DICT_PATH = os.getenv("COMPRESSION_DICT_PATH", "")
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "3"))
+# Texts shorter than this are stored as plain text
+MIN_COMPRESSED_TEXT_LENGTH = int(os.getenv("MIN_COMPRESSED_TEXT_LENGTH", "512"))
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))
+
+_dictionary = None
+if zstandard is not None and COMPRESSION_DICT_PATH and os.path.exists(COMPRESSION_DICT_PATH):
+    with open(COMPRESSION_DICT_PATH, "rb") as dict_file:
+        _dictionary = zstandard.ZstdCompressionDict(dict_file.read())
+    logger.info(f"Loaded zstd dictionary {_dictionary.dict_id()} from {COMPRESSION_DICT_PATH}")
+
+
+def _zstd_codec() -> str:
+    return f"zstd:{_dictionary.dict_id()}" if _dictionary is not None else "zstd"
+
+
+def compress_text(text: str) -> Tuple[Optional[bytes], Optional[str]]:
+    """
+    Compress text for storage according to TEXT_COMPRESSION.
+    Returns (body, codec), or (None, None) if the text should be stored as is.
+    """
+    if TEXT_COMPRESSION == "none" or len(text) < MIN_COMPRESSED_TEXT_LENGTH:
+        return None, None
+    raw = text.encode("utf-8")
+    if TEXT_COMPRESSION == "zstd" and zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL, dict_data=_dictionary)
+        return compressor.compress(raw), _zstd_codec()
+    return zlib.compress(raw, 6), "zlib"
+
+
+def decompress_text(body: bytes, codec: str) -> str:
+    """Inverse of compress_text"""
+    if codec == "zlib":
+        return zlib.decompress(body).decode("utf-8")
+    if codec.startswith("zstd"):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed documents")
+        dict_data = None
+        if ":" in codec:
+            dict_id = int(codec.split(":", 1)[1])
+            if _dictionary is None or _dictionary.dict_id() != dict_id:
+                raise RuntimeError(f"zstd dictionary {dict_id} is not loaded (COMPRESSION_DICT_PATH)")
+            dict_data = _dictionary
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(body).decode("utf-8")
+    raise ValueError(f"Unknown text codec: {codec}")
+
+
+def train_dictionary(samples: List[str], dict_size: int = 112640) -> bytes:
+    """Train a zstd dictionary from sample document texts"""
+    if zstandard is None:
+        raise RuntimeError("zstandard is required to train a dictionary")
+    trained = zstandard.train_dictionary(dict_size, [sample.encode("utf-8") for sample in samples])
+    return trained.as_bytes()
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick zstd or gzip from an Accept-Encoding header"""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    if "zstd" in accepted and zstandard is not None:
+        return "zstd"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(body)
+    return gzip.compress(body, compresslevel=6)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing complete (non-streaming) responses with
+    zstd or gzip according to Accept-Encoding.
+    """
+
+    def __init__(self, app, minimum_size: int = RESPONSE_COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for key, value in scope.get("headers", []):
+            if key == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = dict(start_message.get("headers", []))
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or b"content-encoding" in headers
+                or headers.get(b"content-type", b"").startswith(b"text/event-stream")
+            ):
+                # Streaming or small responses are sent untouched
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress_body(body, encoding)
+            response_headers = [
+                (key, value)
+                for key, value in start_message.get("headers", [])
+                if key not in (b"content-length", b"vary")
+            ]
+            vary = headers.get(b"vary")
+            response_headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"),
+            ]
+            await send({**start_message, "headers": response_headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+async def _train_from_database(output: str, limit: int, dict_size: int):
+    from sqlalchemy import select, desc
+    from app.database import AsyncSessionLocal
+    from app.models import TextBlob
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(TextBlob).order_by(desc(TextBlob.created_at)).limit(limit))
+        samples = [blob.text for blob in result.scalars().all() if blob.text]
+    with open(output, "wb") as dict_file:
+        dict_file.write(train_dictionary(samples, dict_size))
+    print(f"Trained dictionary from {len(samples)} versions -> {output}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+
+    parser = argparse.ArgumentParser(description="Train a zstd dictionary from stored document texts")
+    parser.add_argument("--output", required=True, help="Path to write the dictionary to (COMPRESSION_DICT_PATH)")
+    parser.add_argument("--limit", type=int, default=2000, help="Number of most recent texts to sample")
+    parser.add_argument("--dict-size", type=int, default=112640, help="Dictionary size in bytes")
+    args = parser.parse_args()
+    asyncio.run(_train_from_database(args.output, args.limit, args.dict_size))
@@ -0,0 +1,98 @@
+"""
+Background recording of rejected edits
+Rejections are kept for auditing but written in batches off the request path
+"""
+import os
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models import DocumentSession, Edit
+
+logger = logging.getLogger(__name__)
+
+REJECTED_EDIT_BATCH_SIZE = int(os.getenv("REJECTED_EDIT_BATCH_SIZE", "100"))
+REJECTED_EDIT_FLUSH_INTERVAL = float(os.getenv("REJECTED_EDIT_FLUSH_INTERVAL", "1.0"))
+REJECTED_EDIT_QUEUE_SIZE = int(os.getenv("REJECTED_EDIT_QUEUE_SIZE", "10000"))
+
+
+class RejectedEditRecorder:
+    """Queue rejected edits and insert them in bulk"""
+
+    def __init__(
+        self,
+        batch_size: int = REJECTED_EDIT_BATCH_SIZE,
+        flush_interval: float = REJECTED_EDIT_FLUSH_INTERVAL,
+        queue_size: int = REJECTED_EDIT_QUEUE_SIZE,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=queue_size)
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, edit_fields: Dict[str, Any]) -> bool:
+        """Enqueue a rejected edit; returns False if the queue is full"""
+        try:
+            self.queue.put_nowait(edit_fields)
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"Rejected edit queue full, dropping audit record {edit_fields.get('edit_id')}")
+            return False
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background writer and flush whatever is still queued"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while not self.queue.empty():
+            await self._flush(self._drain(self.batch_size))
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        batch: List[Dict[str, Any]] = []
+        while len(batch) < limit and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = [await self.queue.get()]
+            try:
+                # Give concurrent rejections a moment to accumulate into one insert
+                await asyncio.sleep(self.flush_interval)
+            finally:
+                batch.extend(self._drain(self.batch_size - 1))
+                await self._flush(batch)
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                # Rejections of documents deleted before the flush would be orphans
+                result = await db.execute(
+                    select(DocumentSession.document_id).where(
+                        DocumentSession.document_id.in_({fields["document_id"] for fields in batch})
+                    )
+                )
+                existing = set(result.scalars().all())
+                kept = [fields for fields in batch if fields["document_id"] in existing]
+                if kept:
+                    db.add_all([Edit(**fields) for fields in kept])
+                    await db.commit()
+            logger.info(f"Recorded {len(kept)} rejected edits, skipped {len(batch) - len(kept)} of deleted documents")
+        except Exception as e:
+            logger.error(f"Failed to record {len(batch)} rejected edits: {e}")
+
+
+rejected_edit_recorder = RejectedEditRecorder()
@@ -4,16 +4,17 @@ FastAPI application entry point
 """
 import logging
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Optional
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, func, update
+from sqlalchemy import select, desc, func, update, delete, tuple_
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
-from app.database import get_db, init_db, AsyncSessionLocal
+from app.database import get_db, init_db, engine, AsyncSessionLocal
 from app.models import (
     Document,
     Edit,
@@ -29,6 +30,7 @@ from app.schemas import (
     DocumentInitResponse,
     EditRequest,
     EditResponse,
+    EditValidationResponse,
     EditListItem,
     ReplicationSyncRequest,
     ReplicationSyncResponse,
@@ -40,8 +42,24 @@ from app.schemas import (
     DiffSegment,
     AgentRole,
 )
-from app.operations import apply_operation_to_text, validate_edit_request, build_diff_segments
+from app.operations import (
+    locate_operation,
+    resolve_anchor,
+    edit_target,
+    validate_edit_request,
+    build_diff_segments,
+    diff_segments_from_change,
+    text_digest,
+)
 from app.replication import replicate_to_peers, send_analytics_event, NODE_ID
+from app.cache import document_cache, diff_cache, active_document, CachedDocument
+from app.edit_log import rejected_edit_recorder
+from app.compression import CompressionMiddleware
+from app.blobs import add_version, release_versions
+from app.serialization import FastJSONResponse
+from app.metrics import DB_POOL_CONNECTIONS, EDITS_TOTAL, QUEUE_DEPTH, MetricsMiddleware, StageTimer
+from app.profiling import ProfilingMiddleware, create_profiling_router, install_sql_timing
+from app.tracing import TracingMiddleware, set_span_attributes
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -124,8 +142,10 @@ async def lifespan(app: FastAPI):
     logger.info(f"Text Service starting - Node: {NODE_ID}")
     await init_db()
     logger.info("Database initialized")
+    await rejected_edit_recorder.start()
     yield
     logger.info("Text Service shutting down")
+    await rejected_edit_recorder.stop()
 
 
 app = FastAPI(
@@ -133,6 +153,7 @@ app = FastAPI(
     description="Distributed document management service",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # Configure CORS
@@ -142,8 +163,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Before-Updated-At", "X-Next-Before-Document-Id"],
 )
 
+# zstd/gzip for large JSON responses (document texts, diffs, edit lists)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+# Profile requests sent with the X-Profile header or sampled by PROFILE_SAMPLE_RATE
+app.add_middleware(ProfilingMiddleware)
+app.include_router(create_profiling_router())
+install_sql_timing(engine)
+
+# Outermost: every request runs in a span continuing the caller's traceparent
+app.add_middleware(TracingMiddleware)
+
 
 async def resolve_document_session(
     db: AsyncSession,
@@ -151,6 +185,17 @@ async def resolve_document_session(
     include_inactive: bool = False,
 ) -> Optional[DocumentSession]:
     """Get document session either by id or latest (optionally active only)."""
+    if not document_id and not include_inactive:
+        # Latest active session is resolved from the in-memory pointer when fresh.
+        # The row itself is still read by primary key: status, current_version and
+        # token usage change through other workers and must not be served stale.
+        active_id = active_document.get()
+        if active_id is not None:
+            session_obj = await db.get(DocumentSession, active_id)
+            if session_obj and session_obj.status == DocumentStatus.ACTIVE:
+                return session_obj
+            active_document.clear(active_id)
+
     query = select(DocumentSession)
     if document_id:
         query = query.where(DocumentSession.document_id == uuid.UUID(document_id))
@@ -159,7 +204,10 @@ async def resolve_document_session(
         if not include_inactive:
             query = query.where(DocumentSession.status == DocumentStatus.ACTIVE)
     result = await db.execute(query.limit(1))
-    return result.scalar_one_or_none()
+    session_obj = result.scalar_one_or_none()
+    if session_obj and not document_id and not include_inactive:
+        active_document.set(session_obj.document_id, session_obj.created_at)
+    return session_obj
 
 
 async def get_budget(db: AsyncSession, document_id: uuid.UUID) -> Optional[TokenBudget]:
@@ -207,13 +255,54 @@ async def get_latest_document(db: AsyncSession, document_id: uuid.UUID) -> Optio
     return result.scalar_one_or_none()
 
 
-def build_document_response(
+async def get_latest_snapshot(db: AsyncSession, session: DocumentSession) -> Optional[CachedDocument]:
+    """
+    Fetch latest document text, served from the in-process cache when it is current.
+    The latest version number comes from the session catalog, falling back to the
+    documents table for sessions created before the catalog existed.
+    """
+    document_id = session.document_id
+    latest_version = session.current_version
+    if not latest_version:
+        result = await db.execute(
+            select(func.max(Document.version)).where(Document.document_id == document_id)
+        )
+        latest_version = result.scalar()
+    if latest_version is None:
+        return None
+
+    cached = document_cache.get(document_id)
+    if cached and cached.version == latest_version:
+        return cached
+
+    doc = await get_latest_document(db, document_id)
+    if not doc:
+        return None
+    return document_cache.put(doc.document_id, doc.version, doc.text, doc.timestamp)
+
+
+def update_catalog(
     session: DocumentSession,
-    doc: Document,
+    version: int,
+    text: str,
+    editor: Optional[str],
+):
+    """Record latest version metadata on the session row for cheap listing."""
+    if (session.current_version or 0) >= version:
+        return
+    session.current_version = version
+    session.text_length = len(text)
+    session.text_hash = text_digest(text)
+    session.last_editor = editor
+
+
+def build_document_payload(
+    session: DocumentSession,
+    doc: CachedDocument,
     budget: Optional[TokenBudget],
     settings: Optional[DocumentSettings],
-) -> DocumentResponse:
-    """Compose document response with metadata."""
+) -> dict:
+    """Compose DocumentResponse fields with metadata, reusing the cached serialized text."""
     default_agent_count = 3 if session.mode == "light" else 10
     agent_count = settings.agent_count if settings else default_agent_count
     if not agent_count or agent_count <= 0:
@@ -221,24 +310,24 @@ def build_document_response(
     max_edits_per_agent = settings.max_edits_per_agent if settings and settings.max_edits_per_agent else safe_div_int(session.max_edits, agent_count)
     agent_roles = settings.agent_roles if settings and settings.agent_roles else resolve_default_roles(session.mode, agent_count)
 
-    return DocumentResponse(
-        document_id=str(session.document_id),
-        version=doc.version,
-        text=doc.text,
-        timestamp=doc.timestamp,
-        topic=session.topic,
-        mode=session.mode,
-        status=session.status.value,
-        max_edits=session.max_edits,
-        token_budget=session.token_budget,
-        token_used=budget.total_tokens if budget else session.token_used,
-        finished_at=session.finished_at,
-        final_version=session.final_version,
-        total_versions=doc.version,
-        agent_count=agent_count,
-        max_edits_per_agent=max_edits_per_agent,
-        agent_roles=agent_roles,
-    )
+    return {
+        "document_id": str(session.document_id),
+        "version": doc.version,
+        "text": doc.text_json,
+        "timestamp": doc.timestamp,
+        "topic": session.topic,
+        "mode": session.mode,
+        "status": session.status.value,
+        "max_edits": session.max_edits,
+        "token_budget": session.token_budget,
+        "token_used": budget.total_tokens if budget else session.token_used,
+        "finished_at": session.finished_at,
+        "final_version": session.final_version,
+        "total_versions": doc.version,
+        "agent_count": agent_count,
+        "max_edits_per_agent": max_edits_per_agent,
+        "agent_roles": [AgentRole.model_validate(role) for role in agent_roles],
+    }
 
 
 @app.get("/health")
@@ -247,6 +336,18 @@ async def health_check():
     return {"status": "healthy", "node_id": NODE_ID}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics"""
+    pool = engine.pool
+    if hasattr(pool, "checkedout"):
+        DB_POOL_CONNECTIONS.labels(state="checked_out").set(pool.checkedout())
+        DB_POOL_CONNECTIONS.labels(state="idle").set(pool.checkedin())
+        DB_POOL_CONNECTIONS.labels(state="overflow").set(max(0, pool.overflow()))
+    QUEUE_DEPTH.labels(queue="rejected_edits").set(rejected_edit_recorder.queue.qsize())
+    return Response(generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
 @app.get("/api/document/current", response_model=DocumentResponse)
 async def get_current_document(
     document_id: Optional[str] = None,
@@ -259,65 +360,93 @@ async def get_current_document(
     if not session_obj:
         raise HTTPException(status_code=404, detail="No document found")
 
-    doc = await get_latest_document(db, session_obj.document_id)
-    if not doc:
+    current_doc = await get_latest_snapshot(db, session_obj)
+    if not current_doc:
         raise HTTPException(status_code=404, detail="No document versions found")
 
     budget = await get_budget(db, session_obj.document_id)
     settings = await get_document_settings(db, session_obj.document_id)
-    return build_document_response(session_obj, doc, budget, settings)
+    return FastJSONResponse(build_document_payload(session_obj, current_doc, budget, settings))
 
 
 @app.get("/api/documents", response_model=List[DocumentListItem])
-async def list_documents(db: AsyncSession = Depends(get_db)):
-    """List document sessions with current version info."""
-    versions_subquery = (
-        select(Document.document_id, func.max(Document.version).label("current_version"))
-        .group_by(Document.document_id)
-        .subquery()
-    )
-
-    result = await db.execute(
-        select(DocumentSession, versions_subquery.c.current_version)
-        .outerjoin(
-            versions_subquery,
-            DocumentSession.document_id == versions_subquery.c.document_id,
-        )
-        .order_by(desc(DocumentSession.updated_at))
+async def list_documents(
+    limit: int = 100,
+    status: Optional[str] = None,
+    mode: Optional[str] = None,
+    before_updated_at: Optional[datetime] = None,
+    before_document_id: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    List document sessions with current version info (most recently updated first).
+    When more sessions follow, X-Next-Before-Updated-At and X-Next-Before-Document-Id
+    hold the cursor of the next page (the before_updated_at/before_document_id parameters).
+    """
+    query = select(DocumentSession).order_by(
+        desc(DocumentSession.updated_at), desc(DocumentSession.document_id)
     )
-
-    items: List[DocumentListItem] = []
-    for session_obj, current_version in result.all():
-        items.append(
-            DocumentListItem(
-                document_id=str(session_obj.document_id),
-                topic=session_obj.topic,
-                mode=session_obj.mode,
-                status=session_obj.status.value,
-                current_version=int(current_version or 0),
-                final_version=session_obj.final_version,
-                updated_at=session_obj.updated_at,
-                finished_at=session_obj.finished_at,
+    if status:
+        try:
+            query = query.where(DocumentSession.status == DocumentStatus(status))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+    if mode:
+        query = query.where(DocumentSession.mode == mode)
+    if before_updated_at is not None:
+        if before_document_id:
+            query = query.where(
+                tuple_(DocumentSession.updated_at, DocumentSession.document_id)
+                < tuple_(before_updated_at, uuid.UUID(before_document_id))
             )
+        else:
+            query = query.where(DocumentSession.updated_at < before_updated_at)
+
+    # One extra row tells whether another page follows
+    result = await db.execute(query.limit(limit + 1))
+    sessions = result.scalars().all()
+    headers = None
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        last = sessions[-1]
+        headers = {
+            "X-Next-Before-Updated-At": last.updated_at.isoformat(),
+            "X-Next-Before-Document-Id": str(last.document_id),
+        }
+
+    items = [
+        DocumentListItem(
+            document_id=str(session_obj.document_id),
+            topic=session_obj.topic,
+            mode=session_obj.mode,
+            status=session_obj.status.value,
+            current_version=session_obj.current_version or 0,
+            final_version=session_obj.final_version,
+            updated_at=session_obj.updated_at,
+            finished_at=session_obj.finished_at,
+            text_length=session_obj.text_length,
+            text_hash=session_obj.text_hash,
+            last_editor=session_obj.last_editor,
         )
-    return items
+        for session_obj in sessions
+    ]
+    return FastJSONResponse(items, headers=headers)
 
 
 @app.get("/api/document/{document_id}/versions", response_model=List[VersionItem])
 async def get_document_versions(
     document_id: str,
     limit: int = 50,
+    before_version: Optional[int] = None,
     db: AsyncSession = Depends(get_db),
 ):
-    """Get list of document versions (latest first)."""
+    """Get list of document versions (latest first), paged by before_version cursor."""
     doc_uuid = uuid.UUID(document_id)
-    result = await db.execute(
-        select(Document)
-        .where(Document.document_id == doc_uuid)
-        .order_by(desc(Document.version))
-        .limit(limit)
-    )
-    versions = result.scalars().all()
+    query = select(Document.version, Document.timestamp).where(Document.document_id == doc_uuid)
+    if before_version is not None:
+        query = query.where(Document.version < before_version)
+    result = await db.execute(query.order_by(desc(Document.version)).limit(limit))
+    versions = result.all()
     return [
         VersionItem(version=doc.version, timestamp=doc.timestamp)
         for doc in versions
@@ -348,19 +477,29 @@ async def get_version_diff(
     if base_version is None:
         base_version = max(0, version - 1)
 
-    base_doc = None
-    if base_version > 0:
-        base_result = await db.execute(
-            select(Document).where(
-                Document.document_id == doc_uuid, Document.version == base_version
+    cache_key = (doc_uuid, base_version, version)
+    segments = diff_cache.get(cache_key)
+    if segments is None:
+        base_doc = None
+        if base_version > 0:
+            base_result = await db.execute(
+                select(Document).where(
+                    Document.document_id == doc_uuid, Document.version == base_version
+                )
             )
-        )
-        base_doc = base_result.scalar_one_or_none()
+            base_doc = base_result.scalar_one_or_none()
 
-    base_text = base_doc.text if base_doc else ""
-    segments = build_diff_segments(base_text, target_doc.text)
-    if not segments and target_doc.text:
-        segments = [DiffSegment(type="insert", text=target_doc.text).model_dump()]
+        base_text = base_doc.text if base_doc else ""
+        if base_doc and base_version == version - 1 and target_doc.change_start is not None:
+            # Consecutive versions: derive the diff from the applied edit span
+            segments = diff_segments_from_change(
+                base_text, target_doc.text, target_doc.change_start, target_doc.change_end
+            )
+        if segments is None:
+            segments = build_diff_segments(base_text, target_doc.text)
+        if not segments and target_doc.text:
+            segments = [DiffSegment(type="insert", text=target_doc.text).model_dump()]
+        diff_cache.put(cache_key, segments)
 
     return VersionDiffResponse(
         document_id=str(doc_uuid),
@@ -388,6 +527,7 @@ async def stop_document(
         session_obj.finished_at = datetime.utcnow()
         session_obj.final_version = doc.version if doc else session_obj.final_version
         await db.commit()
+        active_document.clear(session_obj.document_id)
 
     return DocumentActionResponse(
         document_id=str(session_obj.document_id),
@@ -397,6 +537,31 @@ async def stop_document(
     )
 
 
+@app.delete("/api/document/{document_id}", response_model=DocumentActionResponse)
+async def delete_document(
+    document_id: str,
+    db: AsyncSession = Depends(get_db),
+):
+    """Delete a document session with its versions and edits on this node."""
+    session_obj = await resolve_document_session(db, document_id, include_inactive=True)
+    if not session_obj:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    doc_uuid = session_obj.document_id
+    await release_versions(db, doc_uuid)
+    await db.execute(delete(Edit).where(Edit.document_id == doc_uuid))
+    await db.execute(delete(TokenBudget).where(TokenBudget.document_id == doc_uuid))
+    await db.execute(delete(DocumentSettings).where(DocumentSettings.document_id == doc_uuid))
+    await db.delete(session_obj)
+    await db.commit()
+    document_cache.invalidate(doc_uuid)
+    active_document.clear(doc_uuid)
+
+    logger.info(f"Deleted document {doc_uuid}")
+
+    return DocumentActionResponse(document_id=str(doc_uuid), status="deleted")
+
+
 @app.post("/api/document/{document_id}/finalize", response_model=DocumentActionResponse)
 async def finalize_document(
     document_id: str,
@@ -413,6 +578,7 @@ async def finalize_document(
     session_obj.finished_at = session_obj.finished_at or now
     session_obj.final_version = doc.version if doc else session_obj.final_version
     await db.commit()
+    active_document.clear(session_obj.document_id)
 
     return DocumentActionResponse(
         document_id=str(session_obj.document_id),
@@ -473,14 +639,15 @@ async def init_document(
         base_text = f"{seed}\n\n" if seed else ""
 
     # Create initial document version
-    doc = Document(
+    doc = await add_version(
+        db,
+        base_text,
         document_id=doc_session.document_id,
         version=1,
-        text=base_text,
-        timestamp=datetime.utcnow(),
+        timestamp=datetime.now(timezone.utc),
         edit_id=None,
     )
-    db.add(doc)
+    update_catalog(doc_session, doc.version, doc.text, None)
 
     settings = DocumentSettings(
         document_id=doc_session.document_id,
@@ -491,6 +658,8 @@ async def init_document(
     db.add(settings)
     await db.commit()
     await db.refresh(doc_session)
+    document_cache.put(doc_session.document_id, doc.version, doc.text, doc.timestamp)
+    active_document.set(doc_session.document_id, doc_session.created_at)
 
     logger.info(
         f"Initialized document {doc_session.document_id} with topic: {request.topic}, mode: {request.mode}"
@@ -540,12 +709,52 @@ async def init_document(
     )
 
 
+@app.post("/api/edits/validate", response_model=EditValidationResponse)
+async def validate_edit(
+    edit_request: EditRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Check whether an edit would apply to the latest document version without submitting it"""
+    is_valid, error_msg = validate_edit_request(edit_request)
+    if not is_valid:
+        return EditValidationResponse(document_id=edit_request.document_id, valid=False, reason=error_msg)
+
+    session_obj = await resolve_document_session(db, edit_request.document_id, include_inactive=False)
+    if not session_obj:
+        raise HTTPException(status_code=404, detail="No active document found")
+    if session_obj.status != DocumentStatus.ACTIVE:
+        return EditValidationResponse(
+            document_id=str(session_obj.document_id),
+            valid=False,
+            reason="Document is not active",
+        )
+
+    current_doc = await get_latest_snapshot(db, session_obj)
+    if not current_doc:
+        raise HTTPException(status_code=404, detail="No document found")
+
+    located = locate_operation(current_doc.text, edit_request, current_doc.index)
+    target = edit_target(edit_request)
+    matches = resolve_anchor(current_doc.text, target, current_doc.index) if target else []
+    best = max(matches, key=lambda match: match.confidence) if matches else None
+    return EditValidationResponse(
+        document_id=str(session_obj.document_id),
+        valid=located is not None,
+        version=current_doc.version,
+        reason=None if located else "Anchor or target text not found in current version",
+        matches=len(matches),
+        match_kind=best.kind if best else None,
+        confidence=best.confidence if best else None,
+    )
+
+
 @app.post("/api/edits", response_model=EditResponse)
 async def submit_edit(
     edit_request: EditRequest,
     db: AsyncSession = Depends(get_db),
 ):
     """Submit an edit from agent"""
+    timer = StageTimer()
     # Validate edit request
     is_valid, error_msg = validate_edit_request(edit_request)
     if not is_valid:
@@ -557,6 +766,7 @@ async def submit_edit(
         raise HTTPException(status_code=404, detail="No active document found")
     if session_obj.status != DocumentStatus.ACTIVE:
         raise HTTPException(status_code=409, detail="Document is not active")
+    timer.mark("resolve_session")
 
     # Start transaction
     try:
@@ -585,57 +795,68 @@ async def submit_edit(
                 }
             )
 
+            EDITS_TOTAL.labels(outcome="budget_exceeded").inc()
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail="Token budget exceeded",
             )
+        timer.mark("budget_check")
 
         # Get current document
-        current_doc = await get_latest_document(db, session_obj.document_id)
+        current_doc = await get_latest_snapshot(db, session_obj)
         if not current_doc:
             raise HTTPException(status_code=404, detail="No document found")
+        timer.mark("load_document")
+
+        edit_fields = {
+            "edit_id": uuid.uuid4(),
+            "document_id": session_obj.document_id,
+            "agent_id": edit_request.agent_id,
+            "operation": edit_request.operation,
+            "anchor": edit_request.anchor,
+            "position": edit_request.position,
+            "old_text": edit_request.old_text,
+            "new_text": edit_request.new_text,
+            "tokens_used": edit_request.tokens_used,
+            "created_at": datetime.utcnow(),
+        }
 
-        # Create edit record
-        edit = Edit(
-            document_id=session_obj.document_id,
-            agent_id=edit_request.agent_id,
-            operation=edit_request.operation,
-            anchor=edit_request.anchor,
-            position=edit_request.position,
-            old_text=edit_request.old_text,
-            new_text=edit_request.new_text,
-            tokens_used=edit_request.tokens_used,
-            status=EditStatus.PENDING,
-            created_at=datetime.utcnow(),
-        )
-        db.add(edit)
-        await db.flush()
-
-        # Apply operation to text
-        new_text, applied = apply_operation_to_text(current_doc.text, edit_request)
+        # Dry-run the operation before writing anything
+        located = locate_operation(current_doc.text, edit_request, current_doc.index)
+        timer.mark("apply")
 
-        if not applied:
-            edit.status = EditStatus.REJECTED
-            await db.commit()
+        if located is None:
+            # Rejections are audited in bulk off the request path
+            rejected_edit_recorder.record({**edit_fields, "status": EditStatus.REJECTED})
+            EDITS_TOTAL.labels(outcome="rejected").inc()
 
-            logger.warning(f"Edit {edit.edit_id} rejected: could not apply operation")
+            logger.warning(f"Edit {edit_fields['edit_id']} rejected: could not apply operation")
             return EditResponse(
                 document_id=str(session_obj.document_id),
-                edit_id=str(edit.edit_id),
+                edit_id=str(edit_fields["edit_id"]),
                 status="rejected",
                 version=current_doc.version,
             )
 
+        start, end, replacement = located
+        new_text = current_doc.text[:start] + replacement + current_doc.text[end:]
+
+        # Create edit record
+        edit = Edit(**edit_fields, status=EditStatus.PENDING)
+        db.add(edit)
+
         # Create new document version
         new_version = current_doc.version + 1
-        new_doc = Document(
+        new_doc = await add_version(
+            db,
+            new_text,
             document_id=session_obj.document_id,
             version=new_version,
-            text=new_text,
-            timestamp=datetime.utcnow(),
+            timestamp=datetime.now(timezone.utc),
             edit_id=edit.edit_id,
+            change_start=start,
+            change_end=end,
         )
-        db.add(new_doc)
 
         # Update edit status
         edit.status = EditStatus.ACCEPTED
@@ -652,6 +873,7 @@ async def submit_edit(
         )
         session_obj.token_used = new_total_tokens
         session_obj.updated_at = datetime.utcnow()
+        update_catalog(session_obj, new_version, new_text, edit_request.agent_id)
 
         # Mark as completed when max edits reached
         edits_applied = new_version - 1
@@ -661,6 +883,21 @@ async def submit_edit(
             session_obj.final_version = new_version
 
         await db.commit()
+        document_cache.advance(
+            session_obj.document_id,
+            current_doc.version,
+            new_version,
+            new_text,
+            new_doc.timestamp,
+            (start, end, start + len(replacement)),
+        )
+        if session_obj.status != DocumentStatus.ACTIVE:
+            active_document.clear(session_obj.document_id)
+        timer.mark("commit")
+        EDITS_TOTAL.labels(outcome="accepted").inc()
+        set_span_attributes(
+            document_id=str(session_obj.document_id), edit_id=str(edit.edit_id), version=new_version
+        )
 
         logger.info(
             f"Edit {edit.edit_id} accepted for {session_obj.document_id}, new version: {new_version}"
@@ -679,6 +916,8 @@ async def submit_edit(
                     "operation": edit_request.operation,
                     "node_id": NODE_ID,
                     "document_id": str(session_obj.document_id),
+                    # Request received to commit on this node
+                    "latency_ms": round(timer.elapsed_ms, 3),
                 },
             }
         )
@@ -696,6 +935,8 @@ async def submit_edit(
                 }
             )
 
+        timer.mark("analytics")
+
         # Replicate to peers (async, don't wait)
         settings = await get_document_settings(db, session_obj.document_id)
 
@@ -709,6 +950,7 @@ async def submit_edit(
             "agent_roles": settings.agent_roles if settings else None,
             "token_budget": session_obj.token_budget,
             "final_version": session_obj.final_version,
+            "last_editor": edit_request.agent_id,
         }
         await replicate_to_peers(
             str(session_obj.document_id),
@@ -718,7 +960,9 @@ async def submit_edit(
             str(edit.edit_id),
             session_metadata,
             new_total_tokens,
+            change_span=(start, end),
         )
+        timer.mark("replication")
 
         return EditResponse(
             document_id=str(session_obj.document_id),
@@ -741,32 +985,55 @@ async def get_edits(
     limit: int = 50,
     offset: int = 0,
     document_id: Optional[str] = None,
+    agent_id: Optional[str] = None,
+    status: Optional[str] = None,
+    after_created_at: Optional[datetime] = None,
+    after_edit_id: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
 ):
-    """Get list of edits with pagination"""
-    query = select(Edit).order_by(desc(Edit.created_at))
+    """
+    Get list of edits (newest first) with pagination.
+    Pass created_at and edit_id of the last item seen as after_created_at/after_edit_id
+    to fetch the next page; cost does not depend on page depth, unlike offset.
+    """
+    query = select(Edit).order_by(desc(Edit.created_at), desc(Edit.edit_id))
     if document_id:
         query = query.where(Edit.document_id == uuid.UUID(document_id))
+    if agent_id:
+        query = query.where(Edit.agent_id == agent_id)
+    if status:
+        try:
+            query = query.where(Edit.status == EditStatus(status))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+    if after_created_at is not None:
+        if after_edit_id:
+            query = query.where(
+                tuple_(Edit.created_at, Edit.edit_id) < tuple_(after_created_at, uuid.UUID(after_edit_id))
+            )
+        else:
+            query = query.where(Edit.created_at < after_created_at)
 
     result = await db.execute(query.limit(limit).offset(offset))
     edits = result.scalars().all()
 
-    return [
-        EditListItem(
-            document_id=str(edit.document_id),
-            edit_id=edit.edit_id,
-            agent_id=edit.agent_id,
-            operation=edit.operation,
-            status=edit.status.value,
-            tokens_used=edit.tokens_used,
-            created_at=edit.created_at,
-            anchor=edit.anchor,
-            position=edit.position,
-            old_text=edit.old_text,
-            new_text=edit.new_text,
-        )
+    # Plain dicts serialized directly; the shape matches EditListItem
+    return FastJSONResponse([
+        {
+            "document_id": str(edit.document_id),
+            "edit_id": edit.edit_id,
+            "agent_id": edit.agent_id,
+            "operation": edit.operation,
+            "status": edit.status.value,
+            "tokens_used": edit.tokens_used,
+            "created_at": edit.created_at,
+            "anchor": edit.anchor,
+            "position": edit.position,
+            "old_text": edit.old_text,
+            "new_text": edit.new_text,
+        }
         for edit in edits
-    ]
+    ])
 
 
 @app.post("/api/replication/sync", response_model=ReplicationSyncResponse)
@@ -895,16 +1162,29 @@ async def replication_sync(
             return ReplicationSyncResponse(status="outdated", version=max_version)
 
         # Apply replication
-        new_doc = Document(
+        await add_version(
+            db,
+            request.text,
             document_id=doc_uuid,
             version=request.version,
-            text=request.text,
             timestamp=request.timestamp,
             edit_id=request.edit_id,
+            change_start=request.change_start,
+            change_end=request.change_end,
         )
-        db.add(new_doc)
+        update_catalog(session_obj, request.version, request.text, request.last_editor)
         await db.commit()
+        document_cache.put(doc_uuid, request.version, request.text, request.timestamp)
+        active_document.offer(
+            doc_uuid, session_obj.created_at, session_obj.status == DocumentStatus.ACTIVE
+        )
 
+        set_span_attributes(
+            document_id=request.document_id,
+            version=request.version,
+            source_node=request.source_node,
+            edit_id=request.edit_id,
+        )
         logger.info(f"Replicated version {request.version} for {doc_uuid} from {request.source_node}")
 
         return ReplicationSyncResponse(status="synced", version=request.version)
@@ -945,4 +1225,4 @@ async def replication_catchup(
         f"Catch-up request for document {document_id} versions > {since_version}, returning {len(versions)} versions"
     )
 
-    return CatchUpResponse(versions=versions)
+    return FastJSONResponse({"versions": versions})
@@ -0,0 +1,117 @@
+"""
+Prometheus metrics for Text Service
+Exposed at /metrics; histograms cover the edit hot path, the DB pool
+and replication so latency can be attributed without a profiler.
+"""
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Sub-millisecond stages (cache hits, in-memory apply) up to slow commits
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "text_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+EDIT_STAGE_SECONDS = Histogram(
+    "text_edit_stage_duration_seconds",
+    "submit_edit latency by stage",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+EDITS_TOTAL = Counter("text_edits_total", "Submitted edits by outcome", ["outcome"])
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "text_db_pool_checkout_seconds",
+    "Time waiting for a database connection from the pool",
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CONNECTIONS = Gauge("text_db_pool_connections", "Database pool connections by state", ["state"])
+REPLICATION_SECONDS = Histogram(
+    "text_replication_request_seconds",
+    "Replication request latency per peer",
+    ["peer", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+REPLICATION_LAG_SECONDS = Gauge(
+    "text_replication_lag_seconds",
+    "Time from version creation to its acknowledgement by a peer (last replicated version)",
+    ["peer"],
+)
+REPLICATION_END_TO_END_SECONDS = Histogram(
+    "text_replication_end_to_end_seconds",
+    "Time from version creation to its acknowledgement by a peer",
+    ["peer"],
+    buckets=LATENCY_BUCKETS,
+)
+REPLICATION_IN_FLIGHT = Gauge("text_replication_in_flight", "Replication requests in progress")
+QUEUE_DEPTH = Gauge("text_queue_depth", "Items waiting in background queues", ["queue"])
+
+
+class StageTimer:
+    """Record consecutive stages of one request: each mark observes the time since the previous one"""
+
+    def __init__(self, histogram: Histogram = EDIT_STAGE_SECONDS):
+        self.histogram = histogram
+        self._start = self._last = time.perf_counter()
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    def mark(self, stage: str):
+        now = time.perf_counter()
+        self.histogram.labels(stage=stage).observe(now - self._last)
+        self._last = now
+
+
+def observe_replication_lag(peer: str, timestamp: datetime) -> float:
+    """Record lag of a version acknowledged by peer, from its creation timestamp; returns seconds"""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    lag = max(0.0, (datetime.now(timezone.utc) - timestamp).total_seconds())
+    REPLICATION_LAG_SECONDS.labels(peer=peer).set(lag)
+    REPLICATION_END_TO_END_SECONDS.labels(peer=peer).observe(lag)
+    return lag
+
+
+def _route_path(scope) -> Optional[str]:
+    route = scope.get("route")
+    return getattr(route, "path", None)
+
+
+class MetricsMiddleware:
+    """ASGI middleware observing request latency labelled by route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Unmatched paths are grouped to keep label cardinality bounded
+            route = _route_path(scope) or "unmatched"
+            if route != "/metrics":
+                HTTP_REQUEST_SECONDS.labels(scope["method"], route, str(status_code)).observe(
+                    time.perf_counter() - start
+                )
+
@@ -3,12 +3,16 @@ Database models for Text Service
 """
 from datetime import datetime
 from enum import Enum as PyEnum
+from functools import cached_property
 from typing import Optional
-from sqlalchemy import Column, Integer, String, Text, DateTime, BigInteger, Enum, Index, UniqueConstraint, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, BigInteger, Enum, Index, UniqueConstraint, JSON, LargeBinary, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 import uuid
 
+from app.compression import decompress_text
+
 Base = declarative_base()
 
 
@@ -49,6 +53,42 @@ class DocumentSession(Base):
     updated_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     finished_at = Column(DateTime(timezone=True), nullable=True)
     final_version = Column(Integer, nullable=True)
+    # Catalog of the latest version, maintained on edit, init and replication
+    current_version = Column(Integer, nullable=False, default=0)
+    text_length = Column(Integer, nullable=False, default=0)
+    text_hash = Column(String(64), nullable=True)
+    last_editor = Column(String(255), nullable=True)
+
+    __table_args__ = (
+        Index('idx_sessions_updated', 'updated_at', 'document_id'),
+        Index('idx_sessions_status_updated', 'status', 'updated_at'),
+        # Latest active session lookup when agents omit document_id
+        Index(
+            'idx_sessions_active_created',
+            'created_at',
+            postgresql_where=(status == DocumentStatus.ACTIVE),
+        ),
+    )
+
+
+class TextBlob(Base):
+    """Content-addressed document text shared by identical versions"""
+    __tablename__ = "text_blobs"
+
+    hash = Column(String(64), primary_key=True)  # sha256 of the text
+    # Plain text, or NULL when the text is stored compressed in body
+    stored_text = Column("text", Text, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    codec = Column(String(32), nullable=True)
+    size = Column(Integer, nullable=False, default=0)
+    # Number of document versions referencing this blob
+    refcount = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+
+    @cached_property
+    def text(self) -> str:
+        """Blob text, decompressed on first access"""
+        return decompress_text(self.body, self.codec) if self.codec else self.stored_text
 
 
 class Document(Base):
@@ -57,15 +97,26 @@ class Document(Base):
 
     document_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     version = Column(Integer, primary_key=True)
-    text = Column(Text, nullable=False)
+    blob_hash = Column(String(64), ForeignKey("text_blobs.hash"), nullable=False)
     timestamp = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     edit_id = Column(UUID(as_uuid=True), nullable=True)
+    # Span of the previous version replaced by edit_id: text[change_start:change_end]
+    change_start = Column(Integer, nullable=True)
+    change_end = Column(Integer, nullable=True)
 
     __table_args__ = (
         Index('idx_documents_version', 'document_id', 'version', postgresql_using='btree'),
         UniqueConstraint('document_id', 'version', name='uq_document_version'),
+        Index('idx_documents_blob', 'blob_hash'),
     )
 
+    blob = relationship(TextBlob, lazy="joined", innerjoin=True)
+
+    @cached_property
+    def text(self) -> str:
+        """Version text, resolved through the referenced blob; assigned directly for new versions"""
+        return self.blob.text
+
 
 class DocumentSettings(Base):
     """Per-document settings such as agent roles"""
@@ -98,8 +149,11 @@ class Edit(Base):
 
     __table_args__ = (
         Index('idx_edits_status', 'status'),
-        Index('idx_edits_document', 'document_id'),
         Index('idx_edits_created_at', 'created_at'),
+        # Keyset pagination: (created_at, edit_id) cursors within a document or agent
+        Index('idx_edits_document_created', 'document_id', 'created_at', 'edit_id'),
+        Index('idx_edits_document_status', 'document_id', 'status', 'created_at'),
+        Index('idx_edits_agent_created', 'agent_id', 'created_at'),
     )
 
 
@@ -2,8 +2,13 @@
 Core business logic for text operations
 Based on multi_agent_editor_demo_Version2.py
 """
-from typing import Optional, Tuple, List, Dict
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass
 import difflib
+import hashlib
+import heapq
+from typing import Optional, Tuple, List, Dict
 import re
 from app.schemas import EditRequest
 
@@ -13,7 +18,385 @@ MAX_ANCHOR_LENGTH = 5000
 MAX_OLD_TEXT_LENGTH = 5000
 
 
-def apply_operation_to_text(text: str, edit: EditRequest) -> Tuple[str, bool]:
+WORD_RE = re.compile(r"\w+")
+
+
+def text_digest(text: str) -> str:
+    """SHA-256 hex digest of a document text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# Anchor resolution tuning
+MAX_ANCHOR_MATCHES = 50
+NORMALIZED_MATCH_CONFIDENCE = 0.95
+MIN_FUZZY_CONFIDENCE = 0.85
+MIN_FUZZY_ANCHOR_LENGTH = 12
+MAX_FUZZY_CANDIDATES = 8
+# Anchor words with more postings than this are too common to place fuzzy candidates
+MAX_FUZZY_SEED_POSTINGS = 64
+# Characters per anchor index block; an edit re-tokenizes about one block
+INDEX_BLOCK_SIZE = 2048
+
+QUOTE_CHARS = "\"'«»„“”‘’`"
+DASH_CHARS = "-‐‑‒–—―"
+
+
+@dataclass
+class AnchorMatch:
+    """Location of an anchor in a text with match quality"""
+    start: int
+    end: int
+    confidence: float
+    kind: str  # exact, normalized, fuzzy
+
+
+class _IndexBlock:
+    """Postings for one stretch of text, relative to its start"""
+    __slots__ = ("start", "end", "postings")
+
+    def __init__(self, start: int, end: int, postings: Dict[str, List[int]]):
+        self.start = start
+        self.end = end
+        self.postings = postings
+
+
+class AnchorIndex:
+    """
+    Word-position index over a document text.
+    Maps each lowercased word to the offsets where it starts, so anchor
+    lookups verify a handful of candidate positions instead of scanning the text.
+    Postings are kept per block of about INDEX_BLOCK_SIZE characters relative to
+    the block start, so an edit re-tokenizes its own block and shifts later block starts.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.counts: Dict[str, int] = {}
+        self._blocks: List[_IndexBlock] = self._build_blocks(0, len(text))
+
+    def _build_blocks(self, start: int, end: int) -> List[_IndexBlock]:
+        """Index text[start:end], split into blocks at non-word boundaries"""
+        text = self.text
+        blocks = []
+        while start < end:
+            cut = min(end, start + INDEX_BLOCK_SIZE)
+            while cut < end and _is_word_char(text[cut - 1]) and _is_word_char(text[cut]):
+                cut += 1
+            postings: Dict[str, List[int]] = {}
+            for match in WORD_RE.finditer(text, start, cut):
+                word = match.group().lower()
+                postings.setdefault(word, []).append(match.start() - start)
+                self.counts[word] = self.counts.get(word, 0) + 1
+            blocks.append(_IndexBlock(start, cut, postings))
+            start = cut
+        return blocks
+
+    def count(self, word: str) -> int:
+        return self.counts.get(word.lower(), 0)
+
+    def positions(self, word: str) -> List[int]:
+        """Sorted offsets where word starts"""
+        word = word.lower()
+        if word not in self.counts:
+            return []
+        return [
+            block.start + offset
+            for block in self._blocks if word in block.postings
+            for offset in block.postings[word]
+        ]
+
+    @property
+    def postings(self) -> Dict[str, List[int]]:
+        """Absolute positions of every word"""
+        return {word: self.positions(word) for word in self.counts}
+
+    def apply_edit(self, new_text: str, start: int, old_end: int, new_end: int):
+        """
+        Update the index after text[start:old_end] was replaced so that the
+        replacement occupies new_text[start:new_end].
+        Only the blocks touching the edited words are re-tokenized.
+        """
+        delta = new_end - old_end
+        blocks = self._blocks
+        if not blocks:
+            self.text = new_text
+            self._blocks = self._build_blocks(0, len(new_text))
+            return
+
+        old_text = self.text
+        lo = start
+        while lo > 0 and _is_word_char(old_text[lo - 1]):
+            lo -= 1
+        hi = old_end
+        while hi < len(old_text) and _is_word_char(old_text[hi]):
+            hi += 1
+        starts = [block.start for block in blocks]
+        first = max(0, bisect_right(starts, lo) - 1)
+        last = max(first, bisect_right(starts, max(lo, hi - 1)) - 1)
+        # Fold a shrunken block into its neighbour so deletions do not fragment the index
+        if last + 1 < len(blocks) and blocks[last].end + delta - blocks[first].start < INDEX_BLOCK_SIZE // 2:
+            last += 1
+
+        for block in blocks[first:last + 1]:
+            for word, offsets in block.postings.items():
+                remaining = self.counts[word] - len(offsets)
+                if remaining:
+                    self.counts[word] = remaining
+                else:
+                    del self.counts[word]
+        for block in blocks[last + 1:]:
+            block.start += delta
+            block.end += delta
+
+        self.text = new_text
+        rebuilt = self._build_blocks(blocks[first].start, blocks[last].end + delta)
+        blocks[first:last + 1] = rebuilt
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _rare_anchor_words(anchor: str, index: AnchorIndex, inner_only: bool) -> List[Tuple[int, int]]:
+    """
+    Return (offset in anchor, posting count) for anchor words, rarest first.
+    Inner words are guaranteed whole words in the text wherever the anchor matches;
+    words touching the anchor edges may be cut mid-word.
+    """
+    words = []
+    for match in WORD_RE.finditer(anchor):
+        if inner_only and (match.start() == 0 or match.end() == len(anchor)):
+            continue
+        words.append((match.start(), index.count(match.group())))
+    words.sort(key=lambda item: item[1])
+    return words
+
+
+def _find_exact(text: str, anchor: str, index: Optional[AnchorIndex]) -> List[int]:
+    starts: List[int] = []
+    inner = _rare_anchor_words(anchor, index, inner_only=True) if index else []
+    if inner:
+        offset = inner[0][0]
+        word = WORD_RE.match(anchor, offset).group()
+        for pos in index.positions(word):
+            candidate = pos - offset
+            if candidate >= 0 and text.startswith(anchor, candidate):
+                starts.append(candidate)
+                if len(starts) >= MAX_ANCHOR_MATCHES:
+                    break
+        return starts
+
+    idx = text.find(anchor)
+    while idx != -1 and len(starts) < MAX_ANCHOR_MATCHES:
+        starts.append(idx)
+        idx = text.find(anchor, idx + 1)
+    return starts
+
+
+def _normalized_pattern(anchor: str) -> Optional["re.Pattern[str]"]:
+    """Regex matching anchor with any whitespace runs, quote and dash variants"""
+    parts: List[str] = []
+    for chunk in re.findall(r"\s+|\S", anchor.strip()):
+        if chunk.isspace():
+            parts.append(r"\s+")
+        elif chunk in QUOTE_CHARS:
+            parts.append("[" + re.escape(QUOTE_CHARS) + "]")
+        elif chunk in DASH_CHARS:
+            parts.append("[" + re.escape(DASH_CHARS) + "]")
+        else:
+            parts.append(re.escape(chunk))
+    return re.compile("".join(parts)) if parts else None
+
+
+def _find_normalized(text: str, anchor: str, index: Optional[AnchorIndex]) -> List[Tuple[int, int]]:
+    pattern = _normalized_pattern(anchor)
+    if pattern is None:
+        return []
+
+    spans: List[Tuple[int, int]] = []
+    # The pattern is built from the stripped anchor, so its edges decide which words are inner
+    anchor = anchor.strip()
+    inner = _rare_anchor_words(anchor, index, inner_only=True) if index else []
+    if inner:
+        offset = inner[0][0]
+        word = WORD_RE.match(anchor, offset).group()
+        reach = 2 * len(anchor)
+        found = set()
+        for pos in index.positions(word):
+            for match in pattern.finditer(text, max(0, pos - reach), pos + reach):
+                found.add(match.span())
+        # Non-overlapping, leftmost first, as a scan of the whole text returns them
+        for start, end in sorted(found):
+            if not spans or start >= spans[-1][1]:
+                spans.append((start, end))
+                if len(spans) >= MAX_ANCHOR_MATCHES:
+                    break
+        return spans
+
+    for match in pattern.finditer(text):
+        spans.append(match.span())
+        if len(spans) >= MAX_ANCHOR_MATCHES:
+            break
+    return spans
+
+
+def _best_approximate_end(pattern: str, text: str) -> Tuple[int, int]:
+    """
+    Myers' bit-parallel approximate matching.
+    Returns (edit distance, end offset) of the best match of pattern
+    against any substring of text.
+    """
+    m = len(pattern)
+    peq: Dict[str, int] = {}
+    for i, char in enumerate(pattern):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    best_score, best_end = m, 0
+    for j, char in enumerate(text):
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = (ph << 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+        if score < best_score:
+            best_score, best_end = score, j + 1
+    return best_score, best_end
+
+
+def _find_fuzzy(text: str, anchor: str, index: AnchorIndex) -> List[AnchorMatch]:
+    anchor = anchor.strip()
+    max_distance = int(len(anchor) * (1 - MIN_FUZZY_CONFIDENCE))
+    if len(anchor) < MIN_FUZZY_ANCHOR_LENGTH or max_distance < 1:
+        return []
+
+    # Candidate starts from the rarest words, scored by how many anchor words they explain
+    votes: Dict[int, int] = {}
+    # Misspelled words have no postings and stop words are everywhere; neither places candidates
+    seeds = [
+        (offset, count) for offset, count in _rare_anchor_words(anchor, index, inner_only=False)
+        if 0 < count <= MAX_FUZZY_SEED_POSTINGS
+    ]
+    for offset, count in seeds[:3]:
+        word = WORD_RE.match(anchor, offset).group()
+        for pos in index.positions(word):
+            bucket = (pos - offset) // (max_distance + 1)
+            votes[bucket] = votes.get(bucket, 0) + 1
+    candidates = heapq.nsmallest(MAX_FUZZY_CANDIDATES, votes, key=lambda bucket: (-votes[bucket], bucket))
+
+    matches: List[AnchorMatch] = []
+    reversed_anchor = anchor[::-1]
+    anchor_chars = Counter(anchor)
+    for bucket in sorted(candidates):
+        lo = max(0, bucket * (max_distance + 1) - max_distance)
+        hi = min(len(text), lo + len(anchor) + 4 * max_distance + 1)
+        window = text[lo:hi]
+        # Every anchor character missing from the window costs at least one edit
+        shared = sum(min(count, window.count(char)) for char, count in anchor_chars.items())
+        if len(anchor) - shared > max_distance:
+            continue
+        distance, end = _best_approximate_end(anchor, window)
+        if distance > max_distance:
+            continue
+        _, length = _best_approximate_end(reversed_anchor, text[lo:lo + end][::-1])
+        start, end = lo + end - length, lo + end
+        if matches and start < matches[-1].end:
+            continue
+        matches.append(AnchorMatch(start, end, 1 - distance / len(anchor), "fuzzy"))
+    return matches
+
+
+def resolve_anchor(
+    text: str,
+    anchor: str,
+    index: Optional[AnchorIndex] = None,
+    fuzzy: bool = True,
+) -> List[AnchorMatch]:
+    """
+    Find every occurrence of anchor in text.
+    Tries exact matches first, then whitespace/punctuation-normalized matches,
+    then bounded edit distance; returns matches from the first tier that succeeds.
+    """
+    if not anchor or not text:
+        return []
+
+    starts = _find_exact(text, anchor, index)
+    if starts:
+        return [AnchorMatch(start, start + len(anchor), 1.0, "exact") for start in starts]
+
+    spans = _find_normalized(text, anchor, index)
+    if spans:
+        return [AnchorMatch(start, end, NORMALIZED_MATCH_CONFIDENCE, "normalized") for start, end in spans]
+
+    if fuzzy:
+        return _find_fuzzy(text, anchor, index or AnchorIndex(text))
+    return []
+
+
+def edit_target(edit: EditRequest) -> Optional[str]:
+    """Text fragment an edit is positioned against"""
+    if edit.operation.lower() == "insert":
+        return edit.anchor
+    if edit.old_text and edit.old_text.strip():
+        return edit.old_text
+    if edit.anchor and edit.anchor.strip():
+        return edit.anchor
+    return None
+
+
+def locate_operation(
+    text: str,
+    edit: EditRequest,
+    index: Optional[AnchorIndex] = None,
+) -> Optional[Tuple[int, int, str]]:
+    """
+    Resolve where an edit applies.
+    Returns (start, end, replacement) such that the edited text is
+    text[:start] + replacement + text[end:], or None if it cannot apply.
+    """
+    operation = edit.operation.lower()
+
+    if operation == "insert":
+        if not text and edit.new_text:
+            return 0, 0, edit.new_text
+        if not edit.anchor or not edit.new_text or edit.position not in ("before", "after"):
+            return None
+    elif operation == "replace":
+        if not edit.new_text:
+            return None
+    elif operation != "delete":
+        return None
+
+    target = edit_target(edit)
+    if not target:
+        return None
+    matches = resolve_anchor(text, target, index)
+    if not matches:
+        return None
+    match = max(matches, key=lambda item: item.confidence)
+
+    if operation == "insert":
+        insert_pos = match.start if edit.position == "before" else match.end
+        return insert_pos, insert_pos, edit.new_text
+    if operation == "replace":
+        return match.start, match.end, edit.new_text
+    return match.start, match.end, ""
+
+
+def apply_operation_to_text(
+    text: str,
+    edit: EditRequest,
+    index: Optional[AnchorIndex] = None,
+) -> Tuple[str, bool]:
     """
     Apply edit operation to text using anchor-based positioning.
     Returns (new_text, success)
@@ -21,68 +404,14 @@ def apply_operation_to_text(text: str, edit: EditRequest) -> Tuple[str, bool]:
     This follows the logic from multi_agent_editor_demo_Version2.py:
     - All operations use text anchors, not indices
     - If fragment not found, operation fails
+    - Ambiguous anchors resolve to the first occurrence; whitespace and
+      punctuation drift or small typos are tolerated via resolve_anchor
     """
-    operation = edit.operation.lower()
-    
-    if operation == "none":
+    located = locate_operation(text, edit, index)
+    if located is None:
         return text, False
-    
-    def find_target() -> Optional[str]:
-        """Find the target text to operate on"""
-        if edit.old_text and edit.old_text.strip():
-            return edit.old_text
-        if edit.anchor and edit.anchor.strip():
-            return edit.anchor
-        return None
-    
-    if operation == "insert":
-        if not text and edit.new_text:
-            return edit.new_text, True
-        # Insert new_text before or after anchor
-        if not edit.anchor or not edit.new_text or not edit.position:
-            return text, False
-        
-        idx = text.find(edit.anchor)
-        if idx == -1:
-            return text, False
-        
-        if edit.position == "before":
-            insert_pos = idx
-        elif edit.position == "after":
-            insert_pos = idx + len(edit.anchor)
-        else:
-            return text, False
-        
-        new_text = text[:insert_pos] + edit.new_text + text[insert_pos:]
-        return new_text, True
-    
-    elif operation == "replace":
-        # Replace old_text with new_text
-        target = find_target()
-        if not target or not edit.new_text:
-            return text, False
-        
-        idx = text.find(target)
-        if idx == -1:
-            return text, False
-        
-        new_text = text[:idx] + edit.new_text + text[idx + len(target):]
-        return new_text, True
-    
-    elif operation == "delete":
-        # Delete target text
-        target = find_target()
-        if not target:
-            return text, False
-        
-        idx = text.find(target)
-        if idx == -1:
-            return text, False
-        
-        new_text = text[:idx] + text[idx + len(target):]
-        return new_text, True
-    
-    return text, False
+    start, end, replacement = located
+    return text[:start] + replacement + text[end:], True
 
 
 def validate_edit_request(edit: EditRequest) -> Tuple[bool, Optional[str]]:
@@ -129,36 +458,217 @@ def validate_edit_request(edit: EditRequest) -> Tuple[bool, Optional[str]]:
     return True, None
 
 
+# Diff limits: past MAX_DIFF_EDITS the Myers diff runs per changed run of lines,
+# past MAX_DIFF_TOKENS the changed region is reported as one replacement
+MAX_DIFF_TOKENS = 200000
+MAX_DIFF_EDITS = 500
+
+
+def _myers_edit_script(a: List[str], b: List[str], max_edits: int) -> Optional[List[Tuple[str, str]]]:
+    """
+    Myers O(ND) shortest edit script between token lists.
+    Returns [(op, token)] with op in equal/insert/delete, or None if more
+    than max_edits insertions and deletions are needed.
+    """
+    n, m = len(a), len(b)
+    max_d = min(n + m, max_edits)
+    v = [0] * (2 * max_d + 3)
+    trace: List[List[int]] = []
+    found = False
+    for d in range(max_d + 1):
+        trace.append(v[:])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                found = True
+                break
+        if found:
+            break
+    if not found:
+        return None
+
+    script: List[Tuple[str, str]] = []
+    x, y = n, m
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[k - 1] < v[k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[prev_k]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            script.append(("equal", a[x - 1]))
+            x -= 1
+            y -= 1
+        if d > 0:
+            if x == prev_x:
+                script.append(("insert", b[y - 1]))
+            else:
+                script.append(("delete", a[x - 1]))
+        x, y = prev_x, prev_y
+    script.reverse()
+    return script
+
+
+def _token_lines(tokens: List[str]) -> List[List[str]]:
+    """Group tokens into lines, each ending with the whitespace token holding its newline"""
+    lines: List[List[str]] = [[]]
+    for token in tokens:
+        lines[-1].append(token)
+        if "\n" in token:
+            lines.append([])
+    return lines if lines[-1] else lines[:-1]
+
+
+def _difflib_edit_script(a: List[str], b: List[str]) -> List[Tuple[str, str]]:
+    """Edit script from difflib opcodes; whitespace tokens only extend matches"""
+    script: List[Tuple[str, str]] = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(str.isspace, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            script.extend(("equal", token) for token in a[i1:i2])
+            continue
+        script.extend(("delete", token) for token in a[i1:i2])
+        script.extend(("insert", token) for token in b[j1:j2])
+    return script
+
+
+def _line_edit_script(a: List[str], b: List[str]) -> List[Tuple[str, str]]:
+    """
+    Edit script for token lists with too many edits for one Myers diff.
+    Lines are aligned with difflib first, then each changed run of lines is
+    diffed by tokens: with Myers as a whole, else with difflib, line by line
+    if the run keeps its line count.
+    """
+    a_lines, b_lines = _token_lines(a), _token_lines(b)
+    matcher = difflib.SequenceMatcher(
+        a=["".join(line) for line in a_lines], b=["".join(line) for line in b_lines], autojunk=False
+    )
+    script: List[Tuple[str, str]] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        old = [token for line in a_lines[i1:i2] for token in line]
+        if tag == "equal":
+            script.extend(("equal", token) for token in old)
+            continue
+        new = [token for line in b_lines[j1:j2] for token in line]
+        run = _myers_edit_script(old, new, MAX_DIFF_EDITS)
+        if run is None and i2 - i1 == j2 - j1:
+            # Rewritten lines in place: diff them pairwise
+            run = []
+            for old_line, new_line in zip(a_lines[i1:i2], b_lines[j1:j2]):
+                run.extend(_difflib_edit_script(old_line, new_line))
+        script.extend(run if run is not None else _difflib_edit_script(old, new))
+    return script
+
+
+def _append_change(segments: List[Dict[str, str]], removed: str, inserted: str):
+    """Append a change block: replacements become delete + replace"""
+    if removed and inserted:
+        segments.append({"type": "delete", "text": removed})
+        segments.append({"type": "replace", "text": inserted})
+    elif inserted:
+        segments.append({"type": "insert", "text": inserted})
+    elif removed:
+        segments.append({"type": "delete", "text": removed})
+
+
 def build_diff_segments(old_text: str, new_text: str) -> List[Dict[str, str]]:
     """
     Build diff segments between two texts for highlighting.
     Uses word-level diff to keep output compact.
     Replace operations emit a delete (old) and replace (new) segment
     so the UI can render removals in red and replacements in yellow.
+    Common prefix and suffix are trimmed before running a Myers diff on
+    the middle; middles with too many edits for it are aligned by lines
+    first, and a middle that is too large is shown as a single replacement.
     """
     # Tokenize preserving whitespace chunks so we don't lose formatting
     old_tokens = re.findall(r'\S+|\s+', old_text)
     new_tokens = re.findall(r'\S+|\s+', new_text)
-    matcher = difflib.SequenceMatcher(a=old_tokens, b=new_tokens)
+
+    prefix = 0
+    limit = min(len(old_tokens), len(new_tokens))
+    while prefix < limit and old_tokens[prefix] == new_tokens[prefix]:
+        prefix += 1
+    suffix = 0
+    while (
+        suffix < limit - prefix
+        and old_tokens[len(old_tokens) - 1 - suffix] == new_tokens[len(new_tokens) - 1 - suffix]
+    ):
+        suffix += 1
+
+    old_middle = old_tokens[prefix:len(old_tokens) - suffix]
+    new_middle = new_tokens[prefix:len(new_tokens) - suffix]
+    script = None
+    if len(old_middle) + len(new_middle) <= MAX_DIFF_TOKENS:
+        script = _myers_edit_script(old_middle, new_middle, MAX_DIFF_EDITS)
+        if script is None:
+            script = _line_edit_script(old_middle, new_middle)
+    if script is None:
+        script = [("delete", token) for token in old_middle] + [("insert", token) for token in new_middle]
+
     segments: List[Dict[str, str]] = []
+    head = "".join(new_tokens[:prefix])
+    if head:
+        segments.append({"type": "equal", "text": head})
 
-    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-        old_chunk = "".join(old_tokens[i1:i2])
-        new_chunk = "".join(new_tokens[j1:j2])
+    removed: List[str] = []
+    inserted: List[str] = []
+    equal: List[str] = []
+    for op, token in script:
+        if op == "equal":
+            equal.append(token)
+            continue
+        if equal:
+            equal_text = "".join(equal)
+            if (removed or inserted) and equal_text.isspace():
+                # Fold bare whitespace between two changes into one change block
+                removed.append(equal_text)
+                inserted.append(equal_text)
+            else:
+                _append_change(segments, "".join(removed), "".join(inserted))
+                removed, inserted = [], []
+                segments.append({"type": "equal", "text": equal_text})
+            equal = []
+        (removed if op == "delete" else inserted).append(token)
+    _append_change(segments, "".join(removed), "".join(inserted))
+    if equal:
+        segments.append({"type": "equal", "text": "".join(equal)})
+
+    tail = "".join(new_tokens[len(new_tokens) - suffix:])
+    if tail:
+        segments.append({"type": "equal", "text": tail})
+    return segments
 
-        if tag == "equal":
-            if new_chunk:
-                segments.append({"type": "equal", "text": new_chunk})
-        elif tag == "insert":
-            if new_chunk:
-                segments.append({"type": "insert", "text": new_chunk})
-        elif tag == "delete":
-            if old_chunk:
-                segments.append({"type": "delete", "text": old_chunk})
-        elif tag == "replace":
-            if old_chunk:
-                segments.append({"type": "delete", "text": old_chunk})
-            if new_chunk:
-                segments.append({"type": "replace", "text": new_chunk})
 
+def diff_segments_from_change(
+    old_text: str,
+    new_text: str,
+    change_start: int,
+    change_end: int,
+) -> Optional[List[Dict[str, str]]]:
+    """
+    Build diff segments for a version produced by a single edit.
+    old_text[change_start:change_end] was replaced, so no diff search is needed.
+    Returns None if the span does not fit the texts.
+    """
+    new_end = change_end + len(new_text) - len(old_text)
+    if not 0 <= change_start <= change_end <= len(old_text) or new_end < change_start:
+        return None
+
+    segments: List[Dict[str, str]] = []
+    if change_start:
+        segments.append({"type": "equal", "text": new_text[:change_start]})
+    _append_change(segments, old_text[change_start:change_end], new_text[change_start:new_end])
+    if new_end < len(new_text):
+        segments.append({"type": "equal", "text": new_text[new_end:]})
     return segments
@@ -0,0 +1,254 @@
+"""
+On-demand request profiling
+Requests carrying the profiling header (or picked by PROFILE_SAMPLE_RATE) run
+under pyinstrument, with SQL statement timings collected from SQLAlchemy
+cursor events. Profiles are kept in memory and served by the admin router.
+Self-contained so it can be dropped into the other services as is.
+"""
+import os
+import time
+import uuid
+import random
+import logging
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import HTMLResponse
+from sqlalchemy import event
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import ConsoleRenderer, HTMLRenderer
+except ImportError:  # pragma: no cover - optional dependency
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "x-profile").lower()
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))
+PROFILE_MAX_STORED = int(os.getenv("PROFILE_MAX_STORED", "50"))
+# Header-triggered profiling is off unless this is set (the header value must match);
+# when set, the admin endpoints require it too
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+MAX_SQL_STATEMENT_LENGTH = 2000
+
+
+@dataclass
+class SQLTiming:
+    statement: str
+    duration_ms: float
+
+
+@dataclass
+class RequestProfile:
+    """Profile of one request"""
+    profile_id: str
+    method: str
+    path: str
+    started_at: datetime
+    trigger: str  # header or sample
+    status: Optional[int] = None
+    duration_ms: float = 0.0
+    sql: List[SQLTiming] = field(default_factory=list)
+    session: Any = field(default=None, repr=False)  # pyinstrument Session
+
+    @property
+    def sql_ms(self) -> float:
+        return sum(timing.duration_ms for timing in self.sql)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "profile_id": self.profile_id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "trigger": self.trigger,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 3),
+            "sql_count": len(self.sql),
+            "sql_ms": round(self.sql_ms, 3),
+            "has_flame": self.session is not None,
+        }
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+class ProfileStore:
+    """Most recent profiles, oldest evicted first"""
+
+    def __init__(self, maxsize: int = PROFILE_MAX_STORED):
+        self.maxsize = max(1, maxsize)
+        self._profiles: "OrderedDict[str, RequestProfile]" = OrderedDict()
+
+    def add(self, profile: RequestProfile):
+        self._profiles[profile.profile_id] = profile
+        while len(self._profiles) > self.maxsize:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[RequestProfile]:
+        return list(reversed(self._profiles.values()))
+
+    def clear(self):
+        self._profiles.clear()
+
+
+profile_store = ProfileStore()
+
+
+def install_sql_timing(engine):
+    """Attach cursor event listeners recording statement timings into the current profile"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_profile.get() is not None:
+            conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _current_profile.get()
+        starts = conn.info.get("profile_query_start")
+        if profile is None or not starts:
+            return
+        duration_ms = (time.perf_counter() - starts.pop()) * 1000
+        profile.sql.append(SQLTiming(statement[:MAX_SQL_STATEMENT_LENGTH], duration_ms))
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests selected by header or sampling"""
+
+    def __init__(
+        self,
+        app,
+        store: ProfileStore = profile_store,
+        header: str = PROFILE_HEADER,
+        sample_rate: float = PROFILE_SAMPLE_RATE,
+        admin_token: str = ADMIN_TOKEN,
+    ):
+        self.app = app
+        self.store = store
+        self.header = header.encode("latin-1")
+        self.sample_rate = sample_rate
+        self.admin_token = admin_token
+
+    def _trigger(self, scope) -> Optional[str]:
+        # Without a token anyone could make the service profile their requests
+        if self.admin_token:
+            for key, value in scope.get("headers", []):
+                if key == self.header and value.decode("latin-1") == self.admin_token:
+                    return "header"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(
+            profile_id=uuid.uuid4().hex,
+            method=scope["method"],
+            path=scope["path"],
+            started_at=datetime.utcnow(),
+            trigger=trigger,
+        )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile.profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler = Profiler(interval=PROFILE_INTERVAL, async_mode="enabled") if Profiler else None
+        token = _current_profile.set(profile)
+        start = time.perf_counter()
+        if profiler:
+            profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profiler:
+                profiler.stop()
+                profile.session = profiler.last_session
+            profile.duration_ms = (time.perf_counter() - start) * 1000
+            _current_profile.reset(token)
+            self.store.add(profile)
+            logger.info(
+                f"Profiled {profile.method} {profile.path}: {profile.duration_ms:.1f} ms, "
+                f"{len(profile.sql)} SQL statements ({profile.sql_ms:.1f} ms), id {profile.profile_id}"
+            )
+
+
+def _check_admin(token: Optional[str], admin_token: str):
+    # Without a configured token the endpoints do not exist
+    if not admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if token != admin_token:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def _get_profile(store: ProfileStore, profile_id: str) -> RequestProfile:
+    profile = store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+def create_profiling_router(store: ProfileStore = profile_store, admin_token: str = ADMIN_TOKEN) -> APIRouter:
+    """Admin endpoints listing stored profiles and rendering them; disabled without admin_token"""
+    router = APIRouter(prefix="/admin/profiles", include_in_schema=False)
+
+    @router.get("")
+    async def list_profiles(x_admin_token: Optional[str] = Header(None)):
+        _check_admin(x_admin_token, admin_token)
+        return [profile.summary() for profile in store.list()]
+
+    @router.get("/{profile_id}")
+    async def get_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+        """Summary, SQL timings (slowest first) and a text call tree"""
+        _check_admin(x_admin_token, admin_token)
+        profile = _get_profile(store, profile_id)
+        return {
+            **profile.summary(),
+            "sql": [
+                {"statement": timing.statement, "duration_ms": round(timing.duration_ms, 3)}
+                for timing in sorted(profile.sql, key=lambda timing: timing.duration_ms, reverse=True)
+            ],
+            "call_tree": _render_text(profile),
+        }
+
+    @router.get("/{profile_id}/flame", response_class=HTMLResponse)
+    async def get_flame(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+        """Interactive pyinstrument report"""
+        _check_admin(x_admin_token, admin_token)
+        profile = _get_profile(store, profile_id)
+        if profile.session is None:
+            raise HTTPException(status_code=404, detail="No sampling profile (pyinstrument not installed)")
+        return HTMLResponse(HTMLRenderer().render(profile.session))
+
+    @router.delete("")
+    async def clear_profiles(x_admin_token: Optional[str] = Header(None)):
+        _check_admin(x_admin_token, admin_token)
+        store.clear()
+        return {"status": "cleared"}
+
+    return router
+
+
+def _render_text(profile: RequestProfile) -> Optional[str]:
+    if profile.session is None:
+        return None
+    return ConsoleRenderer(unicode=True, color=False, show_all=False).render(profile.session)
@@ -4,9 +4,17 @@ Replication logic for distributed Text Service nodes
 import os
 import aiohttp
 import asyncio
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 import logging
+import time
+
+from app.metrics import (
+    REPLICATION_IN_FLIGHT,
+    REPLICATION_SECONDS,
+    observe_replication_lag,
+)
+from app.tracing import start_span, end_span, trace_headers, trace_metadata
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +32,7 @@ async def replicate_to_peers(
     edit_id: Optional[str],
     session_metadata: Optional[Dict[str, Any]] = None,
     token_used: Optional[int] = None,
+    change_span: Optional[Tuple[int, int]] = None,
 ):
     """
     Replicate document version to peer nodes asynchronously
@@ -45,6 +54,7 @@ async def replicate_to_peers(
                     edit_id,
                     session_metadata,
                     token_used,
+                    change_span,
                 )
             )
             tasks.append(task)
@@ -67,6 +77,7 @@ async def replicate_to_node(
     edit_id: Optional[str],
     session_metadata: Optional[Dict[str, Any]] = None,
     token_used: Optional[int] = None,
+    change_span: Optional[Tuple[int, int]] = None,
 ):
     """
     Send replication message to a single node
@@ -92,16 +103,31 @@ async def replicate_to_node(
                 "agent_roles": session_metadata.get("agent_roles"),
                 "token_budget": session_metadata.get("token_budget"),
                 "final_version": session_metadata.get("final_version"),
+                "last_editor": session_metadata.get("last_editor"),
             }
         )
     if token_used is not None:
         payload["token_used"] = token_used
+    if change_span is not None:
+        payload["change_start"], payload["change_end"] = change_span
     
+    outcome = "error"
+    started = time.perf_counter()
+    finished = None
+    REPLICATION_IN_FLIGHT.inc()
+    span = start_span("replicate", peer=node_url, document_id=document_id, version=version)
     try:
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=5)) as response:
+            async with session.post(
+                url, json=payload, headers=trace_headers(), timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
                 if response.status == 200:
                     result = await response.json()
+                    outcome = "success"
+                    finished = time.perf_counter()
+                    # End-to-end: from version creation on this node to the peer's acknowledgement
+                    latency_ms = round(observe_replication_lag(node_url, timestamp) * 1000, 3)
+                    span.attributes["replication.latency_ms"] = latency_ms
                     logger.info(f"Replicated version {version} to {node_url}: {result}")
                     
                     # Send success event to analytics
@@ -112,9 +138,14 @@ async def replicate_to_node(
                         "metadata": {
                             "source_node": NODE_ID,
                             "target_node": node_url,
+                            "document_id": document_id,
+                            "latency_ms": latency_ms,
+                            "request_ms": round((finished - started) * 1000, 3),
                         }
                     })
                 else:
+                    outcome = "failed"
+                    finished = time.perf_counter()
                     error_text = await response.text()
                     logger.error(f"Replication failed to {node_url}: {response.status} - {error_text}")
                     
@@ -131,6 +162,8 @@ async def replicate_to_node(
                         }
                     })
     except asyncio.TimeoutError:
+        outcome = "timeout"
+        finished = time.perf_counter()
         logger.error(f"Replication timeout to {node_url}")
         await send_analytics_event({
             "event_type": "replication_failed",
@@ -143,6 +176,7 @@ async def replicate_to_node(
             }
         })
     except Exception as e:
+        finished = time.perf_counter()
         logger.error(f"Replication error to {node_url}: {e}")
         await send_analytics_event({
             "event_type": "replication_failed",
@@ -154,6 +188,13 @@ async def replicate_to_node(
                 "error": str(e),
             }
         })
+    finally:
+        end_span(span, "ok" if outcome == "success" else "error")
+        REPLICATION_IN_FLIGHT.dec()
+        # Analytics reporting above is excluded from the peer request time
+        REPLICATION_SECONDS.labels(peer=node_url, outcome=outcome).observe(
+            (finished or time.perf_counter()) - started
+        )
 
 
 async def send_analytics_event(event_data: dict):
@@ -161,10 +202,15 @@ async def send_analytics_event(event_data: dict):
     Send event to Analytics Service
     """
     url = f"{ANALYTICS_URL}/api/analytics/events"
+    trace = trace_metadata()
+    if trace:
+        event_data = {**event_data, "metadata": {**(event_data.get("metadata") or {}), **trace}}
     
     try:
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=event_data, timeout=aiohttp.ClientTimeout(total=3)) as response:
+            async with session.post(
+                url, json=event_data, headers=trace_headers(), timeout=aiohttp.ClientTimeout(total=3)
+            ) as response:
                 if response.status not in [200, 201]:
                     logger.warning(f"Analytics event failed: {response.status}")
     except Exception as e:
@@ -76,6 +76,17 @@ class EditResponse(BaseModel):
     version: int
 
 
+class EditValidationResponse(BaseModel):
+    """Dry-run result for an edit against the latest document text"""
+    document_id: Optional[str] = None
+    valid: bool
+    version: Optional[int] = None
+    reason: Optional[str] = None
+    matches: int = 0
+    match_kind: Optional[str] = None  # exact, normalized, fuzzy
+    confidence: Optional[float] = None
+
+
 class EditListItem(BaseModel):
     """Edit item in list"""
     document_id: str
@@ -112,6 +123,9 @@ class ReplicationSyncRequest(BaseModel):
     token_budget: Optional[int] = None
     token_used: Optional[int] = None
     final_version: Optional[int] = None
+    last_editor: Optional[str] = None
+    change_start: Optional[int] = None
+    change_end: Optional[int] = None
 
 
 class ReplicationSyncResponse(BaseModel):
@@ -135,6 +149,9 @@ class DocumentListItem(BaseModel):
     final_version: Optional[int] = None
     updated_at: datetime
     finished_at: Optional[datetime] = None
+    text_length: Optional[int] = None
+    text_hash: Optional[str] = None
+    last_editor: Optional[str] = None
 
 
 class VersionItem(BaseModel):
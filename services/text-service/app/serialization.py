@@ -0,0 +1,47 @@
+"""
+JSON for the document, edit listing and catch-up endpoints
+With FAST_JSON=true and orjson installed, responses are built from plain dicts
+with orjson and cached document texts are embedded pre-encoded; otherwise
+pydantic-core renders the same JSON.
+"""
+import os
+import json
+from typing import Any, Union
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+FAST_JSON = orjson is not None and os.getenv("FAST_JSON", "false").lower() in ("1", "true", "yes")
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize plain data (dicts, lists, datetimes, UUIDs, enums) to JSON bytes"""
+    if FAST_JSON:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+    return to_json(content)
+
+
+def raw_json(data: Union[bytes, str]) -> Any:
+    """Embed an already serialized JSON value into content passed to dumps"""
+    if FAST_JSON:
+        return orjson.Fragment(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with dumps; return it directly to skip response_model validation"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,204 @@
+"""
+Lightweight distributed tracing
+Spans follow the W3C trace context format (traceparent header) so an edit can
+be followed through replication to peers and into analytics events.
+Finished spans go to an in-memory buffer (default) or a JSONL file.
+"""
+import os
+import json
+import time
+import secrets
+import logging
+from collections import deque
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field, asdict
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# memory, file or none
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "memory").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACE_MEMORY_SIZE = int(os.getenv("TRACE_MEMORY_SIZE", "1000"))
+TRACEPARENT_HEADER = "traceparent"
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    name: str
+    parent_id: Optional[str] = None
+    start: float = field(default_factory=time.time)
+    end: Optional[float] = None
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    _token: Optional[Token] = field(default=None, repr=False)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.time()) - self.start) * 1000
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("_token")
+        data["duration_ms"] = round(self.duration_ms, 3)
+        return data
+
+
+class InMemoryExporter:
+    """Keeps the most recent finished spans, for tests and local inspection"""
+
+    def __init__(self, maxsize: int = TRACE_MEMORY_SIZE):
+        self.spans: Deque[Span] = deque(maxlen=maxsize)
+
+    def export(self, span: Span):
+        self.spans.append(span)
+
+    def by_trace(self, trace_id: str) -> List[Span]:
+        return [span for span in self.spans if span.trace_id == trace_id]
+
+    def clear(self):
+        self.spans.clear()
+
+
+class JsonlExporter:
+    """Appends finished spans to a JSON lines file"""
+
+    def __init__(self, path: str = TRACE_FILE):
+        self.path = path
+
+    def export(self, span: Span):
+        try:
+            with open(self.path, "a", encoding="utf-8") as trace_file:
+                trace_file.write(json.dumps(span.to_dict(), ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"Failed to export span {span.span_id}: {e}")
+
+
+def _create_exporter():
+    if TRACE_EXPORTER == "file":
+        return JsonlExporter()
+    if TRACE_EXPORTER == "none":
+        return None
+    return InMemoryExporter()
+
+
+exporter = _create_exporter()
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Return (trace_id, parent span_id) from a traceparent header, or None if invalid"""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    trace_id, span_id = parts[1].lower(), parts[2].lower()
+    try:
+        int(trace_id, 16)
+        int(span_id, 16)
+    except ValueError:
+        return None
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def start_span(name: str, traceparent: Optional[str] = None, **attributes: Any) -> Span:
+    """
+    Start a span and make it current. The parent is taken from traceparent
+    (incoming requests) or else from the current span; without either a new trace starts.
+    """
+    remote = parse_traceparent(traceparent)
+    parent = _current_span.get()
+    if remote:
+        trace_id, parent_id = remote
+    elif parent:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    else:
+        trace_id, parent_id = secrets.token_hex(16), None
+    span = Span(trace_id, secrets.token_hex(8), name, parent_id, attributes=attributes)
+    span._token = _current_span.set(span)
+    return span
+
+
+def end_span(span: Span, status: Optional[str] = None):
+    """Finish span, restore the previous current span and export it"""
+    span.end = time.time()
+    if status:
+        span.status = status
+    if span._token is not None:
+        try:
+            _current_span.reset(span._token)
+        except ValueError:
+            # Ended from a different context (e.g. another task); leave it as is
+            pass
+        span._token = None
+    if exporter is not None:
+        exporter.export(span)
+
+
+def set_span_attributes(**attributes: Any):
+    """Annotate the current span, if any"""
+    span = _current_span.get()
+    if span:
+        span.attributes.update(attributes)
+
+
+def trace_headers() -> Dict[str, str]:
+    """Headers propagating the current span to an outgoing request"""
+    span = _current_span.get()
+    return {TRACEPARENT_HEADER: span.traceparent} if span else {}
+
+
+def trace_metadata() -> Dict[str, str]:
+    """Trace identifiers to attach to analytics events"""
+    span = _current_span.get()
+    return {"trace_id": span.trace_id, "span_id": span.span_id} if span else {}
+
+
+class TracingMiddleware:
+    """ASGI middleware running each HTTP request in a server span"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        traceparent = None
+        for key, value in scope.get("headers", []):
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        span = start_span(f"{scope['method']} {scope['path']}", traceparent)
+        status = "error"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                span.attributes["http.status_code"] = message["status"]
+                status = "ok" if message["status"] < 500 else "error"
+                headers = list(message.get("headers", []))
+                headers.append((b"traceparent", span.traceparent.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            if route is not None:
+                span.name = f"{scope['method']} {route.path}"
+            end_span(span, status)
@@ -0,0 +1,419 @@
+"""
+End-to-end benchmarks for text-service
+Runs the FastAPI app in-process against DATABASE_URL (a temporary SQLite
+database unless set) with a local stub in place of analytics-service, and
+reports throughput, p50/p95/p99 latency and DB queries per request for
+submit_edit, get_current_document, get_version_diff, replication_sync and catch-up.
+
+    python -m benchmarks.e2e --doc-kb 20 --agents 4 --edits 200
+    python -m benchmarks.e2e --save-baseline sqlite-default
+    python -m benchmarks.e2e --compare sqlite-default
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import uuid
+import asyncio
+import logging
+import argparse
+import platform
+import tempfile
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from aiohttp import web
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+EDIT_KINDS = ("insert", "replace", "delete", "invalid")
+# Metrics compared against a baseline, and whether larger is better
+COMPARED_METRICS = {"throughput_rps": True, "p50_ms": False, "p95_ms": False, "p99_ms": False, "queries_per_request": False}
+
+_request_queries: ContextVar[Optional[List[int]]] = ContextVar("request_queries", default=None)
+
+
+@dataclass
+class ScenarioStats:
+    name: str
+    latencies: List[float] = field(default_factory=list)
+    queries: List[int] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    outcomes: Counter = field(default_factory=Counter)
+    wall_seconds: float = 0.0
+
+    def record(self, seconds: float, queries: int, status: int, outcome: Optional[str] = None):
+        self.latencies.append(seconds)
+        self.queries.append(queries)
+        self.statuses[status] += 1
+        if outcome:
+            self.outcomes[outcome] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        summary = {
+            "requests": count,
+            "errors": sum(n for status, n in self.statuses.items() if status >= 400),
+            "throughput_rps": round(count / self.wall_seconds, 2) if self.wall_seconds else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+            "queries_per_request": round(sum(self.queries) / count, 2) if count else 0.0,
+            "statuses": {str(status): n for status, n in sorted(self.statuses.items())},
+        }
+        if self.outcomes:
+            summary["outcomes"] = dict(self.outcomes)
+        return summary
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in EDIT_KINDS:
+            raise argparse.ArgumentTypeError(f"Unknown edit kind {kind!r}, expected one of {EDIT_KINDS}")
+        mix[kind] = int(weight or 1)
+    return mix
+
+
+def make_document(size_kb: int) -> str:
+    """Paragraphs with unique markers (§00001) used as edit anchors"""
+    paragraphs = []
+    length = 0
+    i = 0
+    while length < size_kb * 1024:
+        paragraph = f"§{i:05d} Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor.\n"
+        paragraphs.append(paragraph)
+        length += len(paragraph)
+        i += 1
+    return "".join(paragraphs)
+
+
+def make_edit(kind: str, document_id: str, agent_id: str, paragraphs: int, rng: random.Random) -> Dict[str, Any]:
+    marker = f"§{rng.randrange(paragraphs):05d}"
+    edit: Dict[str, Any] = {"document_id": document_id, "agent_id": agent_id, "tokens_used": 10}
+    if kind == "insert":
+        edit.update(operation="insert", anchor=marker, position="after", new_text=" vivamus")
+    elif kind == "replace":
+        edit.update(operation="replace", old_text=f"{marker} Lorem", new_text=f"{marker} Lorem")
+    elif kind == "delete":
+        edit.update(operation="delete", old_text=" vivamus")
+    else:
+        edit.update(operation="insert", anchor="§missing-anchor", position="after", new_text=" never applied")
+    return edit
+
+
+async def start_analytics_stub() -> web.AppRunner:
+    """Accepts analytics events so send_analytics_event does not wait on connection errors"""
+
+    async def accept(request: web.Request) -> web.Response:
+        await request.read()
+        return web.json_response({"status": "ok"})
+
+    stub = web.Application()
+    stub.router.add_post("/api/analytics/events", accept)
+    runner = web.AppRunner(stub, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    os.environ["ANALYTICS_URL"] = f"http://127.0.0.1:{port}"
+    return runner
+
+
+class Bench:
+    """Drives the app through httpx's ASGI transport, counting queries per request"""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def call(
+        self,
+        stats: ScenarioStats,
+        method: str,
+        url: str,
+        outcome: Callable[[Any], Optional[str]] = lambda response: None,
+        **kwargs: Any,
+    ):
+        counter = [0]
+        token = _request_queries.set(counter)
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        finally:
+            _request_queries.reset(token)
+        stats.record(time.perf_counter() - start, counter[0], response.status_code, outcome(response))
+        return response
+
+
+async def run_lanes(stats: ScenarioStats, lanes: List[List[Callable[[], Awaitable[Any]]]]):
+    """Run each lane sequentially, all lanes concurrently (one lane per agent)"""
+
+    async def lane(jobs):
+        for job in jobs:
+            await job()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[lane(jobs) for jobs in lanes])
+    stats.wall_seconds = time.perf_counter() - start
+
+
+def spread(jobs: List[Callable[[], Awaitable[Any]]], count: int) -> List[List[Callable[[], Awaitable[Any]]]]:
+    return [jobs[i::count] for i in range(max(1, count))]
+
+
+async def run_benchmarks(args) -> Dict[str, Any]:
+    import httpx
+    from sqlalchemy import event
+    from app.main import app
+    from app.database import engine
+
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count_query(*_):
+        counter = _request_queries.get()
+        if counter is not None:
+            counter[0] += 1
+
+    rng = random.Random(args.seed)
+    text = make_document(args.doc_kb)
+    paragraphs = text.count("§")
+    kinds = [kind for kind, weight in args.mix.items() for _ in range(weight)]
+    results: Dict[str, ScenarioStats] = {}
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=60
+    ) as client:
+        bench = Bench(client)
+
+        init_stats = results["init_document"] = ScenarioStats("init_document")
+        document_ids = []
+        start = time.perf_counter()
+        for i in range(args.documents):
+            response = await bench.call(
+                init_stats,
+                "POST",
+                "/api/document/init",
+                json={"topic": f"bench {i}", "initial_text": text, "max_edits": 10**6, "token_budget": 10**9},
+            )
+            document_ids.append(response.json()["document_id"])
+        init_stats.wall_seconds = time.perf_counter() - start
+
+        edit_stats = results["submit_edit"] = ScenarioStats("submit_edit")
+        # An agent waits for each edit before sending the next, as the real agents do
+        edit_lanes: List[List[Callable[[], Awaitable[Any]]]] = [[] for _ in range(args.agents)]
+        for i in range(args.edits):
+            agent = i % args.agents
+            payload = make_edit(
+                rng.choice(kinds), document_ids[agent % len(document_ids)], f"agent-{agent}", paragraphs, rng
+            )
+            edit_lanes[agent].append(
+                lambda payload=payload: bench.call(
+                    edit_stats,
+                    "POST",
+                    "/api/edits",
+                    json=payload,
+                    outcome=lambda r: r.json().get("status") if r.status_code == 200 else f"http_{r.status_code}",
+                )
+            )
+        await run_lanes(edit_stats, edit_lanes)
+
+        versions = {}
+        for document_id in document_ids:
+            response = await client.get(f"/api/document/{document_id}/versions", params={"limit": 10000})
+            versions[document_id] = [item["version"] for item in response.json()] or [1]
+
+        read_stats = results["get_current_document"] = ScenarioStats("get_current_document")
+        await run_lanes(read_stats, spread([
+            lambda document_id=rng.choice(document_ids): bench.call(
+                read_stats, "GET", "/api/document/current", params={"document_id": document_id}
+            )
+            for _ in range(args.reads)
+        ], args.agents))
+
+        diff_stats = results["get_version_diff"] = ScenarioStats("get_version_diff")
+        diff_jobs = []
+        for _ in range(args.reads):
+            document_id = rng.choice(document_ids)
+            version = rng.choice(versions[document_id])
+            diff_jobs.append(
+                lambda document_id=document_id, version=version: bench.call(
+                    diff_stats, "GET", f"/api/document/{document_id}/versions/{version}/diff"
+                )
+            )
+        await run_lanes(diff_stats, spread(diff_jobs, args.agents))
+
+        # Replication arrives in version order from one peer, so it is sequential
+        sync_stats = results["replication_sync"] = ScenarioStats("replication_sync")
+        replicated_id = str(uuid.uuid4())
+        replicated_text = text
+        base_time = datetime.utcnow()
+        start = time.perf_counter()
+        for version in range(1, args.replications + 1):
+            marker = f"§{rng.randrange(paragraphs):05d}"
+            replicated_text = replicated_text.replace(marker, f"{marker} vivamus", 1)
+            await bench.call(
+                sync_stats,
+                "POST",
+                "/api/replication/sync",
+                json={
+                    "document_id": replicated_id,
+                    "version": version,
+                    "text": replicated_text,
+                    "timestamp": (base_time + timedelta(milliseconds=version)).isoformat(),
+                    "source_node": "bench-peer",
+                    "topic": "replicated",
+                    "max_edits": 10**6,
+                    "token_budget": 10**9,
+                },
+                outcome=lambda r: r.json().get("status") if r.status_code == 200 else f"http_{r.status_code}",
+            )
+        sync_stats.wall_seconds = time.perf_counter() - start
+
+        catchup_stats = results["catch_up"] = ScenarioStats("catch_up")
+        await run_lanes(catchup_stats, spread([
+            lambda since=rng.randrange(max(1, args.replications)): bench.call(
+                catchup_stats,
+                "GET",
+                "/api/replication/catch-up",
+                params={"document_id": replicated_id, "since_version": max(0, args.replications - since - 1)},
+            )
+            for _ in range(max(1, args.reads // 4))
+        ], args.agents))
+
+    return {
+        "config": {
+            "doc_kb": args.doc_kb,
+            "documents": args.documents,
+            "agents": args.agents,
+            "edits": args.edits,
+            "reads": args.reads,
+            "replications": args.replications,
+            "mix": args.mix,
+            "seed": args.seed,
+        },
+        "environment": {
+            "database": engine.dialect.name,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+        },
+        "scenarios": {name: stats.summary() for name, stats in results.items()},
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    config = report["config"]
+    print(
+        f"text-service e2e on {report['environment']['database']}: {config['documents']} documents of "
+        f"{config['doc_kb']} KB, {config['agents']} agents, {config['edits']} edits"
+    )
+    header = f"{'scenario':<22}{'requests':>9}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, s in report["scenarios"].items():
+        print(
+            f"{name:<22}{s['requests']:>9}{s['errors']:>8}{s['throughput_rps']:>10.1f}"
+            f"{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}{s['queries_per_request']:>9.2f}"
+        )
+        if "outcomes" in s:
+            print(f"{'':<22}outcomes: {s['outcomes']}")
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print relative change per metric; returns the regressions beyond threshold percent"""
+    if baseline.get("config") != report["config"]:
+        print("warning: baseline was recorded with a different configuration")
+    regressions = []
+    print(f"\n{'scenario':<22}{'metric':<22}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = -change if higher_is_better else change
+            flag = "  REGRESSION" if worse > threshold else ""
+            if flag:
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change:+.1f}%)")
+            print(f"{name:<22}{metric:<22}{old:>12}{new:>12}{change:>+9.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="text-service end-to-end benchmarks")
+    parser.add_argument("--doc-kb", type=int, default=20, help="Initial document size in KB")
+    parser.add_argument("--agents", type=int, default=4, help="Concurrent clients")
+    parser.add_argument(
+        "--documents", type=int, help="Documents edited by the agents (default: one per agent, fewer adds contention)"
+    )
+    parser.add_argument("--edits", type=int, default=200)
+    parser.add_argument("--reads", type=int, default=200, help="Requests for the read scenarios")
+    parser.add_argument("--replications", type=int, default=100)
+    parser.add_argument(
+        "--mix", type=parse_mix, default=parse_mix("insert=50,replace=25,delete=15,invalid=10"),
+        help="Edit mix as kind=weight pairs; kinds: " + ", ".join(EDIT_KINDS),
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="Keep service logging")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    parser.add_argument("--save-baseline", metavar="NAME", help=f"Store the report as {BASELINE_DIR}/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="Compare against a stored baseline")
+    parser.add_argument("--threshold", type=float, default=50.0, help="Regression threshold in percent")
+    args = parser.parse_args()
+    args.documents = args.documents or args.agents
+
+    if not os.getenv("DATABASE_URL"):
+        db_path = Path(tempfile.mkdtemp(prefix="text-bench-")) / "bench.db"
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ.setdefault("PEER_NODES", "")
+    os.environ.setdefault("TRACE_EXPORTER", "none")
+
+    async def run():
+        stub = await start_analytics_stub()
+        try:
+            return await run_benchmarks(args)
+        finally:
+            await stub.cleanup()
+
+    report = asyncio.run(run())
+    print_report(report)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        path = BASELINE_DIR / f"{args.save_baseline}.json"
+        path.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nBaseline saved to {path}")
+    if args.compare:
+        baseline = json.loads((BASELINE_DIR / f"{args.compare}.json").read_text())
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
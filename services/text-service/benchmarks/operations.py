@@ -0,0 +1,252 @@
+"""
+Micro-benchmarks for text operations and diffing
+Times apply_operation_to_text, validate_edit_request, anchor indexing and
+build_diff_segments across document sizes, prints how each case scales with
+size and compares against the last run recorded in benchmarks/history/.
+
+    python -m benchmarks.operations [--sizes 1,10,100,1000] [--filter diff]
+    python -m benchmarks.operations --record
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.operations import (
+    AnchorIndex,
+    apply_operation_to_text,
+    build_diff_segments,
+    diff_segments_from_change,
+    validate_edit_request,
+)
+from app.schemas import EditRequest
+
+HISTORY_FILE = Path(__file__).parent / "history" / "operations.jsonl"
+# Repeated in every paragraph, so anchors on it resolve to many matches
+COMMON_PHRASE = "в рамках общего плана работ"
+# Growth exponent between sizes above which a case is flagged as superlinear
+SUPERLINEAR_EXPONENT = 1.5
+
+_VOCABULARY = [
+    "агент", "документ", "версия", "правка", "текст", "раздел", "анализ", "модель", "данные", "система",
+    "результат", "процесс", "метод", "оценка", "задача", "решение", "вывод", "пример", "структура", "контекст",
+    "значение", "качество", "подход", "часть", "уровень", "вопрос", "основа", "связь", "форма", "работа",
+]
+
+
+def make_document(size_kb: int, seed: int = 1) -> str:
+    """Paragraphs of pseudo-random words; each starts with a unique marker word (Пункт0001)"""
+    rng = random.Random(seed)
+    vocabulary = _VOCABULARY + [f"{word}{i}" for i in range(60) for word in _VOCABULARY[:10]]
+    paragraphs = []
+    length = 0
+    i = 0
+    while length < size_kb * 1024:
+        words = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(25, 45)))
+        paragraph = f"Пункт{i:04d}. {words.capitalize()}, {COMMON_PHRASE}, {rng.choice(vocabulary)}.\n\n"
+        paragraphs.append(paragraph)
+        length += len(paragraph)
+        i += 1
+    return "".join(paragraphs)[: size_kb * 1024]
+
+
+def anchor_at(text: str, where: str, length: int = 40) -> str:
+    """A unique fragment starting at a paragraph marker near the start, middle or end of text"""
+    count = text.count("Пункт")
+    number = {"start": 0, "middle": count // 2, "end": max(0, count - 2)}[where]
+    start = text.index(f"Пункт{number:04d}.")
+    return text[start:start + length]
+
+
+def rewrite_paragraphs(text: str, every: int, seed: int = 2) -> str:
+    """Replace every n-th paragraph with different words (markers kept)"""
+    rng = random.Random(seed)
+    paragraphs = text.split("\n\n")
+    for i in range(0, len(paragraphs), every):
+        head, _, body = paragraphs[i].partition(" ")
+        words = body.split()
+        rng.shuffle(words)
+        paragraphs[i] = head + " " + " ".join(f"новое{word}" for word in words)
+    return "\n\n".join(paragraphs)
+
+
+def edit(**fields) -> EditRequest:
+    return EditRequest(agent_id="bench", **fields)
+
+
+def build_cases(text: str) -> Dict[str, Callable[[], object]]:
+    """Benchmark cases for one document text; each value is a zero-argument callable"""
+    index = AnchorIndex(text)
+    cases: Dict[str, Callable[[], object]] = {}
+
+    insert = edit(operation="insert", anchor="x", position="after", new_text="новый фрагмент")
+    cases["validate_edit_request"] = lambda: validate_edit_request(insert)
+
+    for where in ("start", "middle", "end"):
+        anchor_edit = edit(operation="insert", anchor=anchor_at(text, where), position="after", new_text=" вставка")
+        cases[f"apply insert, {where} anchor"] = lambda e=anchor_edit: apply_operation_to_text(text, e)
+        cases[f"apply insert, {where} anchor, indexed"] = lambda e=anchor_edit: apply_operation_to_text(text, e, index)
+
+    ambiguous = edit(operation="replace", old_text=COMMON_PHRASE, new_text="в рамках плана")
+    cases["apply replace, ambiguous anchor"] = lambda: apply_operation_to_text(text, ambiguous)
+    cases["apply replace, ambiguous anchor, indexed"] = lambda: apply_operation_to_text(text, ambiguous, index)
+
+    middle = anchor_at(text, "middle")
+    drifted = edit(operation="delete", old_text=middle.replace(" ", "  ", 2))
+    cases["apply delete, whitespace drift, indexed"] = lambda: apply_operation_to_text(text, drifted, index)
+    typo = middle[:10] + middle[11:]
+    fuzzy = edit(operation="replace", old_text=typo, new_text="исправлено")
+    cases["apply replace, typo (fuzzy)"] = lambda: apply_operation_to_text(text, fuzzy)
+    cases["apply replace, typo (fuzzy), indexed"] = lambda: apply_operation_to_text(text, fuzzy, index)
+    missing = edit(operation="delete", old_text="фрагмент, которого нет в документе")
+    cases["apply delete, missing anchor, indexed"] = lambda: apply_operation_to_text(text, missing, index)
+
+    cases["AnchorIndex build"] = lambda: AnchorIndex(text)
+    position = text.index(middle)
+    inserted = text[:position] + "вставка " + text[position:]
+
+    edit_index = AnchorIndex(text)
+
+    def index_apply_edit():
+        # apply_edit mutates the index, so each call inserts and then removes the fragment
+        edit_index.apply_edit(inserted, position, position, position + len("вставка "))
+        edit_index.apply_edit(text, position, position + len("вставка "), position)
+
+    cases["AnchorIndex apply_edit + undo"] = index_apply_edit
+
+    cases["diff, one insert in the middle"] = lambda: build_diff_segments(text, inserted)
+    cases["diff from change span"] = lambda: diff_segments_from_change(text, inserted, position, position)
+    scattered = rewrite_paragraphs(text, every=20)
+    cases["diff, every 20th paragraph rewritten"] = lambda: build_diff_segments(text, scattered)
+    rewritten = rewrite_paragraphs(text, every=1)
+    cases["diff, all paragraphs rewritten"] = lambda: build_diff_segments(text, rewritten)
+    return cases
+
+
+def measure(func: Callable[[], object], min_time: float, repeat: int) -> float:
+    """Best per-call time over repeat rounds, each running func for at least min_time"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def scaling_exponent(results: Dict[int, float]) -> Optional[float]:
+    """Growth exponent k of time ~ size^k between the two largest sizes"""
+    sizes = sorted(results)
+    if len(sizes) < 2:
+        return None
+    small, large = sizes[-2], sizes[-1]
+    if results[small] <= 0:
+        return None
+    return math.log(results[large] / results[small]) / math.log(large / small)
+
+
+def format_time(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def last_recorded() -> Optional[dict]:
+    if not HISTORY_FILE.exists():
+        return None
+    lines = [line for line in HISTORY_FILE.read_text(encoding="utf-8").splitlines() if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes: List[int], name_filter: str, min_time: float, repeat: int) -> Dict[str, Dict[int, float]]:
+    results: Dict[str, Dict[int, float]] = {}
+    for size in sizes:
+        text = make_document(size)
+        for name, func in build_cases(text).items():
+            if name_filter and name_filter not in name:
+                continue
+            results.setdefault(name, {})[size] = measure(func, min_time, repeat)
+    return results
+
+
+def print_report(results: Dict[str, Dict[int, float]], sizes: List[int], previous: Optional[dict]):
+    previous_results = (previous or {}).get("results", {})
+    header = f"{'case':<42}" + "".join(f"{str(size) + ' KB':>12}" for size in sizes) + f"{'growth':>8}"
+    if previous:
+        header += f"{'vs last':>10}"
+    print(header)
+    print("-" * len(header))
+    flagged: List[Tuple[str, float]] = []
+    for name, by_size in results.items():
+        exponent = scaling_exponent(by_size)
+        line = f"{name:<42}" + "".join(f"{format_time(by_size.get(size)):>12}" for size in sizes)
+        line += f"{exponent:>8.2f}" if exponent is not None else f"{'-':>8}"
+        old = previous_results.get(name, {}).get(str(sizes[-1]))
+        if previous:
+            line += f"{(by_size[sizes[-1]] - old) / old * 100:>+9.0f}%" if old else f"{'-':>10}"
+        print(line)
+        if exponent is not None and exponent > SUPERLINEAR_EXPONENT:
+            flagged.append((name, exponent))
+    print(f"\ngrowth: exponent k of time ~ size^k between {sizes[-2] if len(sizes) > 1 else '-'} and {sizes[-1]} KB")
+    if previous:
+        print(f"vs last: change at {sizes[-1]} KB against the run recorded {previous['recorded_at']} ({previous.get('commit')})")
+    for name, exponent in flagged:
+        print(f"superlinear: {name} (k={exponent:.2f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for text operations and diffing")
+    parser.add_argument("--sizes", default="1,10,100,1000", help="Document sizes in KB, comma-separated")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per timing round")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--record", action="store_true", help=f"Append results to {HISTORY_FILE}")
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+
+    results = run(sizes, args.filter, args.min_time, args.repeat)
+    print_report(results, sizes, last_recorded())
+
+    if args.record:
+        HISTORY_FILE.parent.mkdir(exist_ok=True)
+        entry = {
+            "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "commit": git_revision(),
+            "python": platform.python_version(),
+            "results": {name: {str(size): seconds for size, seconds in by_size.items()} for name, by_size in results.items()},
+        }
+        with open(HISTORY_FILE, "a", encoding="utf-8") as history:
+            history.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        print(f"\nRecorded to {HISTORY_FILE}")
+
+
+if __name__ == "__main__":
+    main()
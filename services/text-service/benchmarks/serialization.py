@@ -0,0 +1,94 @@
+"""
+Serialization benchmark: default FastAPI response path vs the FAST_JSON path
+
+    python -m benchmarks.serialization [--edits 1000] [--text-kb 100]
+"""
+import argparse
+import json
+import timeit
+import uuid
+from datetime import datetime, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app import serialization
+from app.schemas import DocumentResponse, EditListItem
+
+
+def make_edits(count: int) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "document_id": str(uuid.uuid4()),
+            "edit_id": uuid.uuid4(),
+            "agent_id": f"agent-{i % 10}",
+            "operation": "replace",
+            "status": "accepted",
+            "tokens_used": 120 + i,
+            "created_at": now,
+            "anchor": "Исходный фрагмент текста для замены",
+            "position": None,
+            "old_text": "Исходный фрагмент текста для замены",
+            "new_text": "Новый, более точный фрагмент текста с пояснениями",
+        }
+        for i in range(count)
+    ]
+
+
+def default_path(adapter: TypeAdapter, items) -> bytes:
+    """What FastAPI does for a response_model: validate, dump to JSON-able data, json.dumps"""
+    value = adapter.validate_python(items)
+    content = adapter.dump_python(value, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def bench(label: str, func, number: int):
+    seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"{label:<48} {seconds * 1000:9.3f} ms")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--edits", type=int, default=1000)
+    parser.add_argument("--text-kb", type=int, default=100)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+    if serialization.orjson is None:
+        raise SystemExit("orjson is not installed")
+
+    edits = make_edits(args.edits)
+    list_adapter = TypeAdapter(List[EditListItem])
+    models = [EditListItem(**edit) for edit in edits]
+
+    text = ("Абзац документа с несколькими \"кавычками\" и переводом строки.\n" * 2000)[: args.text_kb * 1024]
+    document = {
+        "document_id": str(uuid.uuid4()),
+        "version": 42,
+        "text": text,
+        "timestamp": datetime.now(timezone.utc),
+        "topic": "benchmark",
+        "status": "active",
+        "agent_roles": [{"role_key": "editor", "name": "Editor", "prompt": "Edit"}],
+    }
+    document_adapter = TypeAdapter(DocumentResponse)
+
+    print(f"GET /api/edits, {args.edits} items")
+    base = bench("  models + response_model + json.dumps", lambda: default_path(list_adapter, models), args.number)
+    serialization.FAST_JSON = True
+    fast = bench("  dicts + orjson", lambda: serialization.dumps(edits), args.number)
+    print(f"  speedup x{base / fast:.1f}")
+
+    print(f"GET /api/document/current, {args.text_kb} KB text")
+    serialization.FAST_JSON = False
+    base = bench("  response_model + json.dumps", lambda: default_path(document_adapter, document), args.number)
+    serialization.FAST_JSON = True
+    text_json = serialization.raw_json(serialization.dumps(text))
+    cached = {**document, "text": text_json}
+    fast = bench("  orjson with pre-serialized text", lambda: serialization.dumps(cached), args.number)
+    print(f"  speedup x{base / fast:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Change span of each version
+
+Adds documents.change_start/change_end, the span of the previous version
+replaced by the edit. Existing versions keep NULL spans, for which diffs
+are computed from the texts. Databases created by a create_all that already
+has the columns pass through unchanged, as in every later revision.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DOCUMENT_COLUMNS = [
+    sa.Column("change_start", sa.Integer(), nullable=True),
+    sa.Column("change_end", sa.Integer(), nullable=True),
+]
+
+
+def upgrade() -> None:
+    existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("documents")}
+    missing = [column for column in DOCUMENT_COLUMNS if column.name not in existing]
+    if missing:
+        with op.batch_alter_table("documents") as batch:
+            for column in missing:
+                batch.add_column(column)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("documents") as batch:
+        for column in DOCUMENT_COLUMNS:
+            batch.drop_column(column.name)
@@ -0,0 +1,42 @@
+"""Keyset pagination indexes on edits
+
+Replaces idx_edits_document with composite indexes matching the
+(created_at, edit_id) cursors of the edit listings.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("idx_edits_document_created", ["document_id", "created_at", "edit_id"]),
+    ("idx_edits_document_status", ["document_id", "status", "created_at"]),
+    ("idx_edits_agent_created", ["agent_id", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    existing = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("edits")}
+    for name, columns in INDEXES:
+        if name not in existing:
+            op.create_index(name, "edits", columns)
+    if "idx_edits_document" in existing:
+        # Superseded by idx_edits_document_created
+        op.drop_index("idx_edits_document", table_name="edits")
+
+
+def downgrade() -> None:
+    op.create_index("idx_edits_document", "edits", ["document_id"])
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name="edits")
@@ -0,0 +1,82 @@
+"""Document catalog on sessions
+
+Adds the catalog columns of document_sessions, backfilled from the latest
+version of each document, and the indexes of the session listing.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:02
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.operations import text_digest
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SESSION_COLUMNS = [
+    sa.Column("current_version", sa.Integer(), nullable=False, server_default="0"),
+    sa.Column("text_length", sa.Integer(), nullable=False, server_default="0"),
+    sa.Column("text_hash", sa.String(64), nullable=True),
+    sa.Column("last_editor", sa.String(255), nullable=True),
+]
+INDEXES = [
+    ("idx_sessions_updated", ["updated_at", "document_id"]),
+    ("idx_sessions_status_updated", ["status", "updated_at"]),
+]
+
+
+def backfill_catalog(connection):
+    """Catalog columns from the latest version of every session that has versions"""
+    latest = connection.execute(sa.text(
+        "SELECT d.document_id, d.version, d.text, e.agent_id"
+        " FROM documents d"
+        " JOIN (SELECT document_id, max(version) AS version FROM documents GROUP BY document_id) m"
+        " ON m.document_id = d.document_id AND m.version = d.version"
+        " LEFT JOIN edits e ON e.edit_id = d.edit_id"
+    ))
+    update = sa.text(
+        "UPDATE document_sessions SET current_version = :version, text_length = :length,"
+        " text_hash = :hash, last_editor = :editor WHERE document_id = :document_id"
+    )
+    for document_id, version, text, editor in latest:
+        connection.execute(update, {
+            "document_id": document_id,
+            "version": version,
+            "length": len(text),
+            "hash": text_digest(text),
+            "editor": editor,
+        })
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    existing = {column["name"] for column in inspector.get_columns("document_sessions")}
+    missing = [column for column in SESSION_COLUMNS if column.name not in existing]
+    if missing:
+        with op.batch_alter_table("document_sessions") as batch:
+            for column in missing:
+                batch.add_column(column)
+
+    indexes = {index["name"] for index in inspector.get_indexes("document_sessions")}
+    for name, columns in INDEXES:
+        if name not in indexes:
+            op.create_index(name, "document_sessions", columns)
+
+    if "current_version" in {column.name for column in missing}:
+        backfill_catalog(op.get_bind())
+
+
+def downgrade() -> None:
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name="document_sessions")
+    with op.batch_alter_table("document_sessions") as batch:
+        for column in SESSION_COLUMNS:
+            batch.drop_column(column.name)
@@ -0,0 +1,32 @@
+"""Partial index for the latest active session
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:03
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    existing = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("document_sessions")}
+    if "idx_sessions_active_created" not in existing:
+        op.create_index(
+            "idx_sessions_active_created",
+            "document_sessions",
+            ["created_at"],
+            postgresql_where=sa.text("status = 'ACTIVE'"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_sessions_active_created", table_name="document_sessions")
@@ -0,0 +1,52 @@
+"""Compressed version bodies
+
+Adds documents.body/codec. Existing versions keep their plain text with a
+NULL codec and are read as before.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:04
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.compression import decompress_text
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DOCUMENT_COLUMNS = [
+    sa.Column("body", sa.LargeBinary(), nullable=True),
+    sa.Column("codec", sa.String(32), nullable=True),
+]
+
+
+def upgrade() -> None:
+    existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("documents")}
+    missing = [column for column in DOCUMENT_COLUMNS if column.name not in existing]
+    if missing:
+        with op.batch_alter_table("documents") as batch:
+            for column in missing:
+                batch.add_column(column)
+
+
+def downgrade() -> None:
+    # Compressed versions have no plain text to fall back to
+    connection = op.get_bind()
+    compressed = connection.execute(sa.text(
+        "SELECT document_id, version, body, codec FROM documents WHERE codec IS NOT NULL"
+    )).all()
+    for document_id, version, body, codec in compressed:
+        connection.execute(
+            sa.text("UPDATE documents SET text = :text WHERE document_id = :document_id AND version = :version"),
+            {"text": decompress_text(body, codec), "document_id": document_id, "version": version},
+        )
+    with op.batch_alter_table("documents") as batch:
+        for column in DOCUMENT_COLUMNS:
+            batch.drop_column(column.name)
@@ -0,0 +1,123 @@
+"""Version texts as shared content-addressed blobs
+
+Creates text_blobs and moves every version text into it: one blob per
+distinct text, stored with the configured TEXT_COMPRESSION, refcount = number
+of versions using it. documents.blob_hash points at the blob; only then are
+documents.text/body/codec dropped.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 00:00:05
+
+"""
+from datetime import datetime, timezone
+from typing import Dict, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.compression import compress_text, decompress_text
+from app.operations import text_digest
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+TEXT_COLUMNS = ["text", "body", "codec"]
+
+
+def move_texts(connection):
+    """Fill text_blobs and documents.blob_hash, walking versions by primary key"""
+    refcounts: Dict[str, int] = {}
+    insert_blob = sa.text(
+        "INSERT INTO text_blobs (hash, text, body, codec, size, refcount, created_at)"
+        " VALUES (:hash, :text, :body, :codec, :size, 0, :created_at)"
+    )
+    set_hash = sa.text(
+        "UPDATE documents SET blob_hash = :hash WHERE document_id = :document_id AND version = :version"
+    )
+    select_first = sa.text(
+        "SELECT document_id, version, text, body, codec FROM documents"
+        " ORDER BY document_id, version LIMIT :limit"
+    )
+    select_next = sa.text(
+        "SELECT document_id, version, text, body, codec FROM documents"
+        " WHERE document_id > :document_id OR (document_id = :document_id AND version > :version)"
+        " ORDER BY document_id, version LIMIT :limit"
+    )
+    rows = connection.execute(select_first, {"limit": BATCH_SIZE}).all()
+    while rows:
+        for document_id, version, stored_text, stored_body, stored_codec in rows:
+            text = decompress_text(stored_body, stored_codec) if stored_codec else stored_text
+            digest = text_digest(text)
+            if digest not in refcounts:
+                body, codec = compress_text(text)
+                connection.execute(insert_blob, {
+                    "hash": digest,
+                    "text": None if codec else text,
+                    "body": body,
+                    "codec": codec,
+                    "size": len(text),
+                    "created_at": datetime.now(timezone.utc),
+                })
+                refcounts[digest] = 0
+            refcounts[digest] += 1
+            connection.execute(set_hash, {"hash": digest, "document_id": document_id, "version": version})
+        document_id, version = rows[-1][0], rows[-1][1]
+        rows = connection.execute(
+            select_next, {"document_id": document_id, "version": version, "limit": BATCH_SIZE}
+        ).all()
+    update_refcount = sa.text("UPDATE text_blobs SET refcount = :refcount WHERE hash = :hash")
+    for digest, refcount in refcounts.items():
+        connection.execute(update_refcount, {"hash": digest, "refcount": refcount})
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "text" not in {column["name"] for column in inspector.get_columns("documents")}:
+        # Created by a create_all that already has blobs
+        return
+
+    op.create_table(
+        "text_blobs",
+        sa.Column("hash", sa.String(64), primary_key=True),
+        sa.Column("text", sa.Text(), nullable=True),
+        sa.Column("body", sa.LargeBinary(), nullable=True),
+        sa.Column("codec", sa.String(32), nullable=True),
+        sa.Column("size", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("refcount", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    with op.batch_alter_table("documents") as batch:
+        batch.add_column(sa.Column("blob_hash", sa.String(64), nullable=True))
+
+    move_texts(op.get_bind())
+
+    with op.batch_alter_table("documents") as batch:
+        batch.alter_column("blob_hash", existing_type=sa.String(64), nullable=False)
+        batch.create_foreign_key("fk_documents_blob_hash", "text_blobs", ["blob_hash"], ["hash"])
+        for column in TEXT_COLUMNS:
+            batch.drop_column(column)
+    op.create_index("idx_documents_blob", "documents", ["blob_hash"])
+
+
+def downgrade() -> None:
+    # Texts come back as the per-version body/codec of revision 0005
+    with op.batch_alter_table("documents") as batch:
+        batch.add_column(sa.Column("text", sa.Text(), nullable=False, server_default=""))
+        batch.add_column(sa.Column("body", sa.LargeBinary(), nullable=True))
+        batch.add_column(sa.Column("codec", sa.String(32), nullable=True))
+    connection = op.get_bind()
+    connection.execute(sa.text(
+        "UPDATE documents SET text = coalesce((SELECT t.text FROM text_blobs t WHERE t.hash = documents.blob_hash), ''),"
+        " body = (SELECT t.body FROM text_blobs t WHERE t.hash = documents.blob_hash),"
+        " codec = (SELECT t.codec FROM text_blobs t WHERE t.hash = documents.blob_hash)"
+    ))
+    op.drop_index("idx_documents_blob", table_name="documents")
+    with op.batch_alter_table("documents") as batch:
+        batch.drop_constraint("fk_documents_blob_hash", type_="foreignkey")
+        batch.drop_column("blob_hash")
+    op.drop_table("text_blobs")
@@ -1,11 +1,50 @@
 """
 Pytest configuration
 """
+import os
 import pytest
 import sys
+import tempfile
 from pathlib import Path
 
+import httpx
+import pytest_asyncio
+from sqlalchemy import text
+
 # Add app directory to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Endpoint tests run against a throwaway SQLite database, like the e2e benchmarks
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'text.db')}")
+os.environ.setdefault("PEER_NODES", "")
+os.environ.setdefault("TRACE_EXPORTER", "none")
+
 pytest_plugins = ['pytest_asyncio']
+
+
+@pytest_asyncio.fixture
+async def client(monkeypatch):
+    """Client of the app on a fresh database, without analytics events"""
+    from app import main as main_module
+    from app.cache import active_document, document_cache
+    from app.database import engine
+    from app.edit_log import RejectedEditRecorder
+    from app.models import Base
+
+    async def no_event(event_data):
+        pass
+
+    monkeypatch.setattr(main_module, "send_analytics_event", no_event)
+    # Recorder queue bound to this test's event loop; tests flush it with stop()
+    monkeypatch.setattr(main_module, "rejected_edit_recorder", RejectedEditRecorder(flush_interval=60))
+    document_cache.clear()
+    active_document.clear()
+    app = main_module.app
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as test_client:
+        yield test_client
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    await engine.dispose()
@@ -0,0 +1,68 @@
+"""
+Tests for the benchmark helpers
+"""
+import argparse
+import random
+
+import pytest
+
+from app.operations import apply_operation_to_text
+from app.schemas import EditRequest
+from benchmarks import e2e
+from benchmarks import operations as operations_bench
+
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+
+    assert e2e.percentile(values, 50) == 50.0
+    assert e2e.percentile(values, 99) == 99.0
+    assert e2e.percentile(values, 100) == 100.0
+    assert e2e.percentile([], 95) == 0.0
+
+
+def test_parse_mix():
+    assert e2e.parse_mix("insert=3, replace,invalid=1") == {"insert": 3, "replace": 1, "invalid": 1}
+    with pytest.raises(argparse.ArgumentTypeError):
+        e2e.parse_mix("rename=2")
+
+
+@pytest.mark.parametrize("kind, applies", [("insert", True), ("replace", True), ("invalid", False)])
+def test_generated_edits_match_the_generated_document(kind, applies):
+    text = e2e.make_document(2)
+    paragraphs = text.count("§")
+    edit = e2e.make_edit(kind, "doc", "agent-1", paragraphs, random.Random(1))
+
+    _, success = apply_operation_to_text(text, EditRequest(**edit))
+
+    assert success is applies
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {"config": {}, "scenarios": {"submit_edit": {"throughput_rps": 100.0, "p95_ms": 10.0}}}
+    report = {"config": {}, "scenarios": {"submit_edit": {"throughput_rps": 95.0, "p95_ms": 13.0}}}
+
+    regressions = e2e.compare(report, baseline, threshold=10)
+
+    assert regressions == ["submit_edit.p95_ms: 10.0 -> 13.0 (+30.0%)"]
+
+
+def test_scaling_exponent():
+    assert operations_bench.scaling_exponent({1: 0.001, 10: 0.01, 100: 0.1}) == pytest.approx(1.0)
+    assert operations_bench.scaling_exponent({10: 0.01, 100: 1.0}) == pytest.approx(2.0)
+    assert operations_bench.scaling_exponent({10: 0.01}) is None
+
+
+def test_anchors_are_unique_fragments():
+    text = operations_bench.make_document(4)
+    for where in ("start", "middle", "end"):
+        anchor = operations_bench.anchor_at(text, where)
+        assert text.count(anchor) == 1
+
+
+def test_every_operations_case_runs():
+    cases = operations_bench.build_cases(operations_bench.make_document(2))
+    for case in cases.values():
+        case()
+
+    assert operations_bench.measure(cases["validate_edit_request"], min_time=0.001, repeat=2) > 0
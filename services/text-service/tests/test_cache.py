@@ -0,0 +1,75 @@
+"""
+Unit tests for in-process caches
+"""
+from datetime import datetime, timedelta, timezone
+
+from app.cache import LRUCache, DocumentCache, ActiveDocumentPointer
+
+
+class TestLRUCache:
+    """Test LRUCache eviction order"""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.get("c") == 3
+
+
+class TestDocumentCache:
+    """Test DocumentCache versioning"""
+
+    def test_keeps_newest_version(self):
+        cache = DocumentCache(maxsize=4)
+        cache.put("doc-1", 3, "v3")
+        cache.put("doc-1", 2, "v2")
+
+        cached = cache.get("doc-1")
+        assert cached.version == 3
+        assert cached.text == "v3"
+
+    def test_invalidate(self):
+        cache = DocumentCache(maxsize=4)
+        cache.put("doc-1", 1, "text")
+        cache.invalidate("doc-1")
+
+        assert cache.get("doc-1") is None
+
+    def test_timestamps_are_utc_aware(self):
+        cache = DocumentCache(maxsize=4)
+        cached = cache.put("doc-1", 1, "text", datetime(2024, 1, 1, 12, 0))
+
+        # Same shape as timestamps loaded from the database
+        assert cached.timestamp == datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class TestActiveDocumentPointer:
+    """Test ActiveDocumentPointer updates"""
+
+    def test_newer_replicated_session_replaces_pointer(self):
+        now = datetime.utcnow()
+        pointer = ActiveDocumentPointer(ttl=60)
+        pointer.set("doc-1", now)
+        pointer.offer("doc-0", now - timedelta(minutes=1), active=True)
+        assert pointer.get() == "doc-1"
+
+        pointer.offer("doc-2", now + timedelta(minutes=1), active=True)
+        assert pointer.get() == "doc-2"
+
+    def test_inactive_session_clears_pointer(self):
+        pointer = ActiveDocumentPointer(ttl=60)
+        pointer.set("doc-1")
+        pointer.offer("doc-1", None, active=False)
+
+        assert pointer.get() is None
+
+    def test_expires_after_ttl(self):
+        pointer = ActiveDocumentPointer(ttl=0)
+        pointer.set("doc-1")
+
+        assert pointer.get() is None
@@ -0,0 +1,50 @@
+"""
+Tests for stored text and response compression
+"""
+import pytest
+
+from app import compression
+from app.compression import compress_text, decompress_text, negotiate_encoding
+from app.models import Document, TextBlob
+
+
+LONG_TEXT = "Пример текста документа для сжатия. " * 100
+
+
+def test_no_compression_by_default(monkeypatch):
+    monkeypatch.setattr(compression, "TEXT_COMPRESSION", "none")
+    assert compress_text(LONG_TEXT) == (None, None)
+
+
+@pytest.mark.parametrize("codec", ["zlib", "zstd"])
+def test_round_trip(monkeypatch, codec):
+    monkeypatch.setattr(compression, "TEXT_COMPRESSION", codec)
+    body, used = compress_text(LONG_TEXT)
+    assert used == codec
+    assert len(body) < len(LONG_TEXT.encode("utf-8"))
+    assert decompress_text(body, used) == LONG_TEXT
+
+
+def test_short_text_stored_plain(monkeypatch):
+    monkeypatch.setattr(compression, "TEXT_COMPRESSION", "zlib")
+    assert compress_text("short") == (None, None)
+
+
+def test_blob_text_property(monkeypatch):
+    monkeypatch.setattr(compression, "TEXT_COMPRESSION", "zlib")
+    body, codec = compress_text(LONG_TEXT)
+    assert TextBlob(hash="h", body=body, codec=codec).text == LONG_TEXT
+    assert TextBlob(hash="h", stored_text="plain").text == "plain"
+
+
+def test_version_text_property():
+    assert Document(blob=TextBlob(hash="h", stored_text="from blob")).text == "from blob"
+    version = Document(blob_hash="h")
+    version.text = "assigned"
+    assert version.text == "assigned"
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate, br, zstd") == "zstd"
+    assert negotiate_encoding("gzip, zstd;q=0") == "gzip"
+    assert negotiate_encoding("deflate") is None
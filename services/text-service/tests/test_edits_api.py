@@ -0,0 +1,98 @@
+"""
+Tests for edit validation, bulk recording of rejected edits and session resolution
+"""
+import uuid
+
+import pytest
+from sqlalchemy import update
+
+from app import main as main_module
+from app.database import AsyncSessionLocal
+from app.models import DocumentSession, DocumentStatus
+
+
+async def init_document(client, text="Intro. The quick brown fox jumps.", **fields):
+    response = await client.post("/api/document/init", json={"topic": "t", "initial_text": text, **fields})
+    return response.json()["document_id"]
+
+
+def insert(document_id, anchor, **fields):
+    return {
+        "document_id": document_id, "agent_id": "agent-1", "operation": "insert",
+        "anchor": anchor, "position": "after", "new_text": " Added.", **fields,
+    }
+
+
+@pytest.mark.asyncio
+async def test_validate_reports_without_applying(client):
+    document_id = await init_document(client)
+
+    valid = (await client.post("/api/edits/validate", json=insert(document_id, "Intro."))).json()
+    assert valid["valid"] is True
+    assert valid["version"] == 1
+    assert valid["match_kind"] == "exact"
+
+    invalid = (await client.post("/api/edits/validate", json=insert(document_id, "Missing anchor"))).json()
+    assert invalid["valid"] is False
+    assert invalid["reason"]
+
+    malformed = (await client.post("/api/edits/validate", json=insert(document_id, None))).json()
+    assert malformed["valid"] is False
+
+    current = (await client.get("/api/document/current", params={"document_id": document_id})).json()
+    assert current["version"] == 1
+    assert (await client.get("/api/edits")).json() == []
+
+
+@pytest.mark.asyncio
+async def test_validate_inactive_document(client):
+    document_id = await init_document(client)
+    await client.post(f"/api/document/{document_id}/stop")
+    response = (await client.post("/api/edits/validate", json=insert(document_id, "Intro."))).json()
+    assert response["valid"] is False
+    assert response["reason"] == "Document is not active"
+
+
+@pytest.mark.asyncio
+async def test_rejected_edits_are_recorded_in_bulk(client):
+    document_id = await init_document(client)
+    for _ in range(3):
+        response = await client.post("/api/edits", json=insert(document_id, "Missing anchor"))
+        assert response.json()["status"] == "rejected"
+    accepted = await client.post("/api/edits", json=insert(document_id, "Intro."))
+    assert accepted.json()["status"] == "accepted"
+
+    await main_module.rejected_edit_recorder.stop()
+    rejected = (await client.get("/api/edits", params={"status": "rejected"})).json()
+    assert len(rejected) == 3
+    assert {edit["document_id"] for edit in rejected} == {document_id}
+
+
+@pytest.mark.asyncio
+async def test_rejections_of_deleted_documents_are_skipped(client):
+    kept_id = await init_document(client)
+    deleted_id = await init_document(client)
+    await client.post("/api/edits", json=insert(kept_id, "Missing anchor"))
+    await client.post("/api/edits", json=insert(deleted_id, "Missing anchor"))
+    # Deleted while its rejection is still queued
+    assert (await client.delete(f"/api/document/{deleted_id}")).status_code == 200
+
+    await main_module.rejected_edit_recorder.stop()
+    rejected = (await client.get("/api/edits", params={"status": "rejected"})).json()
+    assert [edit["document_id"] for edit in rejected] == [kept_id]
+
+
+@pytest.mark.asyncio
+async def test_active_pointer_sees_status_changed_elsewhere(client):
+    document_id = await init_document(client)
+    # Stopped by another worker: this process still points at the session
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(DocumentSession)
+            .where(DocumentSession.document_id == uuid.UUID(document_id))
+            .values(status=DocumentStatus.STOPPED)
+        )
+        await db.commit()
+
+    response = await client.post("/api/edits", json=insert(None, "Intro."))
+    assert response.status_code == 404
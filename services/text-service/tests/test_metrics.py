@@ -0,0 +1,44 @@
+"""
+Tests for request and replication metrics
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.metrics import observe_replication_lag
+
+
+def request_count(route, status):
+    labels = {"method": "GET", "route": route, "status": status}
+    return REGISTRY.get_sample_value("text_http_request_duration_seconds_count", labels) or 0
+
+
+@pytest.mark.asyncio
+async def test_requests_are_labelled_by_route_template(client):
+    route = "/api/document/{document_id}/versions"
+    before_route = request_count(route, "200")
+    before_unmatched = request_count("unmatched", "404")
+    before_scrape = request_count("/metrics", "200")
+
+    response = await client.post("/api/document/init", json={"topic": "t", "initial_text": "Hello"})
+    document_id = response.json()["document_id"]
+    await client.get(f"/api/document/{document_id}/versions")
+    await client.get("/no/such/path")
+    await client.get("/metrics")
+
+    # Ids in the path share one label; unknown paths share another; scrapes are not observed
+    assert request_count(route, "200") == before_route + 1
+    assert request_count("unmatched", "404") == before_unmatched + 1
+    assert request_count("/metrics", "200") == before_scrape
+
+
+def test_replication_lag_gauge():
+    created = datetime.now(timezone.utc) - timedelta(seconds=2)
+    lag = observe_replication_lag("peer-a", created)
+
+    assert 2 <= lag < 3
+    assert REGISTRY.get_sample_value("text_replication_lag_seconds", {"peer": "peer-a"}) == lag
+
+    # Naive timestamps are UTC; clock skew never makes the lag negative
+    assert observe_replication_lag("peer-b", datetime.utcnow() + timedelta(seconds=5)) == 0.0
@@ -0,0 +1,89 @@
+"""
+Tests for schema migrations of databases created before them
+"""
+from sqlalchemy import create_engine, inspect, text
+
+from app.database import _migrate
+from app.operations import text_digest
+
+# Tables as the original create_all schema made them (UUIDs as hex strings on SQLite)
+BASELINE_SCHEMA = [
+    """CREATE TABLE document_sessions (
+        document_id CHAR(32) PRIMARY KEY, topic VARCHAR(255) NOT NULL, mode VARCHAR(50),
+        status VARCHAR(9) NOT NULL, max_edits INTEGER NOT NULL, token_budget BIGINT NOT NULL,
+        token_used BIGINT NOT NULL, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL,
+        finished_at DATETIME, final_version INTEGER)""",
+    """CREATE TABLE documents (
+        document_id CHAR(32) NOT NULL, version INTEGER NOT NULL, text TEXT NOT NULL,
+        timestamp DATETIME NOT NULL, edit_id CHAR(32), PRIMARY KEY (document_id, version),
+        CONSTRAINT uq_document_version UNIQUE (document_id, version))""",
+    "CREATE INDEX idx_documents_version ON documents (document_id, version)",
+    """CREATE TABLE edits (
+        edit_id CHAR(32) PRIMARY KEY, document_id CHAR(32) NOT NULL, agent_id VARCHAR(255) NOT NULL,
+        operation VARCHAR(50) NOT NULL, anchor TEXT, position VARCHAR(50), old_text TEXT, new_text TEXT,
+        tokens_used INTEGER NOT NULL, status VARCHAR(8) NOT NULL, created_at DATETIME NOT NULL,
+        applied_at DATETIME)""",
+    "CREATE INDEX idx_edits_document ON edits (document_id)",
+]
+
+
+def baseline_database():
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.execute(text(statement))
+        connection.execute(text(
+            "INSERT INTO document_sessions VALUES ('aa', 'topic', NULL, 'ACTIVE', 3, 100, 0,"
+            " '2024-01-01', '2024-01-01', NULL, NULL)"
+        ))
+        connection.execute(text(
+            "INSERT INTO edits VALUES ('e1', 'aa', 'agent-1', 'insert', NULL, NULL, NULL, ' world',"
+            " 0, 'ACCEPTED', '2024-01-01', '2024-01-01')"
+        ))
+        connection.execute(text(
+            "INSERT INTO documents VALUES ('aa', 1, 'hello', '2024-01-01', NULL),"
+            " ('aa', 2, 'hello world', '2024-01-01', 'e1'), ('bb', 1, 'hello', '2024-01-01', NULL)"
+        ))
+    return engine
+
+
+def test_baseline_database_is_upgraded():
+    engine = baseline_database()
+    with engine.begin() as connection:
+        _migrate(connection)
+
+    with engine.connect() as connection:
+        columns = {column["name"] for column in inspect(connection).get_columns("documents")}
+        assert "change_start" in columns
+        assert not {"text", "body", "codec"} & columns
+
+        # Version texts moved into shared blobs, one per distinct text
+        blobs = connection.execute(text("SELECT hash, text, refcount FROM text_blobs ORDER BY size")).all()
+        assert [tuple(blob) for blob in blobs] == [
+            (text_digest("hello"), "hello", 2),
+            (text_digest("hello world"), "hello world", 1),
+        ]
+        versions = connection.execute(text(
+            "SELECT document_id, version, blob_hash FROM documents ORDER BY document_id, version"
+        )).all()
+        assert [tuple(version) for version in versions] == [
+            ("aa", 1, text_digest("hello")),
+            ("aa", 2, text_digest("hello world")),
+            ("bb", 1, text_digest("hello")),
+        ]
+
+        indexes = {index["name"] for index in inspect(connection).get_indexes("edits")}
+        assert "idx_edits_document_created" in indexes
+        assert "idx_edits_document" not in indexes
+
+        catalog = connection.execute(text(
+            "SELECT current_version, text_length, text_hash, last_editor FROM document_sessions"
+        )).one()
+        assert tuple(catalog) == (2, 11, text_digest("hello world"), "agent-1")
+
+        indexes = {index["name"] for index in inspect(connection).get_indexes("document_sessions")}
+        assert {"idx_sessions_updated", "idx_sessions_active_created"} <= indexes
+
+    # Already at head: a second run changes nothing
+    with engine.begin() as connection:
+        _migrate(connection)
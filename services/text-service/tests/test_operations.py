@@ -2,7 +2,15 @@
 Unit tests for text operations
 """
 import pytest
-from app.operations import apply_operation_to_text, validate_edit_request, build_diff_segments
+from app import operations
+from app.operations import (
+    apply_operation_to_text,
+    validate_edit_request,
+    build_diff_segments,
+    diff_segments_from_change,
+    resolve_anchor,
+    AnchorIndex,
+)
 from app.schemas import EditRequest
 
 
@@ -271,3 +279,122 @@ class TestBuildDiffSegments:
 
         assert {"type": "delete", "text": "Old"} in segments
         assert {"type": "replace", "text": "New"} in segments
+
+    def test_diff_over_token_limit_falls_back_to_replacement(self, monkeypatch):
+        monkeypatch.setattr("app.operations.MAX_DIFF_TOKENS", 2)
+        segments = build_diff_segments("start a b c d end", "start w x y z end")
+
+        assert segments == [
+            {"type": "equal", "text": "start "},
+            {"type": "delete", "text": "a b c d"},
+            {"type": "replace", "text": "w x y z"},
+            {"type": "equal", "text": " end"},
+        ]
+
+    def test_diff_with_many_scattered_edits(self):
+        words = [f"word{i}" for i in range(1200)]
+        old = " ".join(words)
+        new = " ".join(f"edited{i}" if i % 4 == 0 else word for i, word in enumerate(words))
+        segments = build_diff_segments(old, new)
+
+        # 300 replacements exceed the Myers edit limit; each stays its own change
+        assert sum(1 for s in segments if s["type"] == "replace") == 300
+        assert {"type": "delete", "text": "word600"} in segments
+        assert {"type": "replace", "text": "edited600"} in segments
+        assert "".join(s["text"] for s in segments if s["type"] != "delete") == new
+        assert "".join(s["text"] for s in segments if s["type"] not in ("insert", "replace")) == old
+
+    def test_diff_from_change_span(self):
+        segments = diff_segments_from_change("Hello old world", "Hello new world", 6, 9)
+
+        assert segments == [
+            {"type": "equal", "text": "Hello "},
+            {"type": "delete", "text": "old"},
+            {"type": "replace", "text": "new"},
+            {"type": "equal", "text": " world"},
+        ]
+
+    def test_diff_from_change_rejects_bad_span(self):
+        assert diff_segments_from_change("short", "short text", 3, 20) is None
+
+
+class TestResolveAnchor:
+    """Tests for anchor resolution and the anchor index"""
+
+    def test_reports_all_exact_matches(self):
+        text = "one two one two one"
+        matches = resolve_anchor(text, "one two", AnchorIndex(text))
+
+        assert [m.start for m in matches] == [0, 8]
+        assert all(m.kind == "exact" and m.confidence == 1.0 for m in matches)
+
+    def test_whitespace_and_quote_drift(self):
+        text = "Мы обсудим  «важные»\nвопросы сегодня"
+        matches = resolve_anchor(text, 'обсудим "важные" вопросы')
+
+        assert len(matches) == 1
+        assert matches[0].kind == "normalized"
+        assert text[matches[0].start:matches[0].end] == "обсудим  «важные»\nвопросы"
+
+    def test_fuzzy_match_within_edit_distance(self):
+        text = "The quick brown fox jumps over the lazy dog"
+        matches = resolve_anchor(text, "quick brwn fox jumps")
+
+        assert len(matches) == 1
+        assert matches[0].kind == "fuzzy"
+        assert text[matches[0].start:matches[0].end] == "quick brown fox jumps"
+        assert 0.85 <= matches[0].confidence < 1.0
+
+    def test_fuzzy_match_with_several_misspelled_words(self):
+        text = "The quick brown fox jumps over the lazy dog and keeps running"
+        matches = resolve_anchor(text, "quikc brwn fox jumps ovr the", AnchorIndex(text))
+
+        assert len(matches) == 1
+        assert matches[0].kind == "fuzzy"
+        assert "brown fox jumps over the" in text[matches[0].start:matches[0].end]
+
+    @pytest.mark.parametrize("text, anchor", [
+        ("alpha - delta\nbeta\ndelta ", " delta "),
+        ("deltabeta  delta'  beta''-alpha", " beta'"),
+        ("one  two one\ntwo one two", "one two"),
+    ])
+    def test_indexed_normalized_matches_equal_full_scan(self, text, anchor):
+        indexed = resolve_anchor(text, anchor, AnchorIndex(text), fuzzy=False)
+
+        assert indexed == resolve_anchor(text, anchor, fuzzy=False)
+
+    def test_short_anchor_is_not_fuzzy_matched(self):
+        assert resolve_anchor("Hello world", "wrld") == []
+
+    def test_index_incremental_update_matches_rebuild(self):
+        text = "alpha beta gamma delta"
+        index = AnchorIndex(text)
+        new_text = text[:6] + "beta-x epsilon" + text[16:]
+        index.apply_edit(new_text, 6, 16, 6 + len("beta-x epsilon"))
+
+        assert index.postings == AnchorIndex(new_text).postings
+
+    def test_index_update_across_blocks_matches_rebuild(self, monkeypatch):
+        monkeypatch.setattr(operations, "INDEX_BLOCK_SIZE", 8)
+        text = "alpha beta gamma delta epsilon zeta eta theta"
+        index = AnchorIndex(text)
+        for start, end, replacement in [(8, 30, "x y"), (0, 5, "omega omega"), (20, 20, "tail words here")]:
+            text = text[:start] + replacement + text[end:]
+            index.apply_edit(text, start, end, start + len(replacement))
+
+            assert index.postings == AnchorIndex(text).postings
+            assert index.count("omega") == text.count("omega")
+
+    def test_replace_with_drifted_whitespace(self):
+        text = "First line.\nSecond  line here."
+        edit = EditRequest(
+            agent_id="test",
+            operation="replace",
+            old_text="First line. Second line",
+            new_text="Merged line",
+            tokens_used=0
+        )
+
+        new_text, success = apply_operation_to_text(text, edit)
+        assert success is True
+        assert new_text == "Merged line here."
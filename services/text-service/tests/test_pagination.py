@@ -0,0 +1,144 @@
+"""
+Tests for keyset pagination of the edit and document listings
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import AsyncSessionLocal
+from app.models import DocumentSession, Edit, EditStatus
+
+BASE_TIME = datetime(2026, 1, 1, 12, 0, 0)
+
+
+async def add_edits(document_id, count, created_at=None):
+    """Insert accepted edits directly; without created_at each is a second newer than the previous"""
+    async with AsyncSessionLocal() as db:
+        for i in range(count):
+            db.add(Edit(
+                document_id=uuid.UUID(document_id), agent_id="agent-1", operation="insert",
+                status=EditStatus.ACCEPTED, created_at=created_at or BASE_TIME + timedelta(seconds=i),
+            ))
+        await db.commit()
+
+
+async def add_sessions(count, updated_at=None):
+    """Insert sessions directly; without updated_at each is a second newer than the previous"""
+    async with AsyncSessionLocal() as db:
+        for i in range(count):
+            db.add(DocumentSession(topic=f"topic {i}", updated_at=updated_at or BASE_TIME + timedelta(seconds=i)))
+        await db.commit()
+
+
+async def document_pages(client, between_pages=None, **params):
+    """Follow the X-Next-Before-* cursor headers; returns pages of document ids"""
+    pages = []
+    while True:
+        response = await client.get("/api/documents", params=params)
+        pages.append([item["document_id"] for item in response.json()])
+        if "X-Next-Before-Updated-At" not in response.headers:
+            return pages
+        params.update(
+            before_updated_at=response.headers["X-Next-Before-Updated-At"],
+            before_document_id=response.headers["X-Next-Before-Document-Id"],
+        )
+        if between_pages:
+            await between_pages()
+
+
+async def edit_pages(client, limit, between_pages=None, **params):
+    """Follow the after_created_at/after_edit_id cursor until an empty page"""
+    pages = []
+    while True:
+        page = (await client.get("/api/edits", params={"limit": limit, **params})).json()
+        if not page:
+            return pages
+        pages.append([edit["edit_id"] for edit in page])
+        params.update(after_created_at=page[-1]["created_at"], after_edit_id=page[-1]["edit_id"])
+        if between_pages:
+            await between_pages()
+
+
+@pytest.mark.asyncio
+async def test_edit_pages_cover_listing_once(client):
+    document_id = str(uuid.uuid4())
+    await add_edits(document_id, 7)
+
+    everything = [edit["edit_id"] for edit in (await client.get("/api/edits", params={"limit": 100})).json()]
+    pages = await edit_pages(client, 3, document_id=document_id)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [edit_id for page in pages for edit_id in page] == everything
+
+
+@pytest.mark.asyncio
+async def test_edit_cursor_breaks_created_at_ties(client):
+    document_id = str(uuid.uuid4())
+    await add_edits(document_id, 5, created_at=BASE_TIME)
+
+    pages = await edit_pages(client, 2, document_id=document_id)
+    listed = [edit_id for page in pages for edit_id in page]
+
+    assert len(listed) == 5
+    assert listed == sorted(listed, key=uuid.UUID, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_edit_cursor_is_stable_under_inserts(client):
+    document_id = str(uuid.uuid4())
+    await add_edits(document_id, 6)
+    original = [edit["edit_id"] for edit in (await client.get("/api/edits", params={"limit": 100})).json()]
+
+    async def insert_newer():
+        await add_edits(document_id, 2, created_at=datetime(2027, 1, 1))
+
+    pages = await edit_pages(client, 2, between_pages=insert_newer, document_id=document_id)
+
+    # Edits newer than the cursor neither shift later pages nor repeat earlier items
+    assert [edit_id for page in pages for edit_id in page] == original
+
+
+@pytest.mark.asyncio
+async def test_document_list_has_default_page_size(client):
+    await add_sessions(101)
+
+    response = await client.get("/api/documents")
+
+    assert len(response.json()) == 100
+    assert "X-Next-Before-Document-Id" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_document_pages_end_without_cursor_on_exact_boundary(client):
+    await add_sessions(6)
+
+    pages = await document_pages(client, limit=3)
+
+    assert [len(page) for page in pages] == [3, 3]
+    everything = [item["document_id"] for item in (await client.get("/api/documents")).json()]
+    assert [document_id for page in pages for document_id in page] == everything
+
+
+@pytest.mark.asyncio
+async def test_document_cursor_breaks_updated_at_ties(client):
+    await add_sessions(5, updated_at=BASE_TIME)
+
+    pages = await document_pages(client, limit=2)
+    listed = [document_id for page in pages for document_id in page]
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert listed == sorted(listed, key=uuid.UUID, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_document_cursor_is_stable_under_inserts(client):
+    await add_sessions(7)
+    original = [item["document_id"] for item in (await client.get("/api/documents")).json()]
+
+    async def insert_newer():
+        await add_sessions(3, updated_at=datetime(2027, 1, 1))
+
+    pages = await document_pages(client, between_pages=insert_newer, limit=3)
+
+    assert [document_id for page in pages for document_id in page] == original
@@ -0,0 +1,72 @@
+"""
+Tests for on-demand request profiling
+"""
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.profiling import ProfileStore, ProfilingMiddleware, RequestProfile, create_profiling_router
+
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def call(app, headers):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/x", "headers": headers}
+    await app(scope, None, send)
+    return dict(messages[0]["headers"])
+
+
+@pytest.mark.asyncio
+async def test_profiles_only_requests_with_header():
+    store = ProfileStore()
+    app = ProfilingMiddleware(endpoint, store=store, sample_rate=0, admin_token="secret")
+
+    assert b"x-profile-id" not in await call(app, [])
+    assert b"x-profile-id" not in await call(app, [(b"x-profile", b"1")])
+    assert store.list() == []
+
+    headers = await call(app, [(b"x-profile", b"secret")])
+    profile = store.get(headers[b"x-profile-id"].decode())
+    assert profile.status == 200
+    assert profile.path == "/x"
+
+
+@pytest.mark.asyncio
+async def test_header_is_ignored_without_admin_token():
+    store = ProfileStore()
+    app = ProfilingMiddleware(endpoint, store=store, sample_rate=0, admin_token="")
+
+    assert b"x-profile-id" not in await call(app, [(b"x-profile", b"1")])
+    assert store.list() == []
+
+
+def test_store_evicts_oldest():
+    store = ProfileStore(maxsize=2)
+    for i in range(3):
+        store.add(RequestProfile(str(i), "GET", "/", None, "header"))
+    assert [profile.profile_id for profile in store.list()] == ["2", "1"]
+
+
+async def admin_status(admin_token, headers):
+    app = FastAPI()
+    app.include_router(create_profiling_router(ProfileStore(), admin_token=admin_token))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return (await client.get("/admin/profiles", headers=headers)).status_code
+
+
+@pytest.mark.asyncio
+async def test_admin_endpoints_require_configured_token():
+    # Without a configured token the endpoints are closed to everyone, not open
+    assert await admin_status("", {}) == 404
+    assert await admin_status("", {"X-Admin-Token": ""}) == 404
+    assert await admin_status("secret", {}) == 403
+    assert await admin_status("secret", {"X-Admin-Token": "wrong"}) == 403
+    assert await admin_status("secret", {"X-Admin-Token": "secret"}) == 200
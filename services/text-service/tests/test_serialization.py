@@ -0,0 +1,37 @@
+"""
+Tests for the fast JSON serialization path
+"""
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app import serialization
+from app.schemas import AgentRole
+
+
+CONTENT = {
+    "document_id": uuid.UUID(int=7),
+    "timestamp": datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+    "created_at": datetime(2024, 5, 1, 12, 30, 0, 15),
+    "text": "Текст с \"кавычками\"\n",
+    "agent_roles": [AgentRole(role_key="editor", name="Editor", prompt="Edit")],
+    "final_version": None,
+}
+
+
+@pytest.mark.skipif(serialization.orjson is None, reason="orjson not installed")
+def test_fast_path_matches_fallback(monkeypatch):
+    monkeypatch.setattr(serialization, "FAST_JSON", False)
+    expected = serialization.dumps(CONTENT)
+    monkeypatch.setattr(serialization, "FAST_JSON", True)
+    assert serialization.dumps(CONTENT) == expected
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_raw_json_is_embedded(monkeypatch, fast):
+    if fast and serialization.orjson is None:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(serialization, "FAST_JSON", fast)
+    text = serialization.raw_json(serialization.dumps(CONTENT["text"]))
+    assert serialization.dumps({"text": text}) == serialization.dumps({"text": CONTENT["text"]})
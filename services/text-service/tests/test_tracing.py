@@ -0,0 +1,31 @@
+"""
+Tests for trace context propagation
+"""
+from app import tracing
+from app.tracing import parse_traceparent, start_span, end_span, trace_headers, current_span
+
+
+def test_parse_traceparent():
+    trace_id, span_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+    assert parse_traceparent(f"00-{trace_id}-{span_id}-01") == (trace_id, span_id)
+    assert parse_traceparent("00-xyz-00f067aa0ba902b7-01") is None
+    assert parse_traceparent(f"00-{'0' * 32}-{span_id}-01") is None
+    assert parse_traceparent(None) is None
+
+
+def test_child_spans_share_trace(monkeypatch):
+    exporter = tracing.InMemoryExporter()
+    monkeypatch.setattr(tracing, "exporter", exporter)
+
+    parent = start_span("request", f"00-{'a' * 32}-{'b' * 16}-01")
+    child = start_span("replicate")
+    assert trace_headers() == {"traceparent": child.traceparent}
+    end_span(child)
+    assert current_span() is parent
+    end_span(parent)
+
+    assert current_span() is None
+    assert parent.trace_id == child.trace_id == "a" * 32
+    assert parent.parent_id == "b" * 16
+    assert child.parent_id == parent.span_id
+    assert [span.name for span in exporter.by_trace("a" * 32)] == ["replicate", "request"]